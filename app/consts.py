@@ -20,6 +20,10 @@ LOGO_PATH = os.path.join(STATIC_DIR, "favicon.ico")
 LIBS_DIR = os.path.join(BASE_DIR, "libs")
 LHM_LHMONITOR_DLL_PATH = os.path.join(LIBS_DIR, "lhm/LibreHardwareMonitorLib.dll")
 LHM_HIDSHARP_DLL_PATH = os.path.join(LIBS_DIR, "lhm/HidSharp.dll")
+# Name of the sensor backend (lhm, linux, psutil or fake), chosen by the platform if not set
+SENSOR_BACKEND = os.environ.get(f"{APP_NAME}_SENSOR_BACKEND", "")
+# Engine of the screen displays: "thread" (a thread per stage) or "asyncio" (one event loop)
+DISPLAY_ENGINE = os.environ.get(f"{APP_NAME}_DISPLAY_ENGINE", "thread")
 #
 SYSTRAY_EXIT_MENU_ID = 0x00
 SYSTRAY_HARDWARE_MONITOR_MENU_ID = 0x01
@@ -35,23 +39,32 @@ HOME_DIR = os.path.join(os.path.expanduser("~"), f".{APP_NAME}")
 if IS_EXE:
     LOG_LEVEL = "INFO"
     THEMES_DIR = os.path.join(HOME_DIR, "themes")
+# Header fields of the theme files, see app/hardware_monitor/theme_index.py
+THEME_INDEX_PATH = os.path.join(HOME_DIR, "theme_index.json")
+# Images and fonts of the themes, see app/hardware_monitor/theme_assets.py
+ASSETS_DIR = os.path.join(HOME_DIR, "assets")
 
 def init_dir():
     os.makedirs(HOME_DIR, exist_ok=True)
     os.makedirs(THEMES_DIR, exist_ok=True)
 
 
-def print_consts():
-    print(f"APP_NAME:\t{APP_NAME}")
-    print(f"IS_EXE:\t{IS_EXE}")
-    print(f"LOG_LEVEL:\t{LOG_LEVEL}")
-    print(f"LOG_PATH:\t{LOG_PATH}")
-    print(f"SETTING_PATH:\t{SETTING_PATH}")
-    print(f"THEMES_DIR:\t{THEMES_DIR}")
-    print(f"STATIC_DIR:\t{STATIC_DIR}")
-    print(f"LIBS_DIR:\t{LIBS_DIR}")
-    print(f"THEMES_SOURCE_DIR:\t{THEMES_SOURCE_DIR}")
+def consts_summary() -> str:
+    return "\n".join(
+        [
+            f"APP_NAME:\t{APP_NAME}",
+            f"IS_EXE:\t{IS_EXE}",
+            f"LOG_LEVEL:\t{LOG_LEVEL}",
+            f"LOG_PATH:\t{LOG_PATH}",
+            f"SETTING_PATH:\t{SETTING_PATH}",
+            f"THEMES_DIR:\t{THEMES_DIR}",
+            f"THEME_INDEX_PATH:\t{THEME_INDEX_PATH}",
+            f"ASSETS_DIR:\t{ASSETS_DIR}",
+            f"STATIC_DIR:\t{STATIC_DIR}",
+            f"LIBS_DIR:\t{LIBS_DIR}",
+            f"THEMES_SOURCE_DIR:\t{THEMES_SOURCE_DIR}",
+        ]
+    )
 
 
 init_dir()
-print_consts()
@@ -0,0 +1,66 @@
+"""
+Sensor backends, the platform specific readers behind the hardware sensors.
+
+The backend is chosen at the first use: `consts.SENSOR_BACKEND` if set,
+otherwise LibreHardwareMonitor on Windows, procfs/sysfs on Linux and psutil
+elsewhere. The backend modules are only imported when chosen, so pythonnet
+and the Windows APIs are never loaded on other platforms.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+from app import consts
+from ._base import Reader, SensorBackend
+
+__all__ = ["Reader", "SensorBackend", "BACKENDS", "get_backend", "set_backend"]
+
+logger = logging.getLogger()
+
+# Backend name: (module, class)
+BACKENDS = {
+    "lhm": ("app.hardware_monitor.backends.lhm", "LHMBackend"),
+    "linux": ("app.hardware_monitor.backends.linux", "LinuxBackend"),
+    "fake": ("app.hardware_monitor.backends.fake", "FakeBackend"),
+    "psutil": ("app.hardware_monitor.backends._base", "SensorBackend"),
+}
+
+_backend: SensorBackend = None
+_lock = threading.Lock()
+
+
+def default_backend_name() -> str:
+    if consts.SENSOR_BACKEND:
+        return consts.SENSOR_BACKEND
+    if sys.platform == "win32":
+        return "lhm"
+    if sys.platform.startswith("linux"):
+        return "linux"
+    return "psutil"
+
+
+def create_backend(name: str) -> SensorBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sensor backend <{name}>, expect one of {list(BACKENDS)}")
+    module, cls = BACKENDS[name]
+    return getattr(importlib.import_module(module), cls)()
+
+
+def get_backend() -> SensorBackend:
+    """The sensor backend, created at the first call."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                name = default_backend_name()
+                _backend = create_backend(name)
+                logger.info(f"Sensor backend <{name}> loaded")
+    return _backend
+
+
+def set_backend(backend: SensorBackend) -> None:
+    """Replace the sensor backend, used by the tests and the benchmarks."""
+    global _backend
+    with _lock:
+        _backend = backend
@@ -0,0 +1,130 @@
+import logging
+from typing import Dict, Tuple
+import psutil
+
+logger = logging.getLogger()
+
+
+# Reader interface of a sensor, created by the sensor backend
+class Reader:
+
+    def read(self) -> dict:
+        """Read the status from the hardware."""
+        raise NotImplementedError
+
+
+# CPU status data (implemented based on psutil)
+class CPU(Reader):
+
+    def __init__(self) -> None:
+        psutil.cpu_percent(None)  # The first call only sets the baseline
+
+    def read(self) -> dict:
+        freq = psutil.cpu_freq()
+        return {
+            "load": max(round(psutil.cpu_percent(None) / 100, 2), 0.01),
+            "frequency": freq and round(freq.current / 1000, 2),
+            "temperature": None,
+            "fan": None,
+        }
+
+
+# No graphics card status available
+class GPU(Reader):
+
+    def read(self) -> dict:
+        return {
+            "load": None,
+            "frequency": None,
+            "temperature": None,
+            "fan": None,
+            "total": None,
+            "used": None,
+            "free": None,
+        }
+
+
+# RAM status data (implemented based on psutil)
+class RAM(Reader):
+
+    def read(self) -> dict:
+        mem = psutil.virtual_memory()
+        return {
+            "load": round(mem.percent / 100, 2),
+            "used": round(mem.used / (1024**3), 1),
+            "free": round(mem.available / (1024**3), 1),
+            "total": round(mem.total / (1024**3), 0),
+        }
+
+
+# Disk status data (implemented based on psutil)
+class Disk(Reader):
+
+    def read(self) -> dict:
+        total = 0
+        used = 0
+        for part in psutil.disk_partitions():
+            try:
+                _usage = psutil.disk_usage(part.mountpoint)
+                total += _usage.total
+                used += _usage.used
+            except Exception as e:
+                logger.error(e)
+                continue
+        total = round(total / 1024 / 1024 / 1024, 0)  # GB
+        used = round(used / 1024 / 1024 / 1024, 1)  # GB
+        return {
+            "load": round(used / total, 2) if total else 0,
+            "used": used,
+            "free": total - used,
+            "total": total,
+        }
+
+
+# Network byte counters of each interface (implemented based on psutil)
+class Net(Reader):
+
+    def read(self) -> Dict[str, Tuple[int, int]]:
+        """Bytes sent and received of each interface."""
+        return {
+            name: (s.bytes_sent, s.bytes_recv)
+            for name, s in psutil.net_io_counters(pernic=True).items()
+        }
+
+
+# No audio device available
+class Volume(Reader):
+
+    def read(self) -> dict:
+        return {"load": 0.0}
+
+
+class SensorBackend:
+    """
+    Create the readers of the hardware sensors. The default readers are based
+    on psutil, the backends replace the ones their platform can do better.
+    """
+
+    name = "psutil"
+
+    def cpu(self) -> Reader:
+        return CPU()
+
+    def gpu(self) -> Reader:
+        return GPU()
+
+    def ram(self) -> Reader:
+        return RAM()
+
+    def disk(self) -> Reader:
+        return Disk()
+
+    def net(self) -> Reader:
+        return Net()
+
+    def volume(self) -> Reader:
+        return Volume()
+
+    def stats(self) -> dict:
+        """Statistics of the backend itself."""
+        return dict()
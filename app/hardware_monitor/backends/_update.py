@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Dict
+
+
+class UpdateCoordinator:
+    """
+    Refresh each hardware/sub-hardware at most once per sampling tick.
+
+    `Update()` is the expensive native refresh of LibreHardwareMonitor, a
+    hardware updated less than `tick` seconds ago is considered fresh, so
+    several readers of the same hardware in one sampling pass share a single
+    refresh. The cost of the refreshes is measured per hardware.
+    """
+
+    def __init__(self, tick: float = 0.5) -> None:
+        self.tick = tick
+        self.__lock = threading.Lock()
+        self.__last_update: Dict[str, float] = dict()
+        self.__stats: Dict[str, dict] = dict()
+
+    def update(self, hw) -> None:
+        if hw is None:
+            return
+        key = str(hw.Identifier)
+        with self.__lock:
+            stats = self.__stats.get(key, None)
+            if stats is None:
+                stats = self.__stats[key] = {
+                    "name": str(hw.Name),
+                    "updates": 0,
+                    "coalesced": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                }
+            start = time.monotonic()
+            if start - self.__last_update.get(key, -self.tick) < self.tick:
+                stats["coalesced"] += 1
+                return
+            hw.Update()
+            now = time.monotonic()
+            self.__last_update[key] = now
+            stats["updates"] += 1
+            stats["total_time"] += now - start
+            stats["max_time"] = max(stats["max_time"], now - start)
+
+    def stats(self) -> Dict[str, dict]:
+        """The update count, the coalesced calls and the update cost of each hardware."""
+        res = dict()
+        for key, stats in list(self.__stats.items()):
+            updates = stats["updates"]
+            res[key] = {
+                "name": stats["name"],
+                "updates": updates,
+                "coalesced": stats["coalesced"],
+                "avg_ms": round(stats["total_time"] / updates * 1000, 2) if updates else 0,
+                "max_ms": round(stats["max_time"] * 1000, 2),
+            }
+        return res
@@ -0,0 +1,109 @@
+"""
+Deterministic fake backend for tests and benchmarks, no hardware is touched.
+
+Every reader counts its own reads and derives the values from that count with
+a fixed waveform, so the same sequence of reads always gives the same values.
+"""
+
+from typing import Dict, Tuple
+from ._base import Reader, SensorBackend
+
+
+def wave(tick: int, period: int = 60) -> float:
+    """A triangle wave between 0 and 1."""
+    phase = tick % period / period
+    return 2 * phase if phase < 0.5 else 2 - 2 * phase
+
+
+class FakeReader(Reader):
+
+    def __init__(self) -> None:
+        self.tick = 0
+
+    def read(self) -> dict:
+        self.tick += 1
+        return self.values(wave(self.tick))
+
+    def values(self, w: float) -> dict:
+        raise NotImplementedError
+
+
+class CPU(FakeReader):
+    def values(self, w: float) -> dict:
+        return {
+            "load": max(round(w, 2), 0.01),
+            "frequency": round(2 + 2 * w, 2),
+            "temperature": int(40 + 40 * w),
+            "fan": int(800 + 1200 * w),
+        }
+
+
+class GPU(FakeReader):
+    def values(self, w: float) -> dict:
+        used = round(8 * w, 1)
+        return {
+            "load": max(round(w, 2), 0.01),
+            "frequency": round(1 + w, 2),
+            "temperature": int(35 + 45 * w),
+            "fan": int(1000 * w),
+            "total": 8.0,
+            "used": used,
+            "free": 8.0 - used,
+        }
+
+
+class RAM(FakeReader):
+    def values(self, w: float) -> dict:
+        used = round(4 + 8 * w, 1)
+        return {
+            "load": round(used / 16, 2),
+            "used": used,
+            "free": round(16 - used, 1),
+            "total": 16.0,
+        }
+
+
+class Disk(FakeReader):
+    def values(self, w: float) -> dict:
+        return {"load": 0.5, "used": 500.0, "free": 500.0, "total": 1000.0}
+
+
+class Volume(FakeReader):
+    def values(self, w: float) -> dict:
+        return {"load": round(w, 2)}
+
+
+class Net(Reader):
+    """Counters of two interfaces growing by a fixed amount per read."""
+
+    def __init__(self) -> None:
+        self.tick = 0
+
+    def read(self) -> Dict[str, Tuple[int, int]]:
+        self.tick += 1
+        return {
+            "eth0": (self.tick * 125_000, self.tick * 1_250_000),
+            "lo": (self.tick * 1000, self.tick * 1000),
+        }
+
+
+class FakeBackend(SensorBackend):
+    name = "fake"
+
+    def cpu(self) -> Reader:
+        return CPU()
+
+    def gpu(self) -> Reader:
+        return GPU()
+
+    def ram(self) -> Reader:
+        return RAM()
+
+    def disk(self) -> Reader:
+        return Disk()
+
+    def net(self) -> Reader:
+        return Net()
+
+    def volume(self) -> Reader:
+        return Volume()
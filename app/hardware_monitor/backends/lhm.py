@@ -0,0 +1,379 @@
+"""
+LibreHardwareMonitor backend (Windows), reads the CPU and GPU through the
+LibreHardwareMonitor dll library and the volume through the Core Audio API.
+"""
+
+import logging
+import threading
+import clr  # type: ignore # Clr is from pythonnet package. Do not install clr package
+
+from app.consts import LHM_LHMONITOR_DLL_PATH, LHM_HIDSHARP_DLL_PATH
+from comtypes import CLSCTX_ALL, CoInitialize, CoUninitialize
+from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+from comtypes import POINTER, cast
+from ._base import Reader, SensorBackend
+from ._plan import ReadPlan
+from ._update import UpdateCoordinator
+
+# Import LibreHardwareMonitor dll to Python
+clr.AddReference(LHM_LHMONITOR_DLL_PATH)
+clr.AddReference(LHM_HIDSHARP_DLL_PATH)  # type: ignore, this dll is required by LibreHardwareMonitor.dll
+from LibreHardwareMonitor import Hardware  # type: ignore
+
+logger = logging.getLogger()
+
+HARDWARE_TYPE_MOTHERBOARD = Hardware.HardwareType.Motherboard
+HARDWARE_TYPE_CPU = Hardware.HardwareType.Cpu
+HARDWARE_TYPE_MEN = Hardware.HardwareType.Memory
+HARDWARE_TYPE_GPUNVIDIA = Hardware.HardwareType.GpuNvidia
+HARDWARE_TYPE_GPUAMD = Hardware.HardwareType.GpuAmd
+HARDWARE_TYPE_GPUINTEL = Hardware.HardwareType.GpuIntel
+HARDWARE_TYPE_DISK = Hardware.HardwareType.Storage
+HARDWARE_TYPE_NET = Hardware.HardwareType.Network
+
+
+def open_computer() -> Hardware.Computer:
+    handle = Hardware.Computer()
+    handle.IsCpuEnabled = True
+    handle.IsGpuEnabled = True
+    handle.IsMemoryEnabled = True
+    handle.IsMotherboardEnabled = True  # For CPU Fan Speed
+    handle.IsControllerEnabled = True  # For CPU Fan Speed
+    handle.IsNetworkEnabled = True
+    handle.IsStorageEnabled = True
+    handle.IsPsuEnabled = False
+    handle.Open()
+    return handle
+
+
+def print_hardware_and_status(handle: Hardware.Computer):
+    for hardware in handle.Hardware:
+        print(f"{hardware.HardwareType}: {hardware.Name}")
+        hardware.Update()
+        for sensor in hardware.Sensors:
+            print(
+                f"\t {sensor.SensorType}\t {sensor.Name} \t {round(sensor.Value, 2) if sensor.Value else ''}"
+            )
+        for sub_hardware in hardware.SubHardware:
+            print(f"\t {sub_hardware.HardwareType}: {sub_hardware.Name}")
+            sub_hardware.Update()
+            for sensor in sub_hardware.Sensors:
+                print(
+                    f"\t\t {sensor.SensorType}\t {sensor.Name} \t {round(sensor.Value, 2) if sensor.Value else ''}"
+                )
+
+
+def get_hardware(handle: Hardware.Computer, filter, all: bool = False):
+    """
+    Get hardware devices based on the given filter condition. By default, only the first matching device is returned.
+
+    :param handle: The opened LibreHardwareMonitor computer.
+    :param filter: A callable object used to determine if a hardware device meets the condition.
+    :param all: A boolean indicating whether to return all matching hardware devices.
+    :return: The matching hardware device(s), or None if no device is found.
+    """
+    res = list()
+    for hardware in handle.Hardware:
+        if filter(hardware):
+            if not all:
+                return hardware
+            else:
+                res.append(hardware)
+    return res
+
+
+# CPU status data
+class CPU(Reader):
+
+    def __init__(
+        self,
+        handle: Hardware.Computer,
+        coordinator: UpdateCoordinator,
+        hw: Hardware = None,
+    ) -> None:
+        self.coordinator = coordinator
+        if hw is None:
+            hw = get_hardware(
+                handle, filter=lambda x: x.HardwareType == HARDWARE_TYPE_CPU
+            )
+        self.hw = hw
+        self.load_sensor = None
+        self.frequency_sensors = list()
+        self.temperature_sensor = None
+        self.fan_subhw = None
+        self.fan_sensor = None
+
+        tmp_temperature_sensors = dict()
+        if self.hw is not None:
+            self.coordinator.update(self.hw)
+            for sensor in self.hw.Sensors:
+                # Total CPU load
+                if (
+                    sensor.SensorType == Hardware.SensorType.Load
+                    and sensor.Name.startswith("CPU Total")
+                ):
+                    self.load_sensor = sensor
+                # CPU core frequency
+                if (
+                    sensor.SensorType == Hardware.SensorType.Clock
+                    and "Core #" in sensor.Name
+                    and "Effective" not in sensor.Name
+                ):
+                    self.frequency_sensors.append(sensor)
+                # CPU temperature
+                if sensor.SensorType == Hardware.SensorType.Temperature:
+                    tmp_temperature_sensors[sensor.Name] = sensor
+
+        # CPU temperature
+        for name, sensor in tmp_temperature_sensors.items():
+            if name.startswith("Core Average"):
+                self.temperature_sensor = sensor
+                break
+            if name.startswith("Core Max"):
+                self.temperature_sensor = sensor
+                break
+            if name.startswith("CPU Package"):
+                self.temperature_sensor = sensor
+                break
+            if name.startswith("Core"):
+                self.temperature_sensor = sensor
+
+        # CPU fan speed
+        mb = get_hardware(
+            handle, filter=lambda x: x.HardwareType == HARDWARE_TYPE_MOTHERBOARD
+        )
+        if mb is not None:
+            for subhw in mb.SubHardware:
+                self.coordinator.update(subhw)  # Must update sub-hardware first
+                for sensor in subhw.Sensors:
+                    if sensor.SensorType == Hardware.SensorType.Fan and "#2" in str(
+                        sensor.Name
+                    ):  # Is Motherboard #2 Fan always the CPU Fan?
+                        self.fan_subhw = subhw
+                        self.fan_sensor = sensor
+                        break
+
+        # Read each sensor once per tick
+        self.plan = ReadPlan()
+        self.plan.add("load", [self.load_sensor], scale=0.01, digits=2, low=0.01)
+        self.plan.add("frequency", self.frequency_sensors, scale=0.001, digits=2)
+        self.plan.add("temperature", [self.temperature_sensor])
+        self.plan.add("fan", [self.fan_sensor])
+        self.plan.compile()
+
+    def update(self):
+        self.coordinator.update(self.hw)
+        self.coordinator.update(self.fan_subhw)
+
+    def read(self) -> dict:
+        self.update()
+        return self.plan.execute()
+
+
+# Always read the status data of the default first graphics card
+class GPU(Reader):
+
+    def __default_hw(self, handle: Hardware.Computer):
+        # Prioritize using NVIDIA graphics cards
+        hw = get_hardware(
+            handle, filter=lambda x: x.HardwareType == HARDWARE_TYPE_GPUNVIDIA
+        )
+        # If no NVIDIA graphics card is found, use an AMD graphics card
+        if hw is None:
+            hws = get_hardware(
+                handle, filter=lambda x: x.HardwareType == HARDWARE_TYPE_GPUAMD, all=True
+            )
+            # If there are AMD graphics cards, use the first one
+            if len(hws) > 0:
+                hw = hws[0]
+            # When there are multiple AMD graphics cards, use the name to distinguish
+            else:
+                for tmp_hw in handle.Hardware:
+                    for sensor in tmp_hw.Sensors:
+                        if sensor.SensorType == Hardware.SensorType.Load and str(
+                            sensor.Name
+                        ).startswith("GPU Core"):
+                            hw = tmp_hw
+                            break
+                    if hw is not None:
+                        break
+        # If no AMD graphics card is found, use an Intel graphics card
+        if hw is None:
+            hw = get_hardware(
+                handle, filter=lambda x: x.HardwareType == HARDWARE_TYPE_GPUINTEL
+            )
+        return hw
+
+    def __init__(
+        self,
+        handle: Hardware.Computer,
+        coordinator: UpdateCoordinator,
+        hw: Hardware = None,
+    ) -> None:
+        self.coordinator = coordinator
+        if hw is None:
+            hw = self.__default_hw(handle)
+        self.hw = hw
+        self.load_sensor = None
+        self.mem_controller_load_sensor = None
+        self.frequency_sensor = None
+        self.temperature_sensor = None
+        self.fan_sensor = None
+        self.mem_used_sensor = None
+        self.mem_total = None
+
+        if self.hw:
+            self.coordinator.update(self.hw)  # When checking for values, must update once first
+            for sensor in self.hw.Sensors:
+                # GPU utilization
+                if sensor.SensorType == Hardware.SensorType.Load:
+                    if sensor.Name.startswith("GPU Core"):
+                        self.load_sensor = sensor
+                    elif sensor.Name.startswith("D3D 3D"):
+                        self.load_sensor = self.load_sensor or sensor
+                    if sensor.Name.startswith("GPU Memory Controller"):
+                        self.mem_controller_load_sensor = sensor
+                # GPU frequency
+                if (
+                    sensor.SensorType == Hardware.SensorType.Clock
+                    and sensor.Name.startswith("GPU Core")
+                    and "Effective" not in sensor.Name
+                ):
+                    self.frequency_sensor = sensor
+                # GPU temperature
+                if (
+                    sensor.SensorType == Hardware.SensorType.Temperature
+                    and sensor.Name.startswith("GPU Core")
+                ):
+                    self.temperature_sensor = sensor
+                # GPU fan speed
+                if (
+                    sensor.SensorType == Hardware.SensorType.Fan
+                    and sensor.Value is not None
+                ):
+                    self.fan_sensor = sensor
+                # Video memory
+                if sensor.SensorType == Hardware.SensorType.SmallData:
+                    # Used video memory
+                    if sensor.Name.startswith("GPU Memory Used"):
+                        self.mem_used_sensor = sensor
+                    if sensor.Name.startswith("D3D") and sensor.Name.endswith(
+                        "Memory Used"
+                    ):
+                        self.mem_used_sensor = self.mem_used_sensor or sensor
+                    # Total video memory
+                    if sensor.Name.startswith("GPU Memory Total"):
+                        self.mem_total = sensor.Value
+
+        # Read each sensor once per tick
+        self.plan = ReadPlan()
+        if self.load_sensor and self.mem_controller_load_sensor:
+            # If the graphics card has a memory controller, add the memory controller's occupancy
+            self.plan.add(
+                "load",
+                [self.load_sensor, self.mem_controller_load_sensor],
+                scale=0.01,
+                digits=2,
+                high=1,
+                reduce="sum",
+            )
+        else:
+            self.plan.add("load", [self.load_sensor], scale=0.01, digits=2, low=0.01)
+        self.plan.add("frequency", [self.frequency_sensor], scale=0.001, digits=2)
+        self.plan.add("temperature", [self.temperature_sensor])
+        self.plan.add("fan", [self.fan_sensor])
+        self.plan.add("used", [self.mem_used_sensor], scale=1 / 1024, digits=1)
+        self.plan.compile()
+
+    def update(self):
+        self.hw and self.coordinator.update(self.hw)
+
+    def read(self) -> dict:
+        self.update()
+        res = self.plan.execute()
+        total = self.mem_total and round(self.mem_total / 1024, 0)
+        used = res.pop("used")
+        res["total"] = total
+        res["used"] = used
+        res["free"] = None if total is None or used is None else total - used
+        return res
+
+
+# Volume
+class Volume(Reader):
+    def __init__(self) -> None:
+        self.volume = None
+        self.available = False
+        try:
+            CoInitialize()
+            devices = AudioUtilities.GetSpeakers()
+            if devices:
+                interface = devices.Activate(
+                    IAudioEndpointVolume._iid_, CLSCTX_ALL, None
+                )
+                if interface:
+                    self.volume = cast(interface, POINTER(IAudioEndpointVolume))
+                    self.available = True
+        except Exception as e:
+            logger.warning(f"Audio device initialization failed: {e}")
+            self.available = False
+
+    def __del__(self):
+        try:
+            self.cleanup()
+        except:
+            pass
+
+    def cleanup(self):
+        if hasattr(self, "volume") and self.volume:
+            self.volume.Release()
+            self.volume = None
+            CoUninitialize()
+
+    def load(self) -> float:
+        if not self.available or not self.volume:
+            return 0.0  # Return 0 volume when no audio device is available
+        try:
+            current_volume = self.volume.GetMasterVolumeLevelScalar()
+            return round(current_volume, 2)
+        except Exception as e:
+            logger.warning(f"Failed to get volume level: {e}")
+            return 0.0
+
+    def read(self) -> dict:
+        res = {"load": self.load()}
+        return res
+
+
+class LHMBackend(SensorBackend):
+    """
+    LibreHardwareMonitor backend, the computer is opened by the first CPU or
+    GPU reader, the other readers never wait for it.
+    """
+
+    name = "lhm"
+
+    def __init__(self) -> None:
+        self.__handle: Hardware.Computer = None
+        self.__lock = threading.Lock()
+        self.coordinator = UpdateCoordinator()
+
+    @property
+    def handle(self) -> Hardware.Computer:
+        if self.__handle is None:
+            with self.__lock:
+                if self.__handle is None:
+                    self.__handle = open_computer()
+        return self.__handle
+
+    def cpu(self) -> Reader:
+        return CPU(self.handle, self.coordinator)
+
+    def gpu(self) -> Reader:
+        return GPU(self.handle, self.coordinator)
+
+    def stats(self) -> dict:
+        return {"updates": self.coordinator.stats()}
+
+    def volume(self) -> Reader:
+        return Volume()
@@ -0,0 +1,260 @@
+"""
+Linux backend, reads procfs and sysfs directly:
+CPU load from /proc/stat, CPU frequency from /sys/devices/system/cpu/*/cpufreq,
+temperatures, fans and the amdgpu status from /sys/class/hwmon.
+
+The files are opened once and re-read from offset 0 on every tick, which makes
+procfs and sysfs regenerate the content; a file failing to read is reopened.
+"""
+
+import glob
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+from ._base import Reader, SensorBackend
+
+logger = logging.getLogger()
+
+# hwmon drivers of the CPU temperature, in priority order
+CPU_TEMPERATURE_DRIVERS = ["coretemp", "k10temp", "zenpower", "cpu_thermal", "acpitz"]
+# Preferred temperature labels of the CPU package
+CPU_TEMPERATURE_LABELS = ["Package id 0", "Tctl", "Tdie"]
+
+
+class FileBatch:
+    """
+    A set of procfs/sysfs files kept open and read together,
+    a None path is a missing file and always reads None.
+    """
+
+    def __init__(self, paths: List[Optional[str]], size: int = 4096) -> None:
+        self.paths = list(paths)
+        self.size = size
+        self.__fds: List[Optional[int]] = [None] * len(self.paths)
+
+    def __read(self, i: int) -> Optional[bytes]:
+        if self.paths[i] is None:
+            return None
+        for _ in range(2):  # Reopen once if the file fails to read
+            fd = self.__fds[i]
+            try:
+                if fd is None:
+                    fd = self.__fds[i] = os.open(self.paths[i], os.O_RDONLY)
+                return os.pread(fd, self.size, 0)
+            except OSError:
+                self.__close(i)
+        return None
+
+    def __close(self, i: int) -> None:
+        fd, self.__fds[i] = self.__fds[i], None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def read(self) -> List[Optional[bytes]]:
+        """The content of every file, None for the files failing to read."""
+        return [self.__read(i) for i in range(len(self.paths))]
+
+    def read_numbers(self) -> List[Optional[int]]:
+        res = list()
+        for data in self.read():
+            try:
+                res.append(int(data))
+            except (TypeError, ValueError):
+                res.append(None)
+        return res
+
+    def close(self) -> None:
+        for i in range(len(self.paths)):
+            self.__close(i)
+
+    def __del__(self):
+        self.close()
+
+
+def read_text(path: str) -> str:
+    try:
+        with open(path, "r") as fp:
+            return fp.read().strip()
+    except OSError:
+        return ""
+
+
+def hwmon_devices(root: str) -> Dict[str, List[str]]:
+    """The hwmon directories of each driver name."""
+    res = dict()
+    for path in sorted(glob.glob(os.path.join(root, "sys/class/hwmon/hwmon*"))):
+        res.setdefault(read_text(os.path.join(path, "name")), list()).append(path)
+    return res
+
+
+def first_fan(devices: Dict[str, List[str]], skip: Tuple[str, ...] = ()) -> Optional[str]:
+    for name, paths in devices.items():
+        if name in skip:
+            continue
+        for path in paths:
+            fans = sorted(glob.glob(os.path.join(path, "fan*_input")))
+            if fans:
+                return fans[0]
+    return None
+
+
+# CPU status data
+class CPU(Reader):
+
+    def __init__(self, root: str = "/") -> None:
+        self.__stat = FileBatch([os.path.join(root, "proc/stat")], size=512)
+        self.__last_busy = 0
+        self.__last_total = 0
+        self.__freqs = FileBatch(
+            sorted(
+                glob.glob(
+                    os.path.join(
+                        root, "sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq"
+                    )
+                )
+            )
+        )
+        devices = hwmon_devices(root)
+        self.__sensors = FileBatch(
+            [self.__temperature_path(devices), first_fan(devices, skip=("amdgpu",))]
+        )
+        self.__load()  # Set the baseline of the load
+
+    @staticmethod
+    def __temperature_path(devices: Dict[str, List[str]]) -> Optional[str]:
+        for driver in CPU_TEMPERATURE_DRIVERS:
+            for path in devices.get(driver, []):
+                inputs = sorted(glob.glob(os.path.join(path, "temp*_input")))
+                for label in CPU_TEMPERATURE_LABELS:
+                    for input in inputs:
+                        if read_text(input.replace("_input", "_label")) == label:
+                            return input
+                if inputs:
+                    return inputs[0]
+        return None
+
+    def __load(self) -> Optional[float]:
+        data = self.__stat.read()[0]
+        if not data:
+            return None
+        # cpu  user nice system idle iowait irq softirq steal ...
+        fields = [int(v) for v in data.split(b"\n", 1)[0].split()[1:9]]
+        total = sum(fields)
+        busy = total - fields[3] - fields[4]
+        d_total, d_busy = total - self.__last_total, busy - self.__last_busy
+        self.__last_total, self.__last_busy = total, busy
+        if d_total <= 0:
+            return None
+        return max(round(d_busy / d_total, 2), 0.01)
+
+    def read(self) -> dict:
+        freqs = [v for v in self.__freqs.read_numbers() if v is not None]
+        temperature, fan = self.__sensors.read_numbers()
+        return {
+            "load": self.__load(),
+            # kHz -> GHz
+            "frequency": round(sum(freqs) / len(freqs) / 1e6, 2) if freqs else None,
+            # m°C -> °C
+            "temperature": int(temperature / 1000) if temperature is not None else None,
+            "fan": fan,
+        }
+
+
+# Graphics card status data, only the amdgpu driver exposes it through sysfs
+class GPU(Reader):
+    FILES = [
+        "device/gpu_busy_percent",  # %
+        "freq1_input",  # Hz
+        "temp1_input",  # m°C
+        "fan1_input",  # RPM
+        "device/mem_info_vram_total",  # B
+        "device/mem_info_vram_used",  # B
+    ]
+
+    def __init__(self, root: str = "/") -> None:
+        paths = hwmon_devices(root).get("amdgpu", [])
+        self.__files = FileBatch(
+            [os.path.join(paths[0], f) if paths else None for f in self.FILES]
+        )
+
+    def read(self) -> dict:
+        load, freq, temperature, fan, total, used = self.__files.read_numbers()
+        total = total and round(total / 1024**3, 0)
+        used = used and round(used / 1024**3, 1)
+        return {
+            "load": load and max(round(load / 100, 2), 0.01),
+            "frequency": freq and round(freq / 1e9, 2),
+            "temperature": temperature and int(temperature / 1000),
+            "fan": fan,
+            "total": total,
+            "used": used,
+            "free": total - used if total is not None and used is not None else None,
+        }
+
+
+# RAM status data
+class RAM(Reader):
+
+    def __init__(self, root: str = "/") -> None:
+        self.__meminfo = FileBatch([os.path.join(root, "proc/meminfo")])
+
+    def read(self) -> dict:
+        data = self.__meminfo.read()[0] or b""
+        info = dict()
+        for line in data.splitlines():
+            key, _, value = line.partition(b":")
+            if key in (b"MemTotal", b"MemAvailable"):
+                info[key] = int(value.split()[0]) * 1024  # kB
+        total = info.get(b"MemTotal", 0)
+        available = info.get(b"MemAvailable", 0)
+        used = total - available
+        return {
+            "load": round(used / total, 2) if total else 0,
+            "used": round(used / (1024**3), 1),
+            "free": round(available / (1024**3), 1),
+            "total": round(total / (1024**3), 0),
+        }
+
+
+# Network byte counters of each interface
+class Net(Reader):
+
+    def __init__(self, root: str = "/") -> None:
+        self.__dev = FileBatch([os.path.join(root, "proc/net/dev")], size=65536)
+
+    def read(self) -> Dict[str, Tuple[int, int]]:
+        """Bytes sent and received of each interface."""
+        res = dict()
+        data = self.__dev.read()[0] or b""
+        for line in data.splitlines()[2:]:
+            name, _, values = line.partition(b":")
+            fields = values.split()
+            if len(fields) < 9:
+                continue
+            # Receive: bytes ... (8 fields), Transmit: bytes ...
+            res[name.strip().decode()] = (int(fields[8]), int(fields[0]))
+        return res
+
+
+class LinuxBackend(SensorBackend):
+    """Read procfs and sysfs under `root`, the disk usage is read by psutil."""
+
+    name = "linux"
+
+    def __init__(self, root: str = "/") -> None:
+        self.root = root
+
+    def cpu(self) -> Reader:
+        return CPU(self.root)
+
+    def gpu(self) -> Reader:
+        return GPU(self.root)
+
+    def ram(self) -> Reader:
+        return RAM(self.root)
+
+    def net(self) -> Reader:
+        return Net(self.root)
@@ -0,0 +1,395 @@
+"""
+Drive several screens at the same time.
+
+Every screen gets its own `ScreenDisplay`: its own theme, rotation, brightness
+and frame rate from `settings.get_screen_settings`, its own frame pipeline and
+its own error counting, so one unplugged panel does not stall the others.
+All screens share the sensor values of the background `sensor_sampler`.
+"""
+
+import atexit
+import logging
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple, Union
+from PIL import Image
+from app import consts
+from app.setting import settings
+from app.hardware_monitor.sampler import sensor_sampler
+from app.hardware_monitor.frame_transport import frame_receiver
+from app.hardware_monitor.renderer import ThemeRenderer
+from app.hardware_monitor.theme_cache import theme_cache, theme_path
+from app.hardware_monitor.pipeline import FramePipeline, FrameScheduler, Stage
+from libs.lcds import LCD
+
+if TYPE_CHECKING:
+    from app.hardware_monitor.engine import AsyncEngine, AsyncPipeline
+
+__all__ = ["display_manager", "DisplayManager", "ScreenDisplay"]
+
+logger = logging.getLogger()
+
+
+def is_virtual_screen(lcd: LCD) -> bool:
+    # The virtual screen loads pywebview, it is loaded if the screen is one
+    module = sys.modules.get("libs.lcds.VirtualScreen")
+    return module is not None and isinstance(lcd, module.LCD_VirtualScreen)
+
+
+class ScreenDisplay:
+    """
+    The display of one screen:
+    capture -> decode -> transmit, each stage on its own worker.
+    The rotation is folded into the pixel conversion of the transmit stage.
+    """
+
+    error_limit = 10
+    # Wait before retrying after an error, doubled by every consecutive error
+    retry_delay = 1
+    max_retry_delay = 8
+
+    def __init__(self, lcd: LCD, manager: "DisplayManager") -> None:
+        self.lcd = lcd
+        self.uid = lcd.unique_id()
+        self.manager = manager
+        # Serialize the I/O of this screen
+        self.lock = threading.Lock()
+        self.renderer = ThemeRenderer()
+        self.theme = ""
+        # Capture the frames from the ThemePlayer window instead of the renderer
+        self.use_webview = False
+        self.brightness = 100
+        self.rotation = 0
+        self.force_refresh = 10
+        self.fps = 1
+        self.scheduler = FrameScheduler(self.fps)
+        self.running = False
+        self.stats = {"frames": 0, "skipped": 0, "errors": 0}
+        # Set when stopped, ends the wait before a retry
+        self.__stopped = threading.Event()
+        self.__pipeline: Optional[Union[FramePipeline, "AsyncPipeline"]] = None
+        self.__error_count = 0
+        self.__last_display_at = 0
+        # Fingerprint of the last displayed frame, None forces the next frame out
+        self.__last_frame_hash = None
+        self.__binary_transport = True
+        self.load_settings()
+
+    def is_virtual(self) -> bool:
+        return is_virtual_screen(self.lcd)
+
+    def load_settings(self) -> None:
+        """Load the theme, rotation, brightness and frame rate of the screen."""
+        screen_settings = settings.get_screen_settings(self.uid)
+        self.brightness = screen_settings.get("brightness", 100)
+        self.rotation = screen_settings.get("rotation", 0)
+        self.force_refresh = screen_settings.get("forceRefresh", 10)
+        self.fps = screen_settings.get("fps", 1)
+        self.scheduler.set_fps(self.fps)
+        self.__last_frame_hash = None
+        theme = screen_settings.get("lastTheme", "")
+        if theme != self.theme:
+            self.load_theme(theme)
+
+    def load_theme(self, theme: str) -> None:
+        meta = dict()
+        try:
+            if theme:
+                meta = theme_cache.meta(theme_path(theme))
+        except Exception as e:
+            logger.error(f"Screen <{self.uid}> load theme <{theme}> error: {e}")
+            theme = ""
+        try:
+            self.renderer.load_meta(theme, meta)
+        except Exception as e:
+            logger.error(f"Screen <{self.uid}> render theme <{theme}> error: {e}")
+        self.theme = theme
+        self.__last_frame_hash = None
+        # Align the frames to the second boundaries if the theme shows the time
+        self.scheduler.align_to_second = self.renderer.has_clock()
+
+    def set_brightness(self) -> None:
+        """Set the screen brightness, raise the error after 3 failed tries."""
+        for i in range(3):  # Try 3 times
+            with self.lock:
+                try:
+                    if not self.lcd.is_open():
+                        self.lcd.open()
+                    self.lcd.set_brightness(self.brightness)
+                except Exception as e:
+                    logger.error(e)
+                    # Try to close the screen and retry
+                    self.lcd.close()
+                    if i == 2:
+                        raise
+                    time.sleep(1)
+                else:
+                    logger.debug(
+                        f"Set the screen<{self.uid}> brightness: {self.brightness}"
+                    )
+                    break
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.__stopped.clear()
+        self.__error_count = 0
+        self.__last_display_at = 0
+        self.__last_frame_hash = None
+        self.__binary_transport = True
+        self.stats = {"frames": 0, "skipped": 0, "errors": 0}
+        self.scheduler = FrameScheduler(self.fps, self.renderer.has_clock())
+        stages = [
+            Stage("capture", self.__capture_stage, self.scheduler, executor="io"),
+            Stage("decode", self.__decode_stage, executor="cpu"),
+            Stage("transmit", self.__transmit_stage, executor="io"),
+        ]
+        engine = self.manager.engine()
+        if engine is not None:
+            self.__pipeline = engine.pipeline(stages, on_error=self.__on_error)
+        else:
+            self.__pipeline = FramePipeline(stages, on_error=self.__on_error)
+        self.__pipeline.start()
+        logger.info(f"Screen <{self.uid}> display started.")
+
+    def stop(self) -> None:
+        """Stop the display, safe to call from a stage."""
+        self.running = False
+        self.__stopped.set()
+        if self.__pipeline is not None:
+            self.__pipeline.stop()
+            self.__pipeline = None
+        with self.lock:
+            try:
+                if self.lcd.is_open():
+                    self.lcd.close()
+            except Exception as e:
+                logger.error(e)
+        logger.info(f"Screen <{self.uid}> display stopped.")
+
+    def get_stats(self) -> dict:
+        res = dict(self.stats)
+        res["running"] = self.running
+        if self.__pipeline is not None:
+            res["stages"] = self.__pipeline.stats()
+        return res
+
+    def __capture_stage(self) -> Optional[dict]:
+        """
+        Capture a frame and skip it if unchanged.
+        """
+        start = time.monotonic()
+        if not self.running:
+            return None
+        frame_hash, decode = self.__capture_frame()
+        if decode is None:
+            return None
+        # Skip the unchanged frame before decoding it,
+        # but still refresh the screen every `forceRefresh` seconds.
+        unchanged = frame_hash == self.__last_frame_hash
+        if unchanged and start - self.__last_display_at < self.force_refresh:
+            self.stats["skipped"] += 1
+            logger.debug(f"Screen <{self.uid}> frame unchanged, skipped.")
+            return None
+        return {
+            "hash": frame_hash,
+            "decode": decode,
+            "start": start,
+            "resync": unchanged,
+        }
+
+    def __decode_stage(self, frame: dict) -> dict:
+        frame["image"] = frame.pop("decode")()
+        return frame
+
+    def __transmit_stage(self, frame: dict) -> None:
+        with self.lock:
+            if not self.running:
+                return None
+            if not self.lcd.is_open():
+                self.lcd.close()
+                self.lcd.open()
+                self.lcd.invalidate_frame()
+            elif frame["resync"]:
+                # A forced refresh resends the whole frame, the diff of an
+                # unchanged frame would send nothing to a panel that lost it
+                self.lcd.invalidate_frame()
+            # The rotation is applied by the pixel conversion of the driver
+            rotation = 0 if self.is_virtual() else self.rotation
+            self.lcd.display_changes(frame["image"], rotation)
+        self.__last_frame_hash = frame["hash"]
+        self.__last_display_at = frame["start"]
+        self.stats["frames"] += 1
+        self.__error_count = 0
+        cost_time = time.monotonic() - frame["start"]
+        logger.info(
+            f"Screen <{self.uid}> display succeeded. Time taken: {cost_time:.2f}s"
+        )
+        return None
+
+    def __on_error(self, stage: Stage, e: Exception) -> None:
+        if stage.name == "transmit":
+            with self.lock:
+                self.lcd.close()
+        self.__last_frame_hash = None
+        self.stats["errors"] += 1
+        self.__error_count += 1
+        if self.__error_count > self.error_limit:
+            logger.warning(
+                f"The number of screen <{self.uid}> display exceptions has reached the limit. Automatically exiting..."
+            )
+            self.stop()
+            self.manager.on_screen_failed(self)
+            return
+        logger.warning(
+            f"Screen <{self.uid}> connection exception. Retrying...{self.__error_count}"
+        )
+        # Back off, so a short disconnection does not use up the error limit
+        delay = self.retry_delay * 2 ** (self.__error_count - 1)
+        self.__stopped.wait(min(delay, self.max_retry_delay))
+
+    def __capture_frame(self) -> Tuple[int, Callable[[], Image.Image]]:
+        """
+        Capture a frame from the renderer of the screen or the ThemePlayer window.
+        Returns the frame fingerprint and a function decoding the frame, the
+        raw RGBA transport is used first and the base64 data URL is the fallback.
+        """
+        if not self.use_webview and not self.is_virtual():
+            if not self.renderer.is_loaded():
+                return 0, None
+            values = self.manager.sensors.read(self.renderer.sensors())
+            return self.renderer.update(values), self.renderer.render
+        # The webview is only loaded to capture the ThemePlayer window
+        from app.ui import UIWindowManager
+        from app.util import image_from_base64
+
+        window = UIWindowManager.theme_player_window()
+        if self.__binary_transport:
+            try:
+                frame_receiver.start()
+                seq = frame_receiver.next_seq()
+                if window.evaluate_js(
+                    f"window.playerPushFrame('{frame_receiver.url}', {seq})"
+                ):
+                    frame = frame_receiver.wait_frame(seq, timeout=1)
+                    if frame is not None:
+                        return frame.fingerprint(), frame.to_image
+                raise TimeoutError("no frame received")
+            except Exception as e:
+                # Do not wait for the binary transport again in this display session
+                self.__binary_transport = False
+                logger.warning(
+                    f"Binary frame transport failed, fallback to data url: {e}"
+                )
+        imgSrc = window.evaluate_js("window.playerToImageSrc()")
+        if not imgSrc:
+            return 0, None
+        return hash(imgSrc), lambda: image_from_base64(imgSrc)
+
+
+class DisplayManager:
+    """
+    Run the displays of all active screens.
+    The primary screen is the one selected in the UI, it shows the theme of the
+    ThemePlayer window unless `nativeRender` is enabled. The other screens are
+    drawn by their own renderer with their own theme.
+    """
+
+    def __init__(self) -> None:
+        self.sensors = sensor_sampler
+        self.screens: Dict[str, ScreenDisplay] = dict()
+        self.primary_uid = ""
+        self.__lock = threading.RLock()
+        # Called with the failed screen when a screen stopped because of errors
+        self.on_failed: Callable[[ScreenDisplay], None] = None
+        # Called when the last running screen stopped
+        self.on_all_stopped: Callable[[], None] = None
+        self.__engine: Optional["AsyncEngine"] = None
+        # Stop the screens and the engine at exit
+        atexit.register(self.stop)
+
+    def engine(self) -> Optional["AsyncEngine"]:
+        """The asyncio display engine if `DISPLAY_ENGINE` selects it, else None."""
+        if consts.DISPLAY_ENGINE != "asyncio":
+            return None
+        if self.__engine is None:
+            from app.hardware_monitor.engine import AsyncEngine
+
+            self.__engine = AsyncEngine(self.sensors)
+        return self.__engine
+
+    def __release_engine(self) -> None:
+        """Shut the engine down once no screen runs, the next screen starts it again."""
+        if self.__engine is not None and not self.is_running():
+            self.__engine.shutdown()
+
+    def screen(self, uid: str) -> Optional[ScreenDisplay]:
+        return self.screens.get(uid, None)
+
+    def is_running(self) -> bool:
+        return any(s.running for s in list(self.screens.values()))
+
+    def set_screens(self, lcds: Dict[str, LCD], primary: str) -> None:
+        """
+        Set the active screens, screens no longer active are stopped and closed.
+        """
+        with self.__lock:
+            # Before any screen is stopped, the new screens run if the display runs
+            was_running = self.is_running()
+            added = list()
+            for uid in list(self.screens):
+                if uid not in lcds:
+                    self.screens.pop(uid).stop()
+            for uid, lcd in lcds.items():
+                screen = self.screens.get(uid)
+                if screen is None or screen.lcd is not lcd:
+                    if screen is not None:
+                        screen.stop()
+                    screen = self.screens[uid] = ScreenDisplay(lcd, self)
+                    added.append(screen)
+            self.primary_uid = primary
+            self.__update_capture_source()
+            if was_running:
+                for screen in added:
+                    screen.start()
+            self.__release_engine()
+
+    def __update_capture_source(self) -> None:
+        native_render = settings.get_monitor_settings().get("nativeRender", False)
+        for uid, screen in self.screens.items():
+            screen.use_webview = uid == self.primary_uid and not native_render
+
+    def reload_settings(self, uid: str = None) -> None:
+        with self.__lock:
+            self.__update_capture_source()
+            for screen in list(self.screens.values()):
+                if uid is None or screen.uid == uid:
+                    screen.load_settings()
+
+    def start(self) -> None:
+        with self.__lock:
+            for screen in self.screens.values():
+                screen.start()
+
+    def stop(self) -> None:
+        with self.__lock:
+            for screen in self.screens.values():
+                screen.stop()
+            self.__release_engine()
+
+    def stats(self) -> Dict[str, dict]:
+        return {uid: s.get_stats() for uid, s in list(self.screens.items())}
+
+    def on_screen_failed(self, screen: ScreenDisplay) -> None:
+        if self.on_failed:
+            self.on_failed(screen)
+        if not self.is_running():
+            if self.on_all_stopped:
+                self.on_all_stopped()
+            with self.__lock:
+                self.__release_engine()
+
+
+display_manager = DisplayManager()
@@ -0,0 +1,330 @@
+"""
+Optional asyncio display engine.
+
+The default display runs every stage of every screen on its own thread. With
+`DISPLAY_ENGINE` set to "asyncio", one event loop thread schedules the frame
+ticks of all screens and the sensor sampling as coroutines instead. The
+blocking work goes through explicit executors: "io" for the webview calls,
+the sensor reads (the weather request included) and the screen writes, "cpu"
+for the PIL decoding and rendering. A slow sensor or screen only holds up its
+own coroutine.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, List, Optional, Set
+from app.hardware_monitor.pipeline import Stage
+from app.hardware_monitor.sampler import SensorSampler
+
+__all__ = ["AsyncEngine", "AsyncPipeline", "DaemonExecutor"]
+
+logger = logging.getLogger()
+
+
+class DaemonExecutor(Executor):
+    """
+    A thread pool of daemon workers, started on demand up to `max_workers`.
+    Unlike `ThreadPoolExecutor`, the interpreter does not join the workers at
+    exit, so a call blocked in a webview or a network request can not hang the
+    app exit, the same as the daemon threads of the thread display engine.
+    """
+
+    def __init__(self, max_workers: int, name: str) -> None:
+        self.max_workers = max_workers
+        self.name = name
+        self.__queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.__lock = threading.Lock()
+        self.__workers = 0
+        self.__idle = 0
+        self.__shutdown = False
+        self.__local = threading.local()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future = Future()
+        with self.__lock:
+            if self.__shutdown:
+                raise RuntimeError(f"Executor <{self.name}> is shut down")
+            self.__queue.put((future, fn, args, kwargs))
+            if self.__queue.qsize() > self.__idle and self.__workers < self.max_workers:
+                self.__workers += 1
+                threading.Thread(
+                    target=self.__work,
+                    name=f"{self.name}-{self.__workers}",
+                    daemon=True,
+                ).start()
+        return future
+
+    def in_worker(self) -> bool:
+        """Whether the caller runs on a worker of this executor."""
+        return getattr(self.__local, "worker", False)
+
+    def __work(self) -> None:
+        self.__local.worker = True
+        while True:
+            with self.__lock:
+                self.__idle += 1
+            item = self.__queue.get()
+            with self.__lock:
+                self.__idle -= 1
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            del future, item
+
+    def shutdown(self, wait: bool = False, *, cancel_futures: bool = False) -> None:
+        """Stop the workers once their calls return, never waits for them."""
+        with self.__lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self.__queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+            for _ in range(self.__workers):
+                self.__queue.put(None)
+
+
+class AsyncPipeline:
+    """
+    Run the stages of a screen as one coroutine of the engine, with the same
+    interface as `FramePipeline`. The stages of a frame run one after another,
+    the ticks missed meanwhile are skipped by the scheduler of the first stage.
+    """
+
+    def __init__(
+        self,
+        engine: "AsyncEngine",
+        stages: List[Stage],
+        on_error: Callable[[Stage, Exception], None] = None,
+    ) -> None:
+        self.engine = engine
+        self.stages = stages
+        self.running = False
+        self.__on_error = on_error
+        self.__task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.running = True
+        self.__task = self.engine.spawn(self.__run())
+
+    def stop(self) -> None:
+        """
+        Stop the coroutine and wait for it to end with the stage call it was
+        running. Safe to call from a stage or the error handler, which do not
+        wait for themselves.
+        """
+        self.running = False
+        task, self.__task = self.__task, None
+        if task is not None:
+            self.engine.cancel(task)
+
+    async def __run_stage(self, stage: Stage, item):
+        args = () if item is None else (item,)
+        start = time.perf_counter()
+        call = asyncio.ensure_future(self.engine.run(stage.executor, stage.func, *args))
+        try:
+            res = await asyncio.shield(call)
+        except asyncio.CancelledError:
+            # Let the running call return first, so a restarted pipeline never
+            # runs a stage alongside the call of the stopped one
+            await asyncio.wait([call])
+            raise
+        except Exception as e:
+            stage.stats.errors += 1
+            logger.error(f"Display pipeline stage <{stage.name}> error: {e}")
+            if self.__on_error:
+                # May stop this pipeline, which cancels this coroutine
+                await self.engine.run("io", self.__on_error, stage, e)
+            return None
+        stage.stats.record(time.perf_counter() - start)
+        return res
+
+    async def __run(self) -> None:
+        first = self.stages[0]
+        while self.running:
+            if first.scheduler is not None:
+                deadline = first.scheduler.next_deadline()
+                await asyncio.sleep(max(deadline - time.monotonic(), 0))
+                first.scheduler.tick(deadline)
+            item = None
+            for stage in self.stages:
+                item = await self.__run_stage(stage, item)
+                if item is None:
+                    break
+
+    def stats(self) -> Dict[str, dict]:
+        res = dict()
+        for stage in self.stages:
+            res[stage.name] = stage.stats.to_dict()
+            if stage.scheduler is not None:
+                res[stage.name]["schedule"] = stage.scheduler.to_dict()
+        return res
+
+
+class AsyncEngine:
+    """
+    One event loop thread with an executor for each kind of blocking work.
+    The loop starts with the first pipeline and runs until `shutdown`, the
+    next pipeline starts it again.
+    """
+
+    def __init__(
+        self, sampler: SensorSampler, io_workers: int = 8, cpu_workers: int = 2
+    ) -> None:
+        self.sampler = sampler
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.executors: Dict[str, DaemonExecutor] = dict()
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+
+    def pipeline(
+        self, stages: List[Stage], on_error: Callable[[Stage, Exception], None] = None
+    ) -> AsyncPipeline:
+        return AsyncPipeline(self, stages, on_error)
+
+    def __ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self.__lock:
+            if self.__loop is None:
+                self.executors = {
+                    "io": DaemonExecutor(self.io_workers, "DisplayIO"),
+                    "cpu": DaemonExecutor(self.cpu_workers, "DisplayCPU"),
+                }
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self.__thread = threading.Thread(
+                    target=self.__run_loop,
+                    args=(loop, ready),
+                    name="DisplayEngine",
+                    daemon=True,
+                )
+                self.__thread.start()
+                ready.wait()
+                self.__loop = loop
+                # The engine samples the sensors instead of the sampler thread
+                self.sampler.set_external(True)
+                loop.call_soon_threadsafe(lambda: loop.create_task(self.__sample_sensors()))
+                logger.info("Asyncio display engine started")
+            return self.__loop
+
+    @staticmethod
+    def __run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+        loop.close()
+
+    def in_loop(self) -> bool:
+        return threading.current_thread() is self.__thread
+
+    def in_worker(self) -> bool:
+        return any(e.in_worker() for e in list(self.executors.values()))
+
+    async def run(self, executor: str, func: Callable, *args):
+        """Run the blocking function on the executor of its kind."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executors[executor], func, *args)
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Start the coroutine as a task of the engine loop, from any thread."""
+        loop = self.__ensure_loop()
+
+        async def create():
+            return asyncio.ensure_future(coro)
+
+        if self.in_loop():
+            return loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(create(), loop).result()
+
+    def cancel(self, task: asyncio.Task, timeout: float = 5) -> None:
+        """
+        Cancel the task and wait until it has ended, so a stopped pipeline never
+        runs alongside its restart. From the loop itself or a call running on
+        the executors, which the task may be waiting for, it is only requested.
+        """
+        loop = self.__loop
+        if loop is None or task.done():
+            return
+        if self.in_loop():
+            task.cancel()
+            return
+        if self.in_worker():
+            loop.call_soon_threadsafe(task.cancel)
+            return
+
+        async def cancel_and_wait():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        try:
+            future = asyncio.run_coroutine_threadsafe(cancel_and_wait(), loop)
+            future.result(timeout)
+        except Exception as e:
+            logger.warning(f"Display engine task cancel error: {e}")
+
+    async def __sample_sensors(self) -> None:
+        """Sample each due sensor as its own job, a slow one does not delay the others."""
+        in_flight: Set[str] = set()
+
+        async def sample(sensor: str) -> None:
+            try:
+                await self.run("io", self.sampler.sample, [sensor])
+            finally:
+                in_flight.discard(sensor)
+
+        while True:
+            due, timeout = self.sampler.due(time.monotonic())
+            for sensor in due:
+                if sensor not in in_flight:
+                    in_flight.add(sensor)
+                    asyncio.ensure_future(sample(sensor))
+            # A sensor still in flight is due again as soon as it is sampled
+            if in_flight:
+                timeout = min(timeout, 0.05)
+            await asyncio.sleep(min(max(timeout, 0.01), 1))
+
+    def is_running(self) -> bool:
+        return self.__loop is not None
+
+    def shutdown(self, timeout: float = 5) -> None:
+        """
+        Cancel the tasks, stop the loop and the executors, and give the sensor
+        sampling back to the sampler thread. The calls still running on the
+        executors are not waited for. From the loop itself it can only be
+        requested.
+        """
+        with self.__lock:
+            loop, self.__loop = self.__loop, None
+            thread, executors = self.__thread, self.executors
+        if loop is None:
+            return
+
+        async def stop():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(stop(), loop)
+        if threading.current_thread() is not thread:
+            thread.join(timeout)
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.sampler.set_external(False)
+        logger.info("Asyncio display engine stopped")
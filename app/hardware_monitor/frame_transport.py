@@ -0,0 +1,200 @@
+"""
+Binary frame transport from the ThemePlayer window.
+
+The ThemePlayer page posts the raw RGBA pixels of its canvas to a loopback
+HTTP endpoint, so the display loop gets a ready image without the base64
+data URL and JPEG round trip of `window.playerToImageSrc()`.
+
+The same server serves the images and fonts of the asset store to the pages,
+so the themes are sent to the UI with URLs instead of inlined assets.
+"""
+
+import logging
+import mimetypes
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from PIL import Image
+from app.hardware_monitor.theme_assets import AssetStore, asset_store, resolve_theme
+
+__all__ = ["frame_receiver", "Frame", "FrameReceiver"]
+
+logger = logging.getLogger()
+
+
+class Frame:
+    """A raw RGBA frame received from the ThemePlayer window."""
+
+    __slots__ = ("seq", "width", "height", "data")
+
+    def __init__(self, seq: int, width: int, height: int, data: bytes) -> None:
+        self.seq = seq
+        self.width = width
+        self.height = height
+        self.data = data
+
+    def fingerprint(self) -> int:
+        return hash(self.data)
+
+    def to_image(self) -> Image.Image:
+        img = Image.frombuffer(
+            "RGBA", (self.width, self.height), self.data, "raw", "RGBA", 0, 1
+        )
+        return img.convert("RGB")
+
+
+class FrameReceiver:
+    """
+    Loopback HTTP server receiving frames posted by the ThemePlayer window,
+    and serving the assets of the themes. The url path contains a random token,
+    so only our own pages can post frames and read the assets.
+    """
+
+    max_frame_size = 8192 * 8192 * 4
+
+    def __init__(self, assets: AssetStore = None) -> None:
+        self.assets = assets
+        self.token = secrets.token_hex(16)
+        self.__server: Optional[ThreadingHTTPServer] = None
+        self.__cond = threading.Condition()
+        self.__frame: Optional[Frame] = None
+        self.__seq = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}/{self.token}/frame"
+
+    @property
+    def assets_url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}/{self.token}/assets"
+
+    def is_running(self) -> bool:
+        return self.__server is not None
+
+    def start(self) -> None:
+        if self.__server is not None:
+            return
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), self.__handler())
+        self.__server.daemon_threads = True
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        logger.debug(f"Frame receiver listening on {self.url}")
+
+    def stop(self) -> None:
+        if self.__server is None:
+            return
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__server = None
+
+    def resolve_assets(self, content: str) -> str:
+        """The theme content for the pages, with the asset references as URLs."""
+        self.start()
+        return resolve_theme(content, self.assets_url)
+
+    def next_seq(self) -> int:
+        with self.__cond:
+            self.__seq += 1
+            return self.__seq
+
+    def put(self, frame: Frame) -> None:
+        with self.__cond:
+            # Latest frame wins, late frames of old requests are dropped
+            if self.__frame is None or frame.seq >= self.__frame.seq:
+                self.__frame = frame
+            self.__cond.notify_all()
+
+    def wait_frame(self, seq: int, timeout: float = 1) -> Optional[Frame]:
+        """Wait for the frame with the sequence number `seq` or a newer one."""
+        with self.__cond:
+            self.__cond.wait_for(
+                lambda: self.__frame is not None and self.__frame.seq >= seq,
+                timeout=timeout,
+            )
+            if self.__frame is None or self.__frame.seq < seq:
+                return None
+            return self.__frame
+
+    def __handler(self):
+        receiver = self
+        path = f"/{self.token}/frame"
+        assets_path = f"/{self.token}/assets/"
+
+        class FrameRequestHandler(BaseHTTPRequestHandler):
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def send_cors_headers(self) -> None:
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+                self.send_header("Access-Control-Allow-Headers", "Content-Type")
+                self.send_header("Access-Control-Allow-Private-Network", "true")
+
+            def do_OPTIONS(self) -> None:
+                self.send_response(204)
+                self.send_cors_headers()
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                url = urlparse(self.path)
+                try:
+                    if url.path != path:
+                        raise PermissionError("invalid frame path")
+                    seq, width, height = self.parse_query(url.query)
+                    length = int(self.headers.get("Content-Length", 0))
+                    if length != width * height * 4 or length > receiver.max_frame_size:
+                        raise ValueError(f"invalid frame size {length}")
+                    data = self.rfile.read(length)
+                except Exception as e:
+                    logger.error(f"Frame receiver error: {e}")
+                    self.send_response(400)
+                    self.send_cors_headers()
+                    self.end_headers()
+                    return
+                receiver.put(Frame(seq, width, height, data))
+                self.send_response(204)
+                self.send_cors_headers()
+                self.end_headers()
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                try:
+                    if receiver.assets is None or not url.path.startswith(assets_path):
+                        raise PermissionError("invalid asset path")
+                    name = url.path[len(assets_path) :]
+                    filepath = receiver.assets.path(name)
+                    with open(filepath, "rb") as fp:
+                        data = fp.read()
+                except Exception as e:
+                    logger.error(f"Asset server error: {e}")
+                    self.send_response(404)
+                    self.send_cors_headers()
+                    self.end_headers()
+                    return
+                mime = mimetypes.guess_type(filepath)[0] or "application/octet-stream"
+                self.send_response(200)
+                self.send_cors_headers()
+                self.send_header("Content-Type", mime)
+                self.send_header("Content-Length", str(len(data)))
+                # Named by the hash of the content, it never changes
+                self.send_header("Cache-Control", "max-age=31536000, immutable")
+                self.end_headers()
+                self.wfile.write(data)
+
+            @staticmethod
+            def parse_query(query: str) -> Tuple[int, int, int]:
+                params = parse_qs(query)
+                return (
+                    int(params["seq"][0]),
+                    int(params["width"][0]),
+                    int(params["height"][0]),
+                )
+
+        return FrameRequestHandler
+
+
+frame_receiver = FrameReceiver(asset_store)
@@ -0,0 +1,205 @@
+"""
+In-memory history of the sensor values.
+
+Every numeric attribute of a sampled sensor is kept in fixed-size NumPy ring
+buffers at three resolutions: the raw samples, 10 second buckets and 1 minute
+buckets, the buckets keep the min, max and mean of their samples. All buffers
+are allocated when the attribute is first recorded, so the memory of each
+attribute is known up front (`SeriesHistory.nbytes`) and never grows.
+"""
+
+import base64
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+__all__ = [
+    "sensor_history",
+    "SensorHistory",
+    "SeriesHistory",
+    "RESOLUTIONS",
+    "encode_series",
+    "decode_series",
+]
+
+# Resolution name: (bucket seconds, capacity), 0 seconds keeps the raw samples
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "raw": (0, 3600),  # 1 hour of 1 second samples
+    "10s": (10, 8640),  # 24 hours
+    "1m": (60, 10080),  # 7 days
+}
+
+
+# Columns of the raw samples and of the buckets
+COLUMNS = (["value"], ["min", "max", "mean"])
+
+
+def encode_series(times: np.ndarray, values: np.ndarray, columns: List[str]) -> dict:
+    """
+    Encode the rows as base64 strings, serializing thousands of floats to JSON
+    one by one costs far more than the query. "t" is the little-endian float64
+    timestamps, "values" the little-endian float32 values row by row, with
+    len(columns) values per row.
+    """
+    return {
+        "count": len(times),
+        "columns": columns,
+        "t": base64.b64encode(times.astype("<f8", copy=False).tobytes()).decode(),
+        "values": base64.b64encode(values.astype("<f4", copy=False).tobytes()).decode(),
+    }
+
+
+def decode_series(res: dict) -> Dict[str, np.ndarray]:
+    """The arrays of an encoded query result: "t" and one for each column."""
+    times = np.frombuffer(base64.b64decode(res["t"]), dtype="<f8")
+    values = np.frombuffer(base64.b64decode(res["values"]), dtype="<f4")
+    values = values.reshape(res["count"], len(res["columns"]))
+    arrays = {"t": times}
+    for i, column in enumerate(res["columns"]):
+        arrays[column] = values[:, i]
+    return arrays
+
+
+class Ring:
+    """Fixed-size ring buffer of timestamped rows, the oldest row is overwritten."""
+
+    def __init__(self, capacity: int, columns: int) -> None:
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, columns), dtype=np.float32)
+        self.count = 0
+        self.head = 0  # Index of the next row
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+    def append(self, t: float, row) -> None:
+        self.times[self.head] = t
+        self.values[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def since(self, start: float) -> Tuple[np.ndarray, np.ndarray]:
+        """The rows with time >= `start`, oldest first."""
+        if self.count < self.capacity:
+            times, values = self.times[: self.count], self.values[: self.count]
+            i = np.searchsorted(times, start)
+            return times[i:], values[i:]
+        # Search the two sorted segments and only copy the rows in the window
+        head = self.head
+        old_t, new_t = self.times[head:], self.times[:head]
+        i = np.searchsorted(old_t, start)
+        if i < len(old_t):
+            return (
+                np.concatenate((old_t[i:], new_t)),
+                np.concatenate((self.values[head + i :], self.values[:head])),
+            )
+        j = np.searchsorted(new_t, start)
+        return new_t[j:], self.values[j:head]
+
+
+class SeriesHistory:
+    """The history of one sensor attribute at every resolution."""
+
+    def __init__(self) -> None:
+        self.rings: Dict[str, Ring] = dict()
+        # The open bucket of each aggregated resolution: [start, min, max, sum, count]
+        self.buckets: Dict[str, list] = dict()
+        for name, (seconds, capacity) in RESOLUTIONS.items():
+            self.rings[name] = Ring(capacity, 1 if seconds == 0 else 3)
+            if seconds:
+                self.buckets[name] = [0.0, 0.0, 0.0, 0.0, 0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self.rings.values())
+
+    def append(self, t: float, value: float) -> None:
+        for name, (seconds, _) in RESOLUTIONS.items():
+            if seconds == 0:
+                self.rings[name].append(t, value)
+                continue
+            bucket = self.buckets[name]
+            start = t - t % seconds
+            if bucket[4] and bucket[0] != start:
+                self.__close(name, bucket)
+            if not bucket[4]:
+                bucket[:] = [start, value, value, value, 1]
+            else:
+                bucket[1] = min(bucket[1], value)
+                bucket[2] = max(bucket[2], value)
+                bucket[3] += value
+                bucket[4] += 1
+
+    def __close(self, name: str, bucket: list) -> None:
+        start, vmin, vmax, total, count = bucket
+        self.rings[name].append(start, (vmin, vmax, total / count))
+        bucket[4] = 0
+
+    def query(self, start: float, resolution: str) -> dict:
+        times, values = self.rings[resolution].since(start)
+        if resolution != "raw":
+            # Include the bucket still being filled
+            bucket = self.buckets[resolution]
+            if bucket[4] and bucket[0] >= start:
+                times = np.append(times, bucket[0])
+                row = (bucket[1], bucket[2], bucket[3] / bucket[4])
+                values = np.concatenate((values, np.array([row], dtype=values.dtype)))
+        return encode_series(times, values, COLUMNS[resolution != "raw"])
+
+
+class SensorHistory:
+    """
+    The history of all sensor attributes, fed with the sensor status by the
+    sampler. Only numeric attributes are kept, and at most `max_series`
+    attributes, so the memory is bounded by `max_nbytes()`.
+    """
+
+    max_series = 32  # About 13 MB at most
+
+    def __init__(self) -> None:
+        self.__series: Dict[Tuple[str, str], SeriesHistory] = dict()
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def max_nbytes(cls) -> int:
+        return cls.max_series * SeriesHistory().nbytes
+
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in list(self.__series.values()))
+
+    def record(self, sensor: str, status: dict, t: float) -> None:
+        with self.__lock:
+            for attribute, value in status.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                series = self.__series.get((sensor, attribute), None)
+                if series is None:
+                    if len(self.__series) >= self.max_series:
+                        continue
+                    series = self.__series[(sensor, attribute)] = SeriesHistory()
+                series.append(t, value)
+
+    def query(
+        self, sensor: str, attribute: str, window: float, resolution: str, now: float
+    ) -> Optional[dict]:
+        """
+        The values of the last `window` seconds, None if the attribute has no
+        history. Raise ValueError for an unknown resolution.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(
+                f"Unknown resolution <{resolution}>, expect one of {list(RESOLUTIONS)}"
+            )
+        series = self.__series.get((sensor, attribute), None)
+        if series is None:
+            return None
+        with self.__lock:
+            return series.query(now - window, resolution)
+
+    def attributes(self) -> List[Tuple[str, str]]:
+        return list(self.__series)
+
+
+sensor_history = SensorHistory()
@@ -6,20 +6,24 @@ Configure the hardware monitor:
 4. Set the screen display rotation angle.
 """
 
-import json
 import logging
 import os
 import threading
-import time
-from typing import List
+from typing import Dict, List
 from app import consts
 from app.i18n import t
 from app.ui import UIAPIBase
 from app.setting import settings
 from app.ui import UIWindowManager
-from app.util import del_win_startup, image_from_base64, set_win_startup
-from app.hardware_monitor.sensors import SensorsMap, weather
-from libs.lcds import LCD, find_connected_screens, lcd_virtual_screen
+from app.util import del_win_startup, set_win_startup
+from app.hardware_monitor.sensors import backend_stats, sensors_stats, weather
+from app.hardware_monitor.display import ScreenDisplay, display_manager
+from app.hardware_monitor.frame_transport import frame_receiver
+from app.hardware_monitor.sampler import sensor_sampler
+from app.hardware_monitor.theme_assets import write_theme_file
+from app.hardware_monitor.theme_cache import theme_cache, theme_path
+from app.hardware_monitor.theme_index import theme_index
+from libs.lcds import LCD, find_connected_screens
 
 __all__ = ["hardware_monitor_api"]
 
@@ -32,17 +36,15 @@ class HardwareMonitorAPI(UIAPIBase):
     def __init__(self) -> None:
         self.__lcd: LCD = None
         self.__settings = settings
-        self.__brightness = 100
-        self.__rotation = 0
-        self.__display = False
         self.__connected_screens = dict()
+        display_manager.on_failed = self.__on_screen_failed
+        display_manager.on_all_stopped = self.__stop_display
 
     def __del__(self) -> None:
-        if self.__lcd:
-            try:
-                self.__lcd.close()
-            except Exception as e:
-                logger.error(e)
+        try:
+            display_manager.stop()
+        except Exception as e:
+            logger.error(e)
 
     def loadScreens(self) -> List[str]:
         """
@@ -64,21 +66,7 @@ class HardwareMonitorAPI(UIAPIBase):
         return res
 
     def loadThemes(self) -> List[dict]:
-        res = list()
-        for filename in os.listdir(consts.THEMES_DIR):
-            if not filename.endswith(".json"):
-                continue
-            item = dict()
-            item["name"] = filename[:-5]
-            filepath: str = os.path.join(consts.THEMES_DIR, filename)
-            with open(filepath, "r", encoding="utf-8") as fp:
-                _theme = json.load(fp)
-                item["shape"] = _theme["shape"]
-                item["width"] = _theme.get("width", 0)
-                item["height"] = _theme.get("height", 0)
-                item["radius"] = _theme.get("radius", 0)
-            res.append(item)
-        res.sort(key=lambda x: x["name"])
+        res = theme_index.themes()
         logger.debug(f"Get the list of available themes")
         return res
 
@@ -90,38 +78,32 @@ class HardwareMonitorAPI(UIAPIBase):
                 msg=t("msg.ThemeFileSameNameReplace"),
             ):
                 return
-        with open(savepath, "w", encoding="utf-8") as fp:
-            fp.write(content)
+        write_theme_file(savepath, content)
+        theme_cache.invalidate(savepath)
+        theme_index.update(savepath)
         self.showinfo(t("msg.ThemeFileImportSuccess"))
 
     def deleteTheme(self, filename: str) -> None:
-        savepath = os.path.join(consts.THEMES_DIR, f"{filename}.json")
+        savepath = theme_path(filename)
         if os.path.exists(savepath):
             os.remove(savepath)
+            theme_cache.invalidate(savepath)
+            theme_index.remove(savepath)
             self.showinfo(t("msg.ThemeFileDeleteSuccess"))
 
     def selectScreen(self, uid: str) -> bool:
         # try to match a screen driver
         driver = self.__connected_screens.get(uid, None)
         with DisplayLock:
-            if self.__lcd is not None:
-                if self.__lcd.unique_id() == uid:
-                    # If the same screen is selected, do nothing.
-                    return True
-                # Close the prev screen dirver
-                try:
-                    self.__lcd.close()
-                except Exception:
-                    pass
-            # Set the new screen driver
+            if self.__lcd is not None and self.__lcd.unique_id() == uid:
+                # If the same screen is selected, do nothing.
+                return True
+            # Set the new screen driver, the prev screen is closed if not active
             self.__lcd = driver
-        # If selected screen, update the screen settings
+            self.__sync_screens()
+        # If selected screen, update the screen brightness
         if self.__lcd:
-            screen_settings = settings.get_screen_settings(uid)
-            # Initialize the screen brightness and rotation angle.
-            self.__brightness = screen_settings.get("brightness", 100)
-            self.__rotation = screen_settings.get("rotation", 0)
-            self.__set_brightness()
+            self.__set_brightness(uid)
             logger.debug(f"Screen <{uid}> selected")
         else:
             logger.debug(f"Screen selected clean")
@@ -129,14 +111,22 @@ class HardwareMonitorAPI(UIAPIBase):
         settings.set_monitor_settings({"lastScreen": uid if driver else ""})
         return self.__lcd is not None
 
+    def setActiveScreens(self, screens: List[str]) -> None:
+        """
+        Set the screens displayed together with the selected screen.
+        """
+        settings.set_monitor_settings({"activeScreens": screens})
+        with DisplayLock:
+            self.__sync_screens()
+        logger.debug(f"Set the active screens: {screens}")
+
     def selectTheme(self, theme: str) -> str:
         theme_content = ""
         # Try to get the theme file content
         if theme:
             try:
-                filepath: str = os.path.join(consts.THEMES_DIR, f"{theme}.json")
-                with open(filepath, "r", encoding="utf-8") as fp:
-                    theme_content: str = fp.read()
+                theme_content: str = theme_cache.content(theme_path(theme))
+                theme_content = frame_receiver.resolve_assets(theme_content)
             except Exception as e:
                 logger.error(e)
                 self.showerror(t("msg.ThemeFileLoadFailed"))
@@ -144,7 +134,11 @@ class HardwareMonitorAPI(UIAPIBase):
         # if there screen is selected, update the screen setting
         if self.__lcd:
             logger.debug(f"Update screen settings <lastTheme:{theme}>")
-            settings.set_screen_settings(self.__lcd.unique_id(), {"lastTheme": theme})
+            uid = self.__lcd.unique_id()
+            settings.set_screen_settings(uid, {"lastTheme": theme})
+            screen = display_manager.screen(uid)
+            if screen is not None:
+                screen.load_theme(theme)
         # async state to
         with DisplayLock:
             try:
@@ -167,23 +161,25 @@ class HardwareMonitorAPI(UIAPIBase):
     def setScreenSettings(self, screen: str, settings: dict) -> None:
         self.__settings.set_screen_settings(screen, settings)
         # update screen settings
-        self.__brightness = settings.get("brightness", 100)
-        self.__rotation = settings.get("rotation", 0)
-        self.__set_brightness()
+        display_manager.reload_settings(screen)
+        self.__set_brightness(screen)
         logger.debug(f"Set the screen <{screen}> settings: {settings}")
 
     def getMonitorSettings(self) -> dict:
-        res = self.__settings.get_monitor_settings()
+        # A copy, the display state is not a setting to save
+        res = dict(self.__settings.get_monitor_settings())
         logger.debug(f"Get the monitor settings: {res}")
         # add display state
-        res["displayState"] = self.__display
+        res["displayState"] = display_manager.is_running()
         return res
 
     def setMonitorSettings(self, settings: dict) -> None:
         self.__settings.set_monitor_settings(settings)
-        # update weather sensor
-        weather_settings = settings.get("weather", {})
-        weather.set_conf(**weather_settings)
+        display_manager.reload_settings()
+        # update weather sensor, a weather not used yet reads the settings when created
+        if weather.is_ready():
+            weather_settings = settings.get("weather", {})
+            weather.set_conf(**weather_settings)
         # update startup
         startup = settings.get("startup", False)
         self.__set_start_up(startup)
@@ -199,20 +195,44 @@ class HardwareMonitorAPI(UIAPIBase):
             self.__stop_display()
         logger.debug(f"Switch the screen display: {display}")
 
+    def getDisplayStats(self) -> dict:
+        """
+        Get the display statistics of every active screen.
+        """
+        return display_manager.stats()
+
     def getSensorsValue(self, sensors: List[str]) -> dict:
         """
         Get the sensor data.
         """
-        res = dict()
-        for sensor in sensors:
-            instance = SensorsMap.get(sensor, None)
-            if instance:
-                try:
-                    res[sensor] = instance.status()
-                except Exception as e:
-                    logger.error(f"Sensor <{sensor}> error: {e}")
         # logger.debug(f"Get the sensor data: {sensors}")
-        return res
+        return sensor_sampler.read(sensors)
+
+    def getSensorsHistory(
+        self, sensor: str, attribute: str, window: float, resolution: str = "raw"
+    ) -> dict:
+        """
+        Get the sensor attribute values of the last `window` seconds.
+        `resolution` is "raw", "10s" or "1m", the aggregated resolutions
+        return the min, max and mean of each bucket. The rows are encoded as
+        base64 arrays, see `history.encode_series`.
+        """
+        try:
+            return sensor_sampler.read_history(sensor, attribute, window, resolution)
+        except ValueError as e:
+            logger.error(e)
+            return None
+
+    def getSensorsStats(self) -> dict:
+        """
+        Get the cache and read latency statistics of every sensor,
+        the statistics of the sensor backend and of the theme cache.
+        """
+        return {
+            "sensors": sensors_stats(),
+            "backend": backend_stats(),
+            "themes": theme_cache.stats(),
+        }
 
     def __set_start_up(self, startup: bool) -> None:
         """
@@ -232,109 +252,55 @@ class HardwareMonitorAPI(UIAPIBase):
             del_win_startup(name)
         logger.info(f"Set startup on boot: {startup}")
 
-    def __set_brightness(self) -> None:
+    def __active_screens(self) -> Dict[str, LCD]:
         """
-        Set the screen brightness.
+        The selected screen and the other connected screens in `activeScreens`.
         """
-        for i in range(3):  # Try 3 times
-            with DisplayLock:
-                # Pessimistic lock to prevent UI thread blocking
-                if not self.__lcd:
-                    logger.debug("Screen not selected, set brightness failed.")
-                    return
-                try:
-                    if not self.__lcd.is_open():
-                        self.__lcd.open()
-                    self.__lcd.set_brightness(self.__brightness)
-                except Exception as e:
-                    logger.error(e)
-                    # Try to close the screen and retry
-                    self.__lcd.close()
-                    if i == 2:
-                        self.showerror(t("msg.BrightnessSetFailed"))
-                    time.sleep(1)
-                else:
-                    logger.debug(
-                        f"Set the screen<{self.__lcd.unique_id()}> brightness: {self.__brightness}"
-                    )
-                    break
-
-    def __display_loop(self) -> None:
+        res = dict()
+        if self.__lcd is not None:
+            res[self.__lcd.unique_id()] = self.__lcd
+        for uid in self.__settings.get_monitor_settings().get("activeScreens", []):
+            lcd = self.__connected_screens.get(uid, None)
+            if lcd is not None:
+                res[uid] = lcd
+        return res
+
+    def __sync_screens(self) -> None:
+        primary = self.__lcd.unique_id() if self.__lcd else ""
+        display_manager.set_screens(self.__active_screens(), primary)
+
+    def __set_brightness(self, uid: str) -> None:
         """
-        Screen display loop.
+        Set the screen brightness.
         """
-        if self.__display:  # Already displaying
+        screen = display_manager.screen(uid)
+        if screen is None:
+            logger.debug("Screen not selected, set brightness failed.")
             return
-        self.__display = True
-        error_limit = 10
-        error_count = 0
-        while self.__display and self.__lcd:
-            try:
-                start = time.time()
-                if not self.__lcd.is_open():
-                    with DisplayLock:
-                        # Pessimistic lock to prevent UI thread blocking
-                        if not (self.__display and self.__lcd):
-                            break
-                        self.__lcd.close()
-                        self.__lcd.open()
-                imgSrc = UIWindowManager.theme_player_window().evaluate_js(
-                    "window.playerToImageSrc()"
-                )
-                if not imgSrc:
-                    continue
-                img = image_from_base64(imgSrc)
-                if self.__lcd.unique_id() != lcd_virtual_screen.unique_id():
-                    img = img.rotate(self.__rotation, expand=True)
-                # Display the image
-                with DisplayLock:
-                    # Pessimistic lock to prevent UI thread blocking
-                    if not (self.__display and self.__lcd):
-                        break
-                    self.__lcd.display(img)
-                cost_time = time.time() - start
-                logger.info(
-                    f"Screen <{self.__lcd.unique_id()}> display succeeded. Time taken: {cost_time:.2f}s"
-                )
-            except Exception as e:
-                logger.error(e)
-                with DisplayLock:
-                    # Pessimistic lock to prevent UI thread blocking
-                    if not (self.__display and self.__lcd):
-                        break
-                    self.__lcd.close()
-                error_count += 1
-                if error_count > error_limit:
-                    logger.warning(
-                        "The number of screen display exceptions has reached the limit. Automatically exiting..."
-                    )
-                    self.showerror(t("msg.ScreenDisplayFailed"))
-                    break
-                logger.warning(f"Screen connection exception. Retrying...{error_count}")
-                time.sleep(1)
-            else:
-                error_count = 0
-                time.sleep(0.1 if cost_time > 1 else 1 - cost_time)
-
-        self.__stop_display()
+        try:
+            screen.set_brightness()
+        except Exception as e:
+            logger.error(e)
+            self.showerror(t("msg.BrightnessSetFailed"))
+
+    def __on_screen_failed(self, screen: ScreenDisplay) -> None:
+        self.showerror(f"{t('msg.ScreenDisplayFailed')}: {screen.uid}")
 
     def __start_display(self) -> None:
         """
-        Display the hardware status.
+        Display the hardware status on all active screens.
         """
         with DisplayLock:
-            t = threading.Thread(target=self.__display_loop, daemon=True)
-            t.start()
+            self.__sync_screens()
+            display_manager.start()
         logger.info("Screen display started.")
 
     def __stop_display(self) -> None:
         """
-        Turn off the screen.
+        Turn off the screens.
         """
         with DisplayLock:
-            self.__display = False
-            if self.__lcd and self.__lcd.is_open():
-                self.__lcd.close()
+            display_manager.stop()
             if UIWindowManager.HWMonitorWindow:
                 UIWindowManager.HWMonitorWindow.evaluate_js("window.flushDisplay(0)")
         logger.info("Screen display stopped.")
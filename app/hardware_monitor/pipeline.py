@@ -0,0 +1,262 @@
+"""
+Frame pipeline of the screen display.
+
+Every stage runs on its own worker thread and the stages are connected by
+single-slot queues with a latest-frame-wins drop policy: when a stage is slower
+than its producer, the waiting frame is replaced by the newer one, so stale
+frames never queue up and throughput approaches the slowest single stage.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+__all__ = ["LatestSlot", "FrameScheduler", "Stage", "FramePipeline"]
+
+logger = logging.getLogger()
+
+
+class LatestSlot:
+    """A bounded queue of one item, putting a new item drops the waiting one."""
+
+    def __init__(self) -> None:
+        self.__cond = threading.Condition()
+        self.__item = None
+        self.__has_item = False
+        self.__closed = False
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        with self.__cond:
+            if self.__has_item:
+                self.dropped += 1
+            self.__item = item
+            self.__has_item = True
+            self.__cond.notify()
+
+    def get(self, timeout: float = None):
+        """Return the waiting item, or None when closed or timed out."""
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.__has_item or self.__closed, timeout)
+            if not self.__has_item:
+                return None
+            item, self.__item, self.__has_item = self.__item, None, False
+            return item
+
+    def close(self) -> None:
+        with self.__cond:
+            self.__closed = True
+            self.__item, self.__has_item = None, False
+            self.__cond.notify_all()
+
+
+class FrameScheduler:
+    """
+    Pace frames on the monotonic clock against absolute deadlines.
+
+    Deadlines advance by whole periods from the previous deadline, so the frame
+    rate does not drift with the frame cost; after a stall the missed deadlines
+    are counted and skipped instead of bursting to catch up. With
+    `align_to_second` the deadlines are put on the wall-clock period boundaries
+    plus `align_offset`, so a clock on the screen never skips or repeats a
+    second. The wall clock is only used for the phase, so a clock change
+    affects a single interval.
+    """
+
+    min_fps = 0.2
+    max_fps = 30
+
+    def __init__(
+        self, fps: float = 1, align_to_second: bool = False, align_offset: float = 0.02
+    ) -> None:
+        self.align_to_second = align_to_second
+        self.align_offset = align_offset
+        self.set_fps(fps)
+        self.__deadline: Optional[float] = None
+        self.ticks = 0
+        self.missed = 0
+        self.__jitter_total = 0.0
+        self.__jitter_max = 0.0
+
+    def set_fps(self, fps: float) -> None:
+        self.fps = min(max(fps, self.min_fps), self.max_fps)
+        self.period = 1 / self.fps
+        self.__deadline = None
+
+    def __next_deadline(self, now: float) -> float:
+        if self.align_to_second:
+            wall = time.time()
+            phase = (wall - self.align_offset) % self.period
+            deadline = now + self.period - phase
+            if self.__deadline is not None:
+                self.missed += max(int(round((deadline - self.__deadline) / self.period)) - 1, 0)
+            return deadline
+        if self.__deadline is None:
+            return now
+        deadline = self.__deadline + self.period
+        if now > deadline + self.period:
+            # Skip the missed deadlines and keep the phase
+            missed = int((now - deadline) // self.period)
+            self.missed += missed
+            deadline += missed * self.period
+        return deadline
+
+    def next_deadline(self) -> float:
+        """The monotonic time of the next frame, pass it to `tick` when reached."""
+        return self.__next_deadline(time.monotonic())
+
+    def tick(self, deadline: float) -> None:
+        """Record the frame of the deadline as started."""
+        jitter = time.monotonic() - deadline
+        self.__deadline = deadline
+        self.ticks += 1
+        self.__jitter_total += abs(jitter)
+        self.__jitter_max = max(self.__jitter_max, abs(jitter))
+
+    def wait(self, stop_event: threading.Event = None) -> bool:
+        """
+        Sleep until the next deadline, return False if stopped while waiting.
+        """
+        deadline = self.next_deadline()
+        timeout = deadline - time.monotonic()
+        if timeout > 0:
+            if stop_event is not None:
+                if stop_event.wait(timeout):
+                    return False
+            else:
+                time.sleep(timeout)
+        self.tick(deadline)
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "fps": self.fps,
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "jitter_avg_ms": (
+                round(self.__jitter_total / self.ticks * 1000, 2) if self.ticks else 0
+            ),
+            "jitter_max_ms": round(self.__jitter_max * 1000, 2),
+        }
+
+
+class StageStats:
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, cost: float) -> None:
+        self.frames += 1
+        self.total_time += cost
+        self.last_time = cost
+        self.max_time = max(self.max_time, cost)
+
+    def to_dict(self) -> dict:
+        return {
+            "frames": self.frames,
+            "errors": self.errors,
+            "avg_ms": round(self.total_time / self.frames * 1000, 2) if self.frames else 0,
+            "last_ms": round(self.last_time * 1000, 2),
+            "max_ms": round(self.max_time * 1000, 2),
+        }
+
+
+class Stage:
+    """
+    A pipeline stage. `func` takes the item from the previous stage and returns
+    the item for the next one, returning None drops the item. The first stage
+    is called without an item, it produces the frames paced by `scheduler`.
+    `executor` is the kind of work of the stage, "io" or "cpu", the asyncio
+    display engine runs the stage on the executor of that kind.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        scheduler: FrameScheduler = None,
+        executor: str = "cpu",
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.scheduler = scheduler
+        self.executor = executor
+        self.input: Optional[LatestSlot] = None
+        self.output: Optional[LatestSlot] = None
+        self.stats = StageStats()
+
+    def run(self, pipeline: "FramePipeline") -> None:
+        while pipeline.running:
+            if self.input is None:
+                item = None
+                if self.scheduler and not self.scheduler.wait(pipeline.stop_event):
+                    break
+            else:
+                item = self.input.get(timeout=1)
+                if item is None:
+                    continue
+            start = time.perf_counter()
+            try:
+                res = self.func() if self.input is None else self.func(item)
+            except Exception as e:
+                self.stats.errors += 1
+                pipeline.on_error(self, e)
+            else:
+                self.stats.record(time.perf_counter() - start)
+                if res is not None and self.output is not None:
+                    self.output.put(res)
+
+
+class FramePipeline:
+    """Connect the stages with latest-frame slots and run each on a worker thread."""
+
+    def __init__(
+        self, stages: List[Stage], on_error: Callable[[Stage, Exception], None] = None
+    ) -> None:
+        self.stages = stages
+        self.running = False
+        self.stop_event = threading.Event()
+        self.__on_error = on_error
+        self.__slots: List[LatestSlot] = list()
+        for prev, next in zip(stages, stages[1:]):
+            slot = LatestSlot()
+            prev.output = slot
+            next.input = slot
+            self.__slots.append(slot)
+
+    def on_error(self, stage: Stage, e: Exception) -> None:
+        logger.error(f"Display pipeline stage <{stage.name}> error: {e}")
+        if self.__on_error:
+            self.__on_error(stage, e)
+
+    def start(self) -> None:
+        self.running = True
+        for stage in self.stages:
+            threading.Thread(
+                target=stage.run,
+                args=(self,),
+                name=f"DisplayStage-{stage.name}",
+                daemon=True,
+            ).start()
+
+    def stop(self) -> None:
+        """Stop the workers, safe to call from a stage."""
+        self.running = False
+        self.stop_event.set()
+        for slot in self.__slots:
+            slot.close()
+
+    def stats(self) -> Dict[str, dict]:
+        res = dict()
+        for stage in self.stages:
+            res[stage.name] = stage.stats.to_dict()
+            if stage.input is not None:
+                res[stage.name]["dropped"] = stage.input.dropped
+            if stage.scheduler is not None:
+                res[stage.name]["schedule"] = stage.scheduler.to_dict()
+        return res
@@ -0,0 +1,550 @@
+"""
+Headless theme renderer, draws the fabric.js `canvasJSON` of a theme with Pillow.
+
+It mirrors `ThemePlayer` of the UI: text items are drawn with `Text`, weather and
+custom images with `Image`, and the `BarChart` and `DonutChart` groups are updated
+the same way as `ThemePlayer.updateObjectValue`. The sensor values are bound from
+`SensorsMap` results, so the display loop can produce frames without the webview.
+The `asset:` references of the images and fonts are read from the asset store.
+"""
+
+import base64
+import glob
+import json
+import logging
+import math
+import os
+import re
+import time
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageColor, ImageDraw, ImageFont, ImageSequence
+from app.consts import STATIC_DIR
+from app.hardware_monitor.theme_assets import ASSET_PREFIX, asset_store
+
+__all__ = ["ThemeRenderer"]
+
+logger = logging.getLogger()
+
+# fabric.js line height multiplier of the font size
+FONT_SIZE_MULT = 1.13
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]  # fmt: skip
+WEEKDAY_NAMES = [
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+]  # fmt: skip
+# The same mapping as WEATHER_ICON_FILEPATH_MAP of the UI
+WEATHER_ICON_ALIAS = {"03n": "03d"}
+
+
+def parse_color(color) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Parse a css color of fabric.js, return None for an empty or transparent color.
+    """
+    if not color or not isinstance(color, str) or color == "transparent":
+        return None
+    color = color.strip()
+    m = re.match(r"rgba?\(([^)]*)\)", color)
+    if m:
+        parts = [p.strip() for p in m.group(1).split(",")]
+        r, g, b = (int(float(p)) for p in parts[:3])
+        a = int(float(parts[3]) * 255) if len(parts) > 3 else 255
+        return (r, g, b, a) if a > 0 else None
+    try:
+        res = ImageColor.getrgb(color)
+    except ValueError:
+        logger.warning(f"Unsupported color <{color}>")
+        return None
+    return res if len(res) == 4 else (*res, 255)
+
+
+def js_str(value) -> str:
+    """Format a value like javascript `toString`."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def format_datetime(date: datetime, fmt: str, keys: str) -> str:
+    """The same as `formatDatetime` of the UI, always uses english names."""
+    mapping = {
+        "Y": str(date.year),
+        "m": f"{date.month:02d}",
+        "d": f"{date.day:02d}",
+        "B": MONTH_NAMES[date.month - 1],
+        "b": MONTH_NAMES[date.month - 1][:3],
+        "A": WEEKDAY_NAMES[date.weekday()],
+        "a": WEEKDAY_NAMES[date.weekday()][:3],
+        "H": f"{date.hour:02d}",
+        "M": f"{date.minute:02d}",
+        "S": f"{date.second:02d}",
+        "I": f"{date.hour % 12 or 12:02d}",
+        "p": "AM" if date.hour < 12 else "PM",
+    }
+    return re.sub(f"%([{keys}])", lambda m: mapping[m.group(1)], fmt)
+
+
+def image_from_data_url(src: str) -> Image.Image:
+    data = base64.b64decode(src.split("base64,", 1)[1])
+    return Image.open(BytesIO(data))
+
+
+def open_image(src: str) -> Image.Image:
+    """Open a data URL, an asset reference or a static file of the UI."""
+    if src.startswith("data:"):
+        return image_from_data_url(src)
+    if src.startswith(ASSET_PREFIX):
+        return Image.open(asset_store.path(src))
+    return Image.open(os.path.join(STATIC_DIR, src.lstrip("./")))
+
+
+def composite(dst: Image.Image, layer: Image.Image, position: Tuple[int, int]) -> None:
+    """Alpha composite the layer onto dst, the layer may be partly outside of dst."""
+    x, y = position
+    left, top = max(0, -x), max(0, -y)
+    right, bottom = min(layer.width, dst.width - x), min(layer.height, dst.height - y)
+    if right <= left or bottom <= top:
+        return
+    dst.alpha_composite(layer, dest=(x + left, y + top), source=(left, top, right, bottom))
+
+
+class FontLoader:
+    """Find and cache the fonts used by the theme."""
+
+    def __init__(self) -> None:
+        self.__custom: Dict[str, bytes] = dict()
+        self.__cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = dict()
+
+    def set_custom_fonts(self, fonts: Dict[str, str]) -> None:
+        """
+        Custom fonts of the theme, fontFamily to the hex string of the font file
+        or its asset reference.
+        """
+        for family, data in (fonts or {}).items():
+            if family in self.__custom:
+                continue
+            if data.startswith(ASSET_PREFIX):
+                self.__custom[family] = asset_store.get(data)
+            else:
+                self.__custom[family] = bytes.fromhex(data)
+
+    def __font_file(self, family: str) -> Optional[str]:
+        # Bundled fonts of the UI, the file name is prefixed with the family name
+        name = family.replace(" ", "")
+        files = glob.glob(os.path.join(STATIC_DIR, "**", f"{name}*.ttf"), recursive=True)
+        return files[0] if files else None
+
+    def get(self, family: str, size: int) -> ImageFont.ImageFont:
+        key = (family, size)
+        font = self.__cache.get(key)
+        if font is not None:
+            return font
+        try:
+            if family in self.__custom:
+                font = ImageFont.truetype(BytesIO(self.__custom[family]), size)
+            else:
+                font = ImageFont.truetype(self.__font_file(family) or family, size)
+        except OSError:
+            try:
+                font = ImageFont.truetype("arial.ttf", size)
+            except OSError:
+                font = ImageFont.load_default(size)
+        self.__cache[key] = font
+        return font
+
+
+class ThemeRenderer:
+    """
+    Render a theme to PIL images.
+
+    `update(values)` binds the sensor values and returns a fingerprint of the
+    frame state, `render()` draws the frame. An unchanged fingerprint means an
+    unchanged frame, so the caller can skip drawing it.
+    """
+
+    def __init__(self) -> None:
+        self.fonts = FontLoader()
+        self.theme = ""
+        self.width = 0
+        self.height = 0
+        self.shape = "rect"
+        self.background = None
+        self.objects: List[dict] = list()
+        self.__images: Dict[str, Image.Image] = dict()
+        self.__gifs: Dict[str, Tuple[List[Image.Image], List[int]]] = dict()
+        self.__layers: Dict[int, Tuple[tuple, Image.Image]] = dict()
+        self.__mask: Optional[Image.Image] = None
+
+    def is_loaded(self) -> bool:
+        return bool(self.theme)
+
+    def load(self, theme: str, content: str) -> None:
+        """Load the theme file content."""
+        self.load_meta(theme, json.loads(content) if content else dict())
+
+    def load_meta(self, theme: str, meta: dict) -> None:
+        """Load the parsed theme document, the renderer keeps and modifies it."""
+        self.theme = theme if meta else ""
+        self.shape = meta.get("shape", "rect")
+        if self.shape == "circle":
+            self.width = self.height = int(meta.get("radius", 0) * 2)
+        else:
+            self.width = int(meta.get("width", 0))
+            self.height = int(meta.get("height", 0))
+        canvas_json = meta.get("canvasJSON") or dict()
+        self.background = parse_color(canvas_json.get("background"))
+        self.objects = canvas_json.get("objects", [])
+        self.fonts.set_custom_fonts(meta.get("customFonts"))
+        self.__images.clear()
+        self.__gifs.clear()
+        self.__layers.clear()
+        self.__mask = None
+        if self.shape == "circle" and self.width > 0:
+            self.__mask = Image.new("L", (self.width, self.height), 0)
+            ImageDraw.Draw(self.__mask).ellipse(
+                (0, 0, self.width - 1, self.height - 1), fill=255
+            )
+        logger.debug(f"Theme renderer loaded theme <{theme}>")
+
+    def sensors(self) -> List[str]:
+        """The backend sensors used by the theme, the same as `ThemePlayer.themeSensors`."""
+        res = list()
+        for obj in self.objects:
+            sensor = (obj.get("data") or {}).get("sensor")
+            if sensor and sensor != "frontend" and sensor not in res:
+                res.append(sensor)
+        return res
+
+    def has_clock(self) -> bool:
+        """Whether the theme shows the time."""
+        return any(
+            (obj.get("data") or {}).get("attribute") == "time" for obj in self.objects
+        )
+
+    # Sensor value binding
+
+    def frontend_value(self, item: dict):
+        attribute = item.get("attribute")
+        if attribute == "date":
+            return format_datetime(datetime.now(), item.get("dateFormat") or "%Y-%m-%d", "YmdBbAa")
+        if attribute == "time":
+            return format_datetime(datetime.now(), item.get("timeFormat") or "%H:%M:%S", "HIMSp")
+        if attribute == "custom_text":
+            return item.get("value") or "hello world"
+        return item.get("value")
+
+    def text_value(self, item: dict, value) -> str:
+        """The same as `ThemePlayer.handleTextValueAndUnit`."""
+        attribute = item.get("attribute")
+        if attribute == "load":
+            value = str(int(math.floor(value * 100 + 0.5)))
+        elif attribute in ("upload_speed", "download_speed"):
+            value = f"{value / (1e3 if item.get('unit') == 'kb/s' else 1e6):.2f}"
+        value = js_str(value)
+        if item.get("showUnit"):
+            value = f"{value} {item.get('unit')}"
+        if item.get("sensor") == "weather" and item.get("attribute") == "text":
+            value = value.replace("℃", "°C")
+        return value
+
+    def update(self, values: dict) -> int:
+        """Bind the sensor values to the theme objects and return the frame fingerprint."""
+        state = list()
+        for obj in self.objects:
+            item = obj.get("data") or {}
+            sensor = item.get("sensor")
+            if sensor and "custom" not in (item.get("attribute") or ""):
+                if sensor == "frontend":
+                    value = self.frontend_value(item)
+                else:
+                    value = (values.get(sensor) or {}).get(item.get("attribute"))
+                if value is not None:
+                    obj["_value"] = value
+            state.append(obj.get("_value"))
+            if self.__gif_frames(obj) is not None:
+                state.append(self.__gif_frame_index(obj))
+        return hash(tuple(repr(v) for v in state))
+
+    # Rendering
+
+    def render(self) -> Image.Image:
+        canvas = Image.new("RGBA", (self.width, self.height), self.background or (0, 0, 0, 0))
+        for index, obj in enumerate(self.objects):
+            if not obj.get("visible", True):
+                continue
+            try:
+                self.__draw_object(canvas, obj, index)
+            except Exception as e:
+                logger.error(f"Theme renderer draw <{obj.get('type')}> error: {e}")
+        frame = Image.new("RGB", canvas.size, (0, 0, 0))
+        frame.paste(canvas, mask=canvas)
+        if self.__mask is not None:
+            black = Image.new("RGB", canvas.size, (0, 0, 0))
+            frame = Image.composite(frame, black, self.__mask)
+        return frame
+
+    def __draw_object(self, canvas: Image.Image, obj: dict, key) -> None:
+        item = obj.get("data") or {}
+        show_type = item.get("showType")
+        value = obj.get("_value")
+        state = (show_type, repr(value), self.__gif_frame_index(obj))
+        cached = self.__layers.get(key)
+        if cached is not None and cached[0] == state:
+            layer = cached[1]
+        else:
+            layer = self.__layer(obj, show_type, value)
+            layer = self.__transform(layer, obj)
+            self.__layers[key] = (state, layer)
+        if layer is None:
+            return
+        composite(canvas, layer, self.__position(obj, layer))
+
+    def __layer(self, obj: dict, show_type: str, value) -> Optional[Image.Image]:
+        type_ = obj.get("type")
+        if type_ in ("text", "i-text", "textbox"):
+            text = obj.get("text", "")
+            if show_type == "Text" and value is not None:
+                text = self.text_value(obj.get("data") or {}, value)
+            return self.__text_layer(obj, text)
+        if type_ == "image":
+            return self.__image_layer(obj, value if show_type == "Image" else None)
+        if type_ == "group":
+            return self.__group_layer(obj, show_type, value)
+        if type_ == "rect":
+            return self.__rect_layer(obj)
+        if type_ == "circle":
+            return self.__circle_layer(obj)
+        logger.debug(f"Theme renderer skip unsupported object <{type_}>")
+        return None
+
+    def __text_layer(self, obj: dict, text: str) -> Image.Image:
+        font_size = int(obj.get("fontSize", 40))
+        font = self.fonts.get(obj.get("fontFamily", ""), font_size)
+        lines = text.split("\n")
+        line_height = font_size * FONT_SIZE_MULT * obj.get("lineHeight", 1.16)
+        widths = [font.getlength(line) for line in lines]
+        width = max(1, math.ceil(max(widths)))
+        height = max(1, math.ceil(line_height * (len(lines) - 1) + font_size * FONT_SIZE_MULT))
+        layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        background = parse_color(obj.get("backgroundColor"))
+        if background:
+            draw.rectangle((0, 0, width, height), fill=background)
+        fill = parse_color(obj.get("fill")) or (0, 0, 0, 255)
+        align = obj.get("textAlign", "left")
+        for i, line in enumerate(lines):
+            x = 0
+            if align == "center":
+                x = (width - widths[i]) / 2
+            elif align == "right":
+                x = width - widths[i]
+            y = i * line_height + font_size * FONT_SIZE_MULT / 2
+            draw.text((x, y), line, font=font, fill=fill, anchor="lm")
+        return layer
+
+    def __load_image(self, src: str) -> Optional[Image.Image]:
+        if not src:
+            return None
+        image = self.__images.get(src)
+        if image is None:
+            image = open_image(src).convert("RGBA")
+            self.__images[src] = image
+        return image
+
+    @staticmethod
+    def __gif_src(obj: dict) -> Optional[str]:
+        if obj.get("type") != "image":
+            return None
+        value = (obj.get("data") or {}).get("value")
+        if not (isinstance(value, dict) and value.get("type") == "image/gif"):
+            return None
+        return value.get("src") or obj.get("src")
+
+    def __gif_frames(self, obj: dict):
+        src = self.__gif_src(obj)
+        if src is None:
+            return None
+        if src not in self.__gifs:
+            image = open_image(src)
+            frames = [f.convert("RGBA") for f in ImageSequence.Iterator(image)]
+            durations = [max(f.info.get("duration", 100), 20) for f in ImageSequence.Iterator(image)]
+            self.__gifs[src] = (frames, durations)
+        return self.__gifs[src]
+
+    def __gif_frame_index(self, obj: dict) -> int:
+        gif = self.__gifs.get(self.__gif_src(obj))
+        if gif is None:
+            return 0
+        durations = gif[1]
+        now = int(time.monotonic() * 1000) % sum(durations)
+        for i, duration in enumerate(durations):
+            if now < duration:
+                return i
+            now -= duration
+        return 0
+
+    def __image_layer(self, obj: dict, value) -> Optional[Image.Image]:
+        item = obj.get("data") or {}
+        gif = self.__gif_frames(obj)
+        if gif is not None:
+            image = gif[0][self.__gif_frame_index(obj)]
+        else:
+            src = obj.get("src")
+            if value is not None and item.get("sensor") == "weather":
+                icon = WEATHER_ICON_ALIAS.get(value, value)
+                src = f"weathericon/{icon}.png"
+            elif value is not None and isinstance(value, str):
+                src = value
+            image = self.__load_image(src)
+        if image is None:
+            return None
+        crop_x, crop_y = int(obj.get("cropX", 0)), int(obj.get("cropY", 0))
+        width = int(obj.get("width") or image.width)
+        height = int(obj.get("height") or image.height)
+        if (crop_x, crop_y, width, height) != (0, 0, image.width, image.height):
+            image = image.crop((crop_x, crop_y, crop_x + width, crop_y + height))
+        return image
+
+    def __rect_layer(self, obj: dict) -> Image.Image:
+        stroke_width = int(obj.get("strokeWidth", 0)) if obj.get("stroke") else 0
+        width = max(1, math.ceil(obj.get("width", 0) + stroke_width))
+        height = max(1, math.ceil(obj.get("height", 0) + stroke_width))
+        layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        if obj.get("width", 0) <= 0:
+            return layer
+        radius = int(max(obj.get("rx", 0), obj.get("ry", 0)))
+        ImageDraw.Draw(layer).rounded_rectangle(
+            (0, 0, width - 1, height - 1),
+            radius=radius,
+            fill=parse_color(obj.get("fill")),
+            outline=parse_color(obj.get("stroke")),
+            width=stroke_width,
+        )
+        return layer
+
+    def __circle_layer(self, obj: dict) -> Image.Image:
+        radius = obj.get("radius", 0)
+        stroke = parse_color(obj.get("stroke"))
+        stroke_width = obj.get("strokeWidth", 0) if stroke else 0
+        size = max(1, math.ceil(radius * 2 + stroke_width))
+        layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        start, end = obj.get("startAngle", 0), obj.get("endAngle", 360)
+        if end - start <= 0:
+            return layer
+        fill = parse_color(obj.get("fill"))
+        if fill:
+            bbox = (stroke_width / 2, stroke_width / 2, size - stroke_width / 2, size - stroke_width / 2)
+            if end - start >= 360:
+                draw.ellipse(bbox, fill=fill)
+            else:
+                draw.pieslice(bbox, start, end, fill=fill)
+        if stroke and stroke_width > 0:
+            bbox = (0, 0, size - 1, size - 1)
+            dashes = obj.get("strokeDashArray")
+            if not dashes:
+                draw.arc(bbox, start, end, fill=stroke, width=int(stroke_width))
+                return layer
+            # Convert the dash lengths along the circumference to angles
+            to_angle = 180 / (math.pi * radius) if radius else 0
+            angle, i = start, 0
+            while angle < end:
+                length = dashes[i % len(dashes)] * to_angle
+                if i % 2 == 0 and length > 0:
+                    draw.arc(bbox, angle, min(angle + length, end), fill=stroke, width=int(stroke_width))
+                angle += length if length > 0 else 1
+                i += 1
+        return layer
+
+    def __group_layer(self, obj: dict, show_type: str, value) -> Image.Image:
+        children = [dict(child) for child in obj.get("objects", [])]
+        if value is not None and len(children) >= 2:
+            if show_type == "BarChart":
+                self.__update_bar_chart(children, value)
+            elif show_type == "DonutChart":
+                self.__update_donut_chart(obj, children, value)
+        width = max(1, math.ceil(obj.get("width", 0)))
+        height = max(1, math.ceil(obj.get("height", 0)))
+        layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        for child in children:
+            if not child.get("visible", True):
+                continue
+            child_layer = self.__transform(self.__layer(child, None, None), child)
+            if child_layer is None:
+                continue
+            # The position of group children is relative to the group center
+            position = self.__position(child, child_layer, offset=(width / 2, height / 2))
+            composite(layer, child_layer, position)
+        return layer
+
+    @staticmethod
+    def __update_bar_chart(children: List[dict], value: float) -> None:
+        """The same as `ThemePlayer.updateBarChart`."""
+        background, foreground = children[0], children[1]
+        foreground["width"] = min(background.get("width", 0) * value, background.get("width", 0))
+
+    @staticmethod
+    def __update_donut_chart(obj: dict, children: List[dict], value: float) -> None:
+        """The same as `ThemePlayer.updateDonutChart`."""
+        background, foreground = children[0], children[1]
+        item = obj.get("data") or {}
+        segment_width = item.get("segmentWidth") or 5
+        gap_width = item.get("segmentGap") or 0
+        end_angle = background.get("endAngle", 360)
+        circumference = 2 * math.pi * background.get("radius", 0) * (end_angle / 360)
+        progress = value * circumference
+        dashes = list()
+        while progress > 0:
+            if progress <= segment_width:
+                dashes.append(progress)
+                break
+            dashes.append(segment_width)
+            dashes.append(gap_width)
+            progress -= segment_width + gap_width
+        foreground["strokeDashArray"] = dashes
+        foreground["endAngle"] = end_angle * value
+
+    @staticmethod
+    def __transform(layer: Optional[Image.Image], obj: dict) -> Optional[Image.Image]:
+        """Apply the scale, flip, angle and opacity of the object to the layer."""
+        if layer is None:
+            return None
+        scale_x, scale_y = abs(obj.get("scaleX", 1)), abs(obj.get("scaleY", 1))
+        if (scale_x, scale_y) != (1, 1):
+            size = (max(1, round(layer.width * scale_x)), max(1, round(layer.height * scale_y)))
+            layer = layer.resize(size, Image.Resampling.BILINEAR)
+        if obj.get("flipX"):
+            layer = layer.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        if obj.get("flipY"):
+            layer = layer.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        opacity = obj.get("opacity", 1)
+        if opacity < 1:
+            alpha = layer.getchannel("A").point(lambda a: int(a * opacity))
+            layer = layer.copy()
+            layer.putalpha(alpha)
+        # Keep the unrotated size, the position is computed from it
+        size = layer.size
+        angle = obj.get("angle", 0) % 360
+        if angle:
+            layer = layer.rotate(-angle, resample=Image.Resampling.BICUBIC, expand=True)
+        layer.info["unrotated_size"] = size
+        return layer
+
+    @staticmethod
+    def __position(obj: dict, layer: Image.Image, offset=(0, 0)) -> Tuple[int, int]:
+        """The top left corner of the transformed layer on its parent."""
+        width, height = layer.info.get("unrotated_size", layer.size)
+        origin_x = {"left": 0, "center": 0.5, "right": 1}.get(obj.get("originX"), 0)
+        origin_y = {"top": 0, "center": 0.5, "bottom": 1}.get(obj.get("originY"), 0)
+        # The object rotates around its origin point, find where its center ends up
+        dx, dy = (0.5 - origin_x) * width, (0.5 - origin_y) * height
+        rad = math.radians(obj.get("angle", 0))
+        cx = offset[0] + obj.get("left", 0) + dx * math.cos(rad) - dy * math.sin(rad)
+        cy = offset[1] + obj.get("top", 0) + dx * math.sin(rad) + dy * math.cos(rad)
+        return round(cx - layer.width / 2), round(cy - layer.height / 2)
+
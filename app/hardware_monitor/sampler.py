@@ -0,0 +1,177 @@
+"""
+Background sensor sampler.
+
+One thread refreshes every sensor in use on its own schedule and publishes an
+immutable, versioned snapshot of all values. Readers only pick up the latest
+snapshot reference, so the UI and the screen displays never touch the hardware
+and never wait for each other.
+"""
+
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.hardware_monitor.history import SensorHistory
+
+__all__ = ["sensor_sampler", "SensorSampler", "SensorSnapshot"]
+
+logger = logging.getLogger()
+
+
+class SensorSnapshot:
+    """The sensor values published by one sampling pass."""
+
+    __slots__ = ("version", "taken_at", "values")
+
+    def __init__(self, version: int, taken_at: float, values: Mapping[str, dict]):
+        self.version = version
+        self.taken_at = taken_at
+        self.values = values
+
+
+class SensorSampler:
+    """
+    Sample the sensors in a background thread.
+
+    Each sensor is refreshed at the `refresh_interval` it declares, and only
+    sensors read within `idle_timeout` seconds are sampled. A sensor read
+    for the first time is sampled once in the caller's thread, later reads are
+    served from the snapshot.
+    """
+
+    # Refresh interval of sensors not declaring `refresh_interval` (seconds)
+    default_interval = 1
+    idle_timeout = 30
+
+    def __init__(
+        self, sensors: Dict[str, object] = None, history: "SensorHistory" = None
+    ) -> None:
+        self.__sensors = sensors
+        self.__history = history
+        self.__snapshot = SensorSnapshot(0, 0, MappingProxyType({}))
+        self.__lock = threading.Lock()  # Serialize the sampling and the publishing
+        self.__wakeup = threading.Event()
+        self.__next_due: Dict[str, float] = dict()
+        self.__last_read: Dict[str, float] = dict()
+        self.__thread: threading.Thread = None
+        self.__external = False
+
+    @property
+    def sensors(self) -> Dict[str, object]:
+        if self.__sensors is None:
+            from app.hardware_monitor.sensors import SensorsMap
+
+            self.__sensors = SensorsMap
+        return self.__sensors
+
+    @property
+    def history(self) -> "SensorHistory":
+        # The history loads numpy, import it at the first sample
+        if self.__history is None:
+            from app.hardware_monitor.history import sensor_history
+
+            self.__history = sensor_history
+        return self.__history
+
+    def snapshot(self) -> SensorSnapshot:
+        return self.__snapshot
+
+    def read(self, sensors: List[str]) -> dict:
+        """Return the latest values of the sensors."""
+        self.start()
+        now = time.monotonic()
+        snapshot = self.__snapshot
+        missing = list()
+        for sensor in sensors:
+            if sensor not in self.sensors:
+                continue
+            self.__last_read[sensor] = now
+            if sensor not in snapshot.values and sensor not in self.__next_due:
+                missing.append(sensor)
+        if missing:
+            self.sample(missing)
+            snapshot = self.__snapshot
+            self.__wakeup.set()
+        return {s: snapshot.values[s] for s in sensors if s in snapshot.values}
+
+    def read_history(
+        self, sensor: str, attribute: str, window: float, resolution: str = "raw"
+    ) -> Optional[dict]:
+        """Return the values of the last `window` seconds, keep sampling the sensor."""
+        self.read([sensor])
+        return self.history.query(sensor, attribute, window, resolution, time.time())
+
+    def start(self) -> None:
+        if self.__thread is not None or self.__external:
+            return
+        with self.__lock:
+            if self.__thread is not None or self.__external:
+                return
+            self.__thread = threading.Thread(
+                target=self.__run, name="SensorSampler", daemon=True
+            )
+            self.__thread.start()
+
+    def set_external(self, external: bool) -> None:
+        """Stop the sampling thread and let the caller drive the sampling, or back."""
+        with self.__lock:
+            self.__external = external
+        self.__wakeup.set()
+        if not external:
+            self.start()
+
+    def due(self, now: float) -> Tuple[List[str], float]:
+        """The sensors to sample now, and the seconds until the next one is due."""
+        active = [
+            s for s, at in list(self.__last_read.items()) if now - at < self.idle_timeout
+        ]
+        due = [s for s in active if self.__next_due.get(s, 0) <= now]
+        next_due = [
+            self.__next_due[s] for s in active if s in self.__next_due and s not in due
+        ]
+        return due, min(next_due) - now if next_due else 1
+
+    def sample(self, sensors: List[str]) -> None:
+        """Read the sensors and publish a new snapshot."""
+        # Read without the lock, so a slow sensor does not hold up the others
+        values = dict()
+        now = time.monotonic()
+        taken_at = time.time()
+        for sensor in sensors:
+            instance = self.sensors.get(sensor, None)
+            if instance is None:
+                continue
+            try:
+                values[sensor] = instance.status()
+            except Exception as e:
+                logger.error(f"Sensor <{sensor}> error: {e}")
+            interval = getattr(instance, "refresh_interval", self.default_interval)
+            self.__next_due[sensor] = now + interval
+        with self.__lock:
+            for sensor, value in values.items():
+                self.history.record(sensor, value, taken_at)
+            self.__snapshot = SensorSnapshot(
+                self.__snapshot.version + 1,
+                taken_at,
+                MappingProxyType({**self.__snapshot.values, **values}),
+            )
+
+    def __run(self) -> None:
+        while not self.__external:
+            due, timeout = self.due(time.monotonic())
+            if due:
+                self.sample(due)
+                _, timeout = self.due(time.monotonic())
+            self.__wakeup.wait(max(timeout, 0.01))
+            self.__wakeup.clear()
+        with self.__lock:
+            self.__thread = None
+        # Switched back before this thread noticed
+        if not self.__external:
+            self.start()
+
+
+sensor_sampler = SensorSampler()
@@ -1,5 +1,6 @@
 """
-Hardware sensors, read hardware status data, implemented through the LibreHardwareMonitor dll library.
+Hardware sensors, read hardware status data through the sensor backend of the
+platform (see `app.hardware_monitor.backends`).
 
 CPU:
     load: Utilization rate (%)
@@ -33,406 +34,170 @@ Weather:
 
 Net:
     speed (upload, download): Upload speed (B/s), Download speed (B/s)
+    interfaces: Upload and download speed of each interface (B/s)
 
 Volume:
     load: Utilization rate (%)
 """
 
-__all__ = ["cpu", "gpu", "ram", "disk", "net", "weather", "SensorsMap"]
+__all__ = [
+    "cpu",
+    "gpu",
+    "ram",
+    "disk",
+    "net",
+    "weather",
+    "volume",
+    "SensorsMap",
+    "sensors_stats",
+    "backend_stats",
+    "warm_up",
+]
 
 import logging
+import math
 import threading
 import time
-import requests
-import clr  # type: ignore # Clr is from pythonnet package. Do not install clr package
-import psutil
 
-from statistics import mean
-from typing import Union
-from app.consts import LHM_LHMONITOR_DLL_PATH, LHM_HIDSHARP_DLL_PATH
-from comtypes import CLSCTX_ALL, CoInitialize, CoUninitialize
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-from comtypes import POINTER, cast
-
-
-# Import LibreHardwareMonitor dll to Python
-clr.AddReference(LHM_LHMONITOR_DLL_PATH)
-clr.AddReference(LHM_HIDSHARP_DLL_PATH)  # type: ignore, this dll is required by LibreHardwareMonitor.dll
-from LibreHardwareMonitor import Hardware  # type: ignore
+from typing import Callable, Dict, List, Tuple, Union
+from app.setting import settings
+from app.hardware_monitor.backends import Reader, SensorBackend, get_backend
 
 logger = logging.getLogger()
 
-handle = Hardware.Computer()
-handle.IsCpuEnabled = True
-handle.IsGpuEnabled = True
-handle.IsMemoryEnabled = True
-handle.IsMotherboardEnabled = True  # For CPU Fan Speed
-handle.IsControllerEnabled = True  # For CPU Fan Speed
-handle.IsNetworkEnabled = True
-handle.IsStorageEnabled = True
-handle.IsPsuEnabled = False
-handle.Open()
-
-HARDWARE_TYPE_MOTHERBOARD = Hardware.HardwareType.Motherboard
-HARDWARE_TYPE_CPU = Hardware.HardwareType.Cpu
-HARDWARE_TYPE_MEN = Hardware.HardwareType.Memory
-HARDWARE_TYPE_GPUNVIDIA = Hardware.HardwareType.GpuNvidia
-HARDWARE_TYPE_GPUAMD = Hardware.HardwareType.GpuAmd
-HARDWARE_TYPE_GPUINTEL = Hardware.HardwareType.GpuIntel
-HARDWARE_TYPE_DISK = Hardware.HardwareType.Storage
-HARDWARE_TYPE_NET = Hardware.HardwareType.Network
-
-
-def print_hardware_and_status():
-    for hardware in handle.Hardware:
-        print(f"{hardware.HardwareType}: {hardware.Name}")
-        hardware.Update()
-        for sensor in hardware.Sensors:
-            print(
-                f"\t {sensor.SensorType}\t {sensor.Name} \t {round(sensor.Value, 2) if sensor.Value else ''}"
-            )
-        for sub_hardware in hardware.SubHardware:
-            print(f"\t {sub_hardware.HardwareType}: {sub_hardware.Name}")
-            sub_hardware.Update()
-            for sensor in sub_hardware.Sensors:
-                print(
-                    f"\t\t {sensor.SensorType}\t {sensor.Name} \t {round(sensor.Value, 2) if sensor.Value else ''}"
-                )
-
-
-def get_hardware(filter, all: bool = False):
-    """
-    Get hardware devices based on the given filter condition. By default, only the first matching device is returned.
-
-    :param filter: A callable object used to determine if a hardware device meets the condition.
-    :param all: A boolean indicating whether to return all matching hardware devices.
-    :return: The matching hardware device(s), or None if no device is found.
-    """
-    res = list()
-    for hardware in handle.Hardware:
-        if filter(hardware):
-            if not all:
-                return hardware
-            else:
-                res.append(hardware)
-    return res
 
+# Base class of all sensors, serve the status from a TTL cache
+class Sensor:
+    # Minimum refresh interval (seconds), reads within it are served from the cache
+    refresh_interval: float = 1
+    # How long (seconds) after expiring the cached status may still be served if a read fails
+    stale_tolerance: float = 5
+    # Relative cost of a read: "low", "medium", "high" or "network"
+    cost: str = "low"
 
-# CPU status data
-class CPU:
-
-    def __init__(self, hw: Hardware = None) -> None:
-        if hw is None:
-            hw = get_hardware(filter=lambda x: x.HardwareType == HARDWARE_TYPE_CPU)
-        self.hw = hw
-        self.load_sensor = None
-        self.frequency_sensors = list()
-        self.temperature_sensor = None
-        self.fan_subhw = None
-        self.fan_sensor = None
-
-        tmp_temperature_sensors = dict()
-        if self.hw is not None:
-            self.hw.Update()
-            for sensor in self.hw.Sensors:
-                # Total CPU load
-                if (
-                    sensor.SensorType == Hardware.SensorType.Load
-                    and sensor.Name.startswith("CPU Total")
-                ):
-                    self.load_sensor = sensor
-                # CPU core frequency
-                if (
-                    sensor.SensorType == Hardware.SensorType.Clock
-                    and "Core #" in sensor.Name
-                    and "Effective" not in sensor.Name
-                ):
-                    self.frequency_sensors.append(sensor)
-                # CPU temperature
-                if sensor.SensorType == Hardware.SensorType.Temperature:
-                    tmp_temperature_sensors[sensor.Name] = sensor
-
-        # CPU temperature
-        for name, sensor in tmp_temperature_sensors.items():
-            if name.startswith("Core Average"):
-                self.temperature_sensor = sensor
-                break
-            if name.startswith("Core Max"):
-                self.temperature_sensor = sensor
-                break
-            if name.startswith("CPU Package"):
-                self.temperature_sensor = sensor
-                break
-            if name.startswith("Core"):
-                self.temperature_sensor = sensor
-
-        # CPU fan speed
-        mb = get_hardware(filter=lambda x: x.HardwareType == HARDWARE_TYPE_MOTHERBOARD)
-        if mb is not None:
-            for subhw in mb.SubHardware:
-                subhw.Update()  # Must update sub-hardware first
-                for sensor in subhw.Sensors:
-                    if sensor.SensorType == Hardware.SensorType.Fan and "#2" in str(
-                        sensor.Name
-                    ):  # Is Motherboard #2 Fan always the CPU Fan?
-                        self.fan_subhw = subhw
-                        self.fan_sensor = sensor
-                        break
-
-    def update(self):
-        self.hw is not None and self.hw.Update()
-        self.fan_subhw is not None and self.fan_subhw.Update()
-
-    def load(self) -> Union[float, None]:
-        return self.load_sensor and max(round(self.load_sensor.Value / 100, 2), 0.01)
-
-    def frequency(self) -> Union[float, None]:
-        if self.frequency_sensors:
-            res = mean([sensor.Value for sensor in self.frequency_sensors]) / 1000
-            return round(res, 2)
-        return None  # If no frequency sensor is found, return None
-
-    def temperature(self) -> Union[int, None]:
-        return self.temperature_sensor and int(self.temperature_sensor.Value)
-
-    def fan(self) -> Union[int, None]:
-        return self.fan_sensor and int(self.fan_sensor.Value)
+    def __init__(self) -> None:
+        self._cache_lock = threading.Lock()
+        self._cache_value: Union[dict, None] = None
+        self._cache_at = 0
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._read_time_total = 0.0
+        self._read_time_max = 0.0
+
+    def read(self) -> dict:
+        """Read the status from the hardware, implemented by each sensor."""
+        raise NotImplementedError
 
     def status(self) -> dict:
-        self.update()
-        res = {
-            "load": self.load(),
-            "frequency": self.frequency(),
-            "temperature": self.temperature(),
-            "fan": self.fan(),
-        }
-        return res
-
-
-# Always read the status data of the default first graphics card
-class GPU:
-
-    def __default_hw(self):
-        # Prioritize using NVIDIA graphics cards
-        hw = get_hardware(filter=lambda x: x.HardwareType == HARDWARE_TYPE_GPUNVIDIA)
-        # If no NVIDIA graphics card is found, use an AMD graphics card
-        if hw is None:
-            hws = get_hardware(
-                filter=lambda x: x.HardwareType == HARDWARE_TYPE_GPUAMD, all=True
-            )
-            # If there are AMD graphics cards, use the first one
-            if len(hws) > 0:
-                hw = hws[0]
-            # When there are multiple AMD graphics cards, use the name to distinguish
-            else:
-                for tmp_hw in handle.Hardware:
-                    for sensor in tmp_hw.Sensors:
-                        if sensor.SensorType == Hardware.SensorType.Load and str(
-                            sensor.Name
-                        ).startswith("GPU Core"):
-                            hw = tmp_hw
-                            break
-                    if hw is not None:
-                        break
-        # If no AMD graphics card is found, use an Intel graphics card
-        if hw is None:
-            hw = get_hardware(filter=lambda x: x.HardwareType == HARDWARE_TYPE_GPUINTEL)
-        return hw
-
-    def __init__(self, hw: Hardware = None) -> None:
-        if hw is None:
-            hw = self.__default_hw()
-        self.hw = hw
-        self.load_sensor = None
-        self.mem_controller_load_sensor = None
-        self.frequency_sensor = None
-        self.temperature_sensor = None
-        self.fan_sensor = None
-        self.mem_used_sensor = None
-        self.mem_total = None
-
-        if self.hw:
-            self.hw.Update()  # When checking for values, must update once first
-            for sensor in self.hw.Sensors:
-                # GPU utilization
-                if sensor.SensorType == Hardware.SensorType.Load:
-                    if sensor.Name.startswith("GPU Core"):
-                        self.load_sensor = sensor
-                    elif sensor.Name.startswith("D3D 3D"):
-                        self.load_sensor = self.load_sensor or sensor
-                    if sensor.Name.startswith("GPU Memory Controller"):
-                        self.mem_controller_load_sensor = sensor
-                # GPU frequency
-                if (
-                    sensor.SensorType == Hardware.SensorType.Clock
-                    and sensor.Name.startswith("GPU Core")
-                    and "Effective" not in sensor.Name
-                ):
-                    self.frequency_sensor = sensor
-                # GPU temperature
-                if (
-                    sensor.SensorType == Hardware.SensorType.Temperature
-                    and sensor.Name.startswith("GPU Core")
-                ):
-                    self.temperature_sensor = sensor
-                # GPU fan speed
+        with self._cache_lock:
+            now = time.monotonic()
+            age = now - self._cache_at
+            if self._cache_value is not None and age < self.refresh_interval:
+                self._hits += 1
+                return self._cache_value
+            self._misses += 1
+            try:
+                res = self.read()
+            except Exception:
+                self._errors += 1
                 if (
-                    sensor.SensorType == Hardware.SensorType.Fan
-                    and sensor.Value is not None
+                    self._cache_value is not None
+                    and age < self.refresh_interval + self.stale_tolerance
                 ):
-                    self.fan_sensor = sensor
-                # Video memory
-                if sensor.SensorType == Hardware.SensorType.SmallData:
-                    # Used video memory
-                    if sensor.Name.startswith("GPU Memory Used"):
-                        self.mem_used_sensor = sensor
-                    if sensor.Name.startswith("D3D") and sensor.Name.endswith(
-                        "Memory Used"
-                    ):
-                        self.mem_used_sensor = self.mem_used_sensor or sensor
-                    # Total video memory
-                    if sensor.Name.startswith("GPU Memory Total"):
-                        self.mem_total = sensor.Value
-
-    def update(self):
-        self.hw and self.hw.Update()
-
-    def load(self) -> Union[int, None]:
-        # If the graphics card has a memory controller, subtract the memory controller's occupancy
-        if self.load_sensor and self.mem_controller_load_sensor:
-            res = self.load_sensor.Value + self.mem_controller_load_sensor.Value
-            if res > 100:
-                res = 100
-            return round(res / 100, 2)
-
-        return self.load_sensor and max(round(self.load_sensor.Value / 100, 2), 0.01)
-
-    def frequency(self) -> Union[float, None]:
-        return self.frequency_sensor and round(self.frequency_sensor.Value / 1000, 2)
-
-    def temperature(self) -> Union[int, None]:
-        return self.temperature_sensor and int(self.temperature_sensor.Value)
-
-    def fan(self) -> Union[int, None]:
-        return self.fan_sensor and int(self.fan_sensor.Value)
-
-    def total(self) -> Union[float, None]:
-        return self.mem_total and round(self.mem_total / 1024, 0)
-
-    def used(self) -> Union[float, None]:
-        return self.mem_used_sensor and round(self.mem_used_sensor.Value / 1024, 1)
-
-    def free(self) -> Union[float, None]:
-        if self.total() is None or self.used() is None:
-            return None
-        return self.total() - self.used()
-
-    def status(self) -> dict:
-        self.update()
-        res = {
-            "load": self.load(),
-            "frequency": self.frequency(),
-            "temperature": self.temperature(),
-            "fan": self.fan(),
-            "total": self.total(),
-            "used": self.used(),
-            "free": self.free(),
+                    logger.warning(f"{type(self).__name__} read failed, serve stale status")
+                    return self._cache_value
+                raise
+            cost = time.monotonic() - now
+            self._read_time_total += cost
+            self._read_time_max = max(self._read_time_max, cost)
+            self._cache_value = res
+            self._cache_at = now
+            return res
+
+    def clean_status_cache(self) -> None:
+        with self._cache_lock:
+            self._cache_value = None
+            self._cache_at = 0
+
+    def stats(self) -> dict:
+        reads = self._misses - self._errors
+        return {
+            "refresh_interval": self.refresh_interval,
+            "stale_tolerance": self.stale_tolerance,
+            "cost": self.cost,
+            "hits": self._hits,
+            "misses": self._misses,
+            "errors": self._errors,
+            "read_avg_ms": round(self._read_time_total / reads * 1000, 3) if reads > 0 else 0,
+            "read_max_ms": round(self._read_time_max * 1000, 3),
         }
-        return res
 
 
-# Disk status data (implemented based on psutil)
-class Disk:
-
-    def __init__(self) -> None:
-        self.__last_update_at = None
-        self.update()
-    
-    def update(self):
-        # If the last update time is less than 60 seconds, do not update
-        if self.__last_update_at and time.time() - self.__last_update_at < 60:
-            return
-        self._total = 0
-        self._used = 0
-        for part in psutil.disk_partitions():
-            try:
-                _usage = psutil.disk_usage(part.mountpoint)
-                self._total += _usage.total
-                self._used += _usage.used
-            except Exception as e:
-                logger.error(e)
-                continue
-        self._total = round(self._total / 1024 / 1024 / 1024, 0)  # GB
-        self._used = round(self._used / 1024 / 1024 / 1024, 1)  # GB
-        self._free = self._total - self._used
-        self._load = round(self._used / self._total, 2)  # %
-        self.__last_update_at = time.time()
-        return self
+# Base class of the sensors read through the sensor backend
+class HardwareSensor(Sensor):
+    # Name of the reader factory of the backend
+    kind: str = ""
 
+    def __init__(self, backend: SensorBackend = None) -> None:
+        super().__init__()
+        self.__backend = backend
+        self.__reader: Union[Reader, None] = None
+        self.__reader_backend: Union[SensorBackend, None] = None
 
-    def status(self) -> dict:
-        self.update()
-        res = {
-            "load": self._load,
-            "used": self._used,
-            "free": self._free,
-            "total": self._total,
-        }
-        return res
+    @property
+    def reader(self) -> Reader:
+        """The reader of the sensor, created at the first use."""
+        backend = self.__backend or get_backend()
+        if self.__reader is None or self.__reader_backend is not backend:
+            self.__reader = getattr(backend, self.kind)()
+            self.__reader_backend = backend
+        return self.__reader
 
+    def read(self) -> dict:
+        return self.reader.read()
 
-# RAM status data (implemented based on psutil)
-class RAM:
-    def __init__(self) -> None:
-        # Get the total memory directly during initialization
-        self.__update()
 
-    def __update(self):
-        mem = psutil.virtual_memory()
-        self.__total = mem.total
-        self.__used = mem.used
-        self.__available = mem.available
-        self.__percent = mem.percent
+# CPU status data
+class CPU(HardwareSensor):
+    kind = "cpu"
+    cost = "high"
 
-    def update(self):
-        """Keep compatible with the original interface"""
-        self.__update()
 
-    def load(self) -> float:
-        """Return the load value between 0.00 and 1.00"""
-        return round(self.__percent / 100, 2)
+# Always read the status data of the default first graphics card
+class GPU(HardwareSensor):
+    kind = "gpu"
+    cost = "high"
 
-    def used(self) -> float:
-        """Used memory (GB)"""
-        return round(self.__used / (1024**3), 1)
 
-    def free(self) -> float:
-        """Available memory (GB)"""
-        return round(self.__available / (1024**3), 1)
+# Disk status data
+class Disk(HardwareSensor):
+    kind = "disk"
+    # Scanning every partition is slow and the usage changes slowly
+    refresh_interval = 60
+    stale_tolerance = 300
+    cost = "medium"
 
-    def total(self) -> float:
-        """Total memory (GB)"""
-        return round(self.__total / (1024**3), 0)
 
-    def status(self) -> dict:
-        self.__update()
-        res = {
-            "load": self.load(),
-            "used": self.used(),
-            "free": self.free(),
-            "total": self.total(),
-        }
-        return res
+# RAM status data
+class RAM(HardwareSensor):
+    kind = "ram"
 
 
-# Network status data (implemented based on psutil)
-class Net:
+# Network status data, the rates are computed from the byte counters of the backend
+class Net(HardwareSensor):
+    kind = "net"
+    # Time constant of the EWMA smoothing of the rates (seconds), 0 disables it
+    smoothing_window: float = 2
+    # Rates above this limit are counter glitches (bytes/second)
+    max_rate: float = 1e9
 
-    def __init__(self) -> None:
-        self.last_update = time.time()
-        self.time_diff = 0
-        self.last_stats = psutil.net_io_counters(pernic=True)
-        self.current_stats = self.last_stats.copy()
+    def __init__(
+        self, backend: SensorBackend = None, smoothing_window: float = None
+    ) -> None:
+        super().__init__(backend)
+        if smoothing_window is not None:
+            self.smoothing_window = smoothing_window
         self.virtual_interfaces = [
             "lo",
             "Loopback",
@@ -445,72 +210,104 @@ class Net:
             "Hyper-V",
             "Docker",
         ]
-        # Add valid value cache
-        self.__last_valid_upload = 0
-        self.__last_valid_download = 0
+        # Whether each interface is counted, decided once per interface name
+        self.__allowed: Dict[str, bool] = dict()
+        # Smoothed rates of each counted interface: (upload, download)
+        self.__rates: Dict[str, Tuple[float, float]] = dict()
+        self.time_diff = 0
+        self.last_update = 0
+        self.__last_counters: Dict[str, Tuple[int, int]] = dict()
 
     def __filter_interface(self, name: str) -> bool:
         """Filter virtual network interfaces"""
         return not any(v.lower() in name.lower() for v in self.virtual_interfaces)
 
+    def __read_counters(self) -> Dict[str, Tuple[int, int]]:
+        """Bytes sent and received of the counted interfaces."""
+        stats = self.reader.read()
+        if stats.keys() != self.__allowed.keys():
+            # Interfaces appeared or disappeared, decide the new ones
+            allowed = self.__allowed
+            self.__allowed = {
+                name: allowed[name] if name in allowed else self.__filter_interface(name)
+                for name in stats
+            }
+        return {name: s for name, s in stats.items() if self.__allowed[name]}
+
+    def __rate(self, curr: int, prev: int, elapsed: float, last: float) -> float:
+        # Handle counter reset (32/64-bit overflow)
+        rate = (curr - prev if curr >= prev else curr) / elapsed
+        # Data validation (filter out abnormal values)
+        if rate > self.max_rate:
+            return last
+        if self.smoothing_window <= 0:
+            return rate
+        alpha = 1 - math.exp(-elapsed / self.smoothing_window)
+        return last + alpha * (rate - last)
+
     def update(self):
-        now = time.time()
-        # Ensure minimum sampling interval (15ms)
-        min_interval = 0.015
+        """
+        Update the rates from the counters, never blocks: the rates are divided
+        by the elapsed monotonic time and smoothed with a time-based EWMA, so
+        calls close together only move the rates by a small step.
+        """
+        now = time.monotonic()
         elapsed = now - self.last_update
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-            now = time.time()
-
-        self.time_diff = now - self.last_update
-        self.last_stats = self.current_stats
-        self.current_stats = psutil.net_io_counters(pernic=True)
+        if elapsed <= 0:
+            return
+        counters = self.__read_counters()
+        if not self.last_update:
+            # The first update only sets the baseline of the counters
+            self.__last_counters, self.last_update = counters, now
+            return
+        rates = dict()
+        for name, (sent, recv) in counters.items():
+            prev = self.__last_counters.get(name, None)
+            if prev is None:
+                # New interface, the rates start from the next update
+                rates[name] = (0.0, 0.0)
+                continue
+            up, down = self.__rates.get(name, (0.0, 0.0))
+            rates[name] = (
+                self.__rate(sent, prev[0], elapsed, up),
+                self.__rate(recv, prev[1], elapsed, down),
+            )
+        self.__rates = rates
+        self.__last_counters = counters
+        self.time_diff = elapsed
         self.last_update = now
 
-    def __calculate_speed(self, current, last, attr):
-        valid_stats = []
-        for iface in filter(self.__filter_interface, current):
-            curr = getattr(current[iface], attr)
-            prev = getattr(last[iface], attr)
-            # Handle counter reset (32/64-bit overflow)
-            diff = curr - prev if curr >= prev else curr
-            valid_stats.append(diff)
-
-        if not valid_stats or self.time_diff <= 0:
-            return 0
-        return sum(valid_stats) / self.time_diff
-
     def upload_speed(self) -> int:
         """Total upload speed (bytes/second)"""
-        raw_speed = self.__calculate_speed(
-            self.current_stats, self.last_stats, "bytes_sent"
-        )
-        # Data validation (filter out abnormal values)
-        if 0 <= raw_speed <= 1e9:  # 1GB/s upper limit
-            self.__last_valid_upload = int(raw_speed)
-        return self.__last_valid_upload
+        return int(sum(up for up, _ in self.__rates.values()))
 
     def download_speed(self) -> int:
         """Total download speed (bytes/second)"""
-        raw_speed = self.__calculate_speed(
-            self.current_stats, self.last_stats, "bytes_recv"
-        )
-        if 0 <= raw_speed <= 1e9:
-            self.__last_valid_download = int(raw_speed)
-        return self.__last_valid_download
+        return int(sum(down for _, down in self.__rates.values()))
 
-    def status(self) -> dict:
+    def interfaces(self) -> Dict[str, dict]:
+        """Upload and download speed of each counted interface (bytes/second)"""
+        return {
+            name: {"upload_speed": int(up), "download_speed": int(down)}
+            for name, (up, down) in self.__rates.items()
+        }
+
+    def read(self) -> dict:
         self.update()
         res = {
             "upload_speed": self.upload_speed(),
             "download_speed": self.download_speed(),
+            "interfaces": self.interfaces(),
         }
         return res
 
 
 # Weather data, obtained from openweathermap
 # https://openweathermap.org/current
-class Weather:
+class Weather(Sensor):
+    # The network request runs in the background, the status only picks up its result
+    refresh_interval = 5
+    cost = "network"
 
     def __init__(
         self,
@@ -518,6 +315,10 @@ class Weather:
         lat: float = 0,
         lon: float = 0,
     ) -> None:
+        super().__init__()
+        # Only load requests when the weather is used
+        import requests
+
         # Create a new Session and disable proxies
         self.session = requests.Session()
         self.session.trust_env = (
@@ -541,6 +342,7 @@ class Weather:
         self.lon = lon
         self.__text = ""
         self.__icon = ""
+        self.clean_status_cache()
         self.__update_async()
 
     def get_conf(self) -> dict:
@@ -575,6 +377,8 @@ class Weather:
             # Cache check again
             if self.__cache_check():
                 return
+            import requests
+
             try:
                 from app.i18n import t
 
@@ -603,6 +407,7 @@ class Weather:
         self.__text = ""
         self.__icon = ""
         self.last_update = 0
+        self.clean_status_cache()
 
     def text(self) -> str:
         return self.__text
@@ -610,7 +415,7 @@ class Weather:
     def icon(self) -> str:
         return self.__icon
 
-    def status(self) -> dict:
+    def read(self) -> dict:
         self.__update_async()
         res = {
             "text": self.text(),
@@ -620,59 +425,51 @@ class Weather:
 
 
 # Volume
-class Volume:
-    def __init__(self) -> None:
-        self.volume = None
-        self.available = False
-        try:
-            CoInitialize()
-            devices = AudioUtilities.GetSpeakers()
-            if devices:
-                interface = devices.Activate(
-                    IAudioEndpointVolume._iid_, CLSCTX_ALL, None
-                )
-                if interface:
-                    self.volume = cast(interface, POINTER(IAudioEndpointVolume))
-                    self.available = True
-        except Exception as e:
-            logger.warning(f"Audio device initialization failed: {e}")
-            self.available = False
-
-    def __del__(self):
-        try:
-            self.cleanup()
-        except:
-            pass
-
-    def cleanup(self):
-        if hasattr(self, "volume") and self.volume:
-            self.volume.Release()
-            self.volume = None
-            CoUninitialize()
-
-    def load(self) -> float:
-        if not self.available or not self.volume:
-            return 0.0  # Return 0 volume when no audio device is available
-        try:
-            current_volume = self.volume.GetMasterVolumeLevelScalar()
-            return round(current_volume, 2)
-        except Exception as e:
-            logger.warning(f"Failed to get volume level: {e}")
-            return 0.0
+class Volume(HardwareSensor):
+    kind = "volume"
 
-    def status(self) -> dict:
-        res = {"load": self.load()}
-        return res
 
+class LazySensor:
+    """
+    A proxy constructing the sensor at its first use. Each sensor has its own
+    lock, so a caller only waits for the construction of the sensor it uses.
+    """
 
-# All sensors
-cpu = CPU()
-gpu = GPU()
-ram = RAM()
-disk = Disk()
-net = Net()
-weather = Weather()
-volume = Volume()
+    def __init__(self, factory: Callable[[], Sensor]) -> None:
+        self.__factory = factory
+        self.__sensor: Union[Sensor, None] = None
+        self.__lock = threading.Lock()
+
+    @property
+    def sensor(self) -> Sensor:
+        sensor = self.__sensor
+        if sensor is None:
+            with self.__lock:
+                if self.__sensor is None:
+                    self.__sensor = self.__factory()
+                sensor = self.__sensor
+        return sensor
+
+    def is_ready(self) -> bool:
+        return self.__sensor is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.sensor, name)
+
+
+def _create_weather() -> Weather:
+    conf = settings.get_monitor_settings().get("weather", {})
+    return Weather(**{k: conf[k] for k in ("apiKey", "lat", "lon") if k in conf})
+
+
+# All sensors, constructed at the first use or by `warm_up`
+cpu = LazySensor(CPU)
+gpu = LazySensor(GPU)
+ram = LazySensor(RAM)
+disk = LazySensor(Disk)
+net = LazySensor(Net)
+weather = LazySensor(_create_weather)
+volume = LazySensor(Volume)
 SensorsMap = {
     "cpu": cpu,
     "gpu": gpu,
@@ -682,3 +479,46 @@ SensorsMap = {
     "weather": weather,
     "volume": volume,
 }
+
+# Sensors warmed up after the UI shows, the weather is left to its first use
+WARM_UP_SENSORS = ["cpu", "gpu", "ram", "net", "volume", "disk"]
+_warm_up_thread: Union[threading.Thread, None] = None
+
+
+def warm_up(names: List[str] = None) -> None:
+    """
+    Construct the sensors and read them once in a background thread, so the
+    first reads do not pay for opening the hardware. Only the first call starts
+    the thread, a sensor read before its turn is constructed by the reader.
+    """
+    global _warm_up_thread
+    if _warm_up_thread is not None:
+        return
+
+    def run():
+        for name in names or WARM_UP_SENSORS:
+            start = time.monotonic()
+            try:
+                SensorsMap[name].status()
+            except Exception as e:
+                logger.error(f"Sensor <{name}> warm up error: {e}")
+            else:
+                logger.debug(
+                    f"Sensor <{name}> warmed up in {time.monotonic() - start:.3f}s"
+                )
+
+    _warm_up_thread = threading.Thread(target=run, name="SensorWarmUp", daemon=True)
+    _warm_up_thread.start()
+
+
+def sensors_stats() -> dict:
+    """Cache hit/miss and read latency counters of the constructed sensors."""
+    return {
+        name: sensor.stats() for name, sensor in SensorsMap.items() if sensor.is_ready()
+    }
+
+
+def backend_stats() -> dict:
+    """Statistics of the sensor backend, such as the hardware update cost."""
+    backend = get_backend()
+    return {"name": backend.name, **backend.stats()}
@@ -1,8 +1,8 @@
 import logging
-import os
 from typing import List
-from app import consts
-from app.hardware_monitor.sensors import SensorsMap
+from app.hardware_monitor.frame_transport import frame_receiver
+from app.hardware_monitor.sampler import sensor_sampler
+from app.hardware_monitor.theme_cache import theme_cache, theme_path
 from app.ui import UIAPIBase
 
 __all__ = ["theme_player_api"]
@@ -18,14 +18,14 @@ class ThemePlayerAPI(UIAPIBase):
             theme (str): The name of the theme to load.
         Returns:
             str: The content of the theme file, or an empty string if the theme is not set.
+            The images and fonts are URLs of the assets on the loopback server.
         """
         content: str = ""
         if not theme:
             return content
-        # Construct the theme file path
-        filepath: str = os.path.join(consts.THEMES_DIR, f"{theme}.json")
-        with open(filepath, "r", encoding="utf-8") as fp:
-            content: str = fp.read()
+        # Usually cached, the monitor window has just selected it
+        content: str = theme_cache.content(theme_path(theme))
+        content = frame_receiver.resolve_assets(content)
         logger.debug(f"Theme player selected theme <{theme}>")
         return content
 
@@ -41,17 +41,34 @@ class ThemePlayerAPI(UIAPIBase):
         """
         if not sensors:
             return dict()
-        res = dict()
-        for sensor in sensors:
-            # Get the sensor instance from the SensorsMap
-            instance = SensorsMap.get(sensor, None)
-            if instance:
-                try:
-                    res[sensor] = instance.status()
-                except Exception as e:
-                    logger.error(f"Sensor <{sensor}> error: {e}")
+        # Served from the latest snapshot of the background sampler
+        res = sensor_sampler.read(sensors)
         # logger.debug(f"Theme player loaded sensor <{sensors}> data: {res}")
         return res
 
+    def getSensorsHistory(
+        self, sensor: str, attribute: str, window: float, resolution: str = "raw"
+    ) -> dict:
+        """
+        Get the history of a sensor attribute.
+
+        Args:
+            sensor (str): The sensor name.
+            attribute (str): The attribute name.
+            window (float): The length of the history (seconds).
+            resolution (str): "raw", "10s" or "1m".
+
+        Returns:
+            dict: "count" rows of the "columns", "value" for the raw samples or
+            "min", "max" and "mean" for the buckets. "t" is the base64 of the
+            float64 timestamps and "values" the base64 of the float32 values
+            row by row, both little-endian. None if there is no history.
+        """
+        try:
+            return sensor_sampler.read_history(sensor, attribute, window, resolution)
+        except ValueError as e:
+            logger.error(e)
+            return None
+
 
 theme_player_api = ThemePlayerAPI()
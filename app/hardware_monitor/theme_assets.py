@@ -0,0 +1,210 @@
+"""
+Content-addressed store of the images and fonts embedded in the themes.
+
+A theme embeds its images as base64 data URLs and its custom fonts as hex
+strings in `customFonts`, so every theme using the same background or font
+carries its own copy. `pack_theme` moves these blobs into `ASSETS_DIR`, one
+file per content hash, and leaves `asset:<hash>.<ext>` references in the
+theme document. The loaded themes keep the references: `resolve_theme`
+turns them into URLs of the loopback server of `frame_transport` for the UI,
+and the renderer opens the files of the store. Only `unpack_theme` puts the
+blobs back, for an exported theme to be self-contained again.
+
+Themes without references load unchanged. `migrate_themes` packs the existing
+theme files in bulk, run it as `python -m app.hardware_monitor.theme_assets`.
+`python -m app.hardware_monitor.theme_assets export <theme> <output>` writes
+a self-contained copy of a theme file.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import sys
+from typing import Callable, Optional
+from app import consts
+
+__all__ = [
+    "asset_store",
+    "AssetStore",
+    "pack_theme",
+    "unpack_theme",
+    "resolve_theme",
+    "read_theme_file",
+    "write_theme_file",
+    "migrate_themes",
+]
+
+logger = logging.getLogger()
+
+ASSET_PREFIX = "asset:"
+# Smaller blobs stay in the theme, a reference would not save anything
+MIN_ASSET_SIZE = 1024
+FONT_EXT = ".font"
+DATA_URL_RE = re.compile(r"data:([\w.+-]+/[\w.+-]+);base64,")
+ASSET_REF_RE = re.compile(r"asset:[0-9a-f]{64}(\.\w+)?")
+# A reference as a whole JSON string
+QUOTED_REF_RE = re.compile(r'"asset:([0-9a-f]{64}(?:\.\w+)?)"')
+
+
+class AssetStore:
+    """Blobs stored in files named by the sha256 of their content."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def path(self, ref: str) -> str:
+        name = ref[len(ASSET_PREFIX) :] if ref.startswith(ASSET_PREFIX) else ref
+        if os.path.basename(name) != name:
+            raise ValueError(f"Invalid asset reference <{ref}>")
+        return os.path.join(self.root, name)
+
+    def put(self, data: bytes, ext: str) -> str:
+        """Store the blob if it is new, return its reference."""
+        name = f"{hashlib.sha256(data).hexdigest()}{ext}"
+        path = os.path.join(self.root, name)
+        if not os.path.exists(path):
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+            logger.debug(f"Stored asset <{name}>, {len(data)} bytes")
+        return f"{ASSET_PREFIX}{name}"
+
+    def get(self, ref: str) -> bytes:
+        with open(self.path(ref), "rb") as fp:
+            return fp.read()
+
+
+asset_store = AssetStore(consts.ASSETS_DIR)
+
+
+def _walk(value, replace: Callable[[str], Optional[str]]):
+    """Replace the strings in the nested value, return None if nothing changed."""
+    if isinstance(value, str):
+        return replace(value)
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return None
+    changed = False
+    for key, item in list(items):
+        new = _walk(item, replace)
+        if new is not None:
+            value[key] = new
+            changed = True
+    return value if changed else None
+
+
+def _pack_data_url(value: str, store: AssetStore) -> Optional[str]:
+    if len(value) < MIN_ASSET_SIZE:
+        return None
+    m = DATA_URL_RE.match(value)
+    if m is None:
+        return None
+    ext = mimetypes.guess_extension(m.group(1)) or ".bin"
+    return store.put(base64.b64decode(value[m.end() :]), ext)
+
+
+def _unpack_ref(value: str, store: AssetStore) -> Optional[str]:
+    if not ASSET_REF_RE.fullmatch(value):
+        return None
+    mime = mimetypes.guess_type(store.path(value))[0] or "application/octet-stream"
+    return f"data:{mime};base64,{base64.b64encode(store.get(value)).decode()}"
+
+
+def pack_theme(content: str, store: AssetStore = None) -> str:
+    """Move the embedded images and fonts of the theme content into the store."""
+    store = store or asset_store
+    meta = json.loads(content)
+    changed = _walk(meta.get("canvasJSON"), lambda v: _pack_data_url(v, store))
+    fonts = meta.get("customFonts") or dict()
+    for family, data in fonts.items():
+        if not data.startswith(ASSET_PREFIX) and len(data) >= MIN_ASSET_SIZE:
+            fonts[family] = store.put(bytes.fromhex(data), FONT_EXT)
+            changed = True
+    return json.dumps(meta, ensure_ascii=False) if changed is not None else content
+
+
+def unpack_theme(content: str, store: AssetStore = None) -> str:
+    """Put the referenced images and fonts back into the theme content."""
+    if ASSET_PREFIX not in content:
+        return content
+    store = store or asset_store
+    meta = json.loads(content)
+    _walk(meta.get("canvasJSON"), lambda v: _unpack_ref(v, store))
+    fonts = meta.get("customFonts") or dict()
+    for family, data in fonts.items():
+        if ASSET_REF_RE.fullmatch(data):
+            fonts[family] = store.get(data).hex()
+    return json.dumps(meta, ensure_ascii=False)
+
+
+def resolve_theme(content: str, base_url: str) -> str:
+    """Replace the references of the theme content with the URLs of the assets."""
+    if ASSET_PREFIX not in content:
+        return content
+    return QUOTED_REF_RE.sub(lambda m: f'"{base_url}/{m.group(1)}"', content)
+
+
+def read_theme_file(filepath: str, inline: bool = False) -> str:
+    """Read a theme file, inline puts the assets back for a self-contained export."""
+    with open(filepath, "r", encoding="utf-8") as fp:
+        content = fp.read()
+    return unpack_theme(content) if inline else content
+
+
+def _write_text(filepath: str, content: str) -> None:
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        fp.write(content)
+    os.replace(tmp_path, filepath)
+
+
+def write_theme_file(filepath: str, content: str) -> None:
+    """Write a theme file with its assets moved into the store."""
+    try:
+        content = pack_theme(content)
+    except Exception as e:
+        logger.error(f"Theme file <{filepath}> pack assets error: {e}")
+    _write_text(filepath, content)
+
+
+def migrate_themes(themes_dir: str = None) -> int:
+    """Pack the assets of the theme files, return the number of files changed."""
+    themes_dir = themes_dir or consts.THEMES_DIR
+    count = 0
+    for filename in sorted(os.listdir(themes_dir)):
+        if not filename.endswith(".json"):
+            continue
+        filepath = os.path.join(themes_dir, filename)
+        try:
+            with open(filepath, "r", encoding="utf-8") as fp:
+                content = fp.read()
+            packed = pack_theme(content)
+            if packed is content:
+                continue
+            _write_text(filepath, packed)
+            count += 1
+            logger.info(
+                f"Theme file <{filename}> migrated, {len(content)} -> {len(packed)} bytes"
+            )
+        except Exception as e:
+            logger.error(f"Theme file <{filename}> migrate error: {e}")
+    return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if sys.argv[1:2] == ["export"]:
+        _write_text(sys.argv[3], read_theme_file(sys.argv[2], inline=True))
+        print(f"Exported <{sys.argv[2]}> to <{sys.argv[3]}>")
+    else:
+        target = sys.argv[1] if len(sys.argv) > 1 else None
+        print(f"Migrated {migrate_themes(target)} theme files")
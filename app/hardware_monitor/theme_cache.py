@@ -0,0 +1,130 @@
+"""
+Process-wide cache of the theme files.
+
+Selecting a theme reads it for the monitor window, the theme player and the
+screen renderer. The cache keeps the content of the recently used themes, with
+the `asset:` references of their images and fonts, and the parsed document for
+the renderer, so switching
+between a few themes does not read or parse them again. An entry is checked
+against the size and mtime of its file on every use, and the least recently
+used entries are evicted once the total size is over `max_bytes`.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app import consts
+from app.hardware_monitor.theme_assets import read_theme_file
+
+__all__ = ["theme_cache", "ThemeCache", "theme_path"]
+
+logger = logging.getLogger()
+
+
+def theme_path(theme: str) -> str:
+    return os.path.join(consts.THEMES_DIR, f"{theme}.json")
+
+
+class _Entry:
+    __slots__ = ("size", "mtime_ns", "content", "meta")
+
+    def __init__(self, stat: os.stat_result, content: str) -> None:
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.content = content
+        self.meta: Optional[dict] = None
+
+    def nbytes(self) -> int:
+        # The parsed document is about as large as its content
+        return len(self.content) * (2 if self.meta is not None else 1)
+
+
+class ThemeCache:
+    """LRU cache of the theme files, bounded by the total size of the entries."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.__nbytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __entry(self, path: str) -> _Entry:
+        """The valid entry of the file, read it if it is not cached or changed."""
+        stat = os.stat(path)
+        entry = self.__entries.get(path, None)
+        if (
+            entry is not None
+            and entry.size == stat.st_size
+            and entry.mtime_ns == stat.st_mtime_ns
+        ):
+            self.__hits += 1
+            self.__entries.move_to_end(path)
+            return entry
+        self.__misses += 1
+        self.__pop(path)
+        entry = _Entry(stat, read_theme_file(path))
+        self.__entries[path] = entry
+        self.__nbytes += entry.nbytes()
+        return entry
+
+    def __pop(self, path: str) -> None:
+        entry = self.__entries.pop(path, None)
+        if entry is not None:
+            self.__nbytes -= entry.nbytes()
+
+    def __evict(self) -> None:
+        # Keep the latest entry even if it is larger than the limit
+        while self.__nbytes > self.max_bytes and len(self.__entries) > 1:
+            path, entry = self.__entries.popitem(last=False)
+            self.__nbytes -= entry.nbytes()
+            self.__evictions += 1
+            logger.debug(f"Theme cache evicted <{path}>")
+
+    def content(self, path: str) -> str:
+        """The content of the theme file, the assets are references to the store."""
+        with self.__lock:
+            entry = self.__entry(path)
+            self.__evict()
+            return entry.content
+
+    def meta(self, path: str) -> dict:
+        """The parsed theme document, a copy the caller can modify."""
+        with self.__lock:
+            entry = self.__entry(path)
+            if entry.meta is None:
+                self.__nbytes -= entry.nbytes()
+                entry.meta = json.loads(entry.content)
+                self.__nbytes += entry.nbytes()
+            self.__evict()
+            meta = entry.meta
+        # The strings are shared, only the containers are copied
+        return copy.deepcopy(meta)
+
+    def invalidate(self, path: str = None) -> None:
+        """Drop the entry of the file, or all the entries if path is None."""
+        with self.__lock:
+            if path is None:
+                self.__entries.clear()
+                self.__nbytes = 0
+            else:
+                self.__pop(path)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "entries": len(self.__entries),
+                "nbytes": self.__nbytes,
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+            }
+
+
+theme_cache = ThemeCache()
@@ -0,0 +1,266 @@
+"""
+Persistent index of the theme files.
+
+`loadThemes` only needs the header fields of each theme (shape, width, height
+and radius), but a theme embeds its images and fonts and can weigh hundreds of
+KB. The index keeps the header fields of every theme file keyed by its path,
+size and mtime in `THEME_INDEX_PATH`, so listing the themes only stats the
+files. A new or changed file is read with a partial parse that stops once the
+header fields are found and skips the other values without decoding them.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, IO, Iterable, List
+from app import consts
+
+__all__ = ["theme_index", "ThemeIndex", "read_theme_header"]
+
+logger = logging.getLogger()
+
+HEADER_FIELDS = ("shape", "width", "height", "radius")
+HEADER_DEFAULTS = {"width": 0, "height": 0, "radius": 0}
+
+
+class _JsonSkimmer:
+    """Walk the top-level members of a JSON object read in chunks."""
+
+    __special = re.compile(r'["{}\[\]]')
+    __scalar_end = re.compile(r"[,}\]\s]")
+    __decoder = json.JSONDecoder()
+
+    def __init__(self, fp: IO[str], chunk_size: int = 16384) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+
+    def __fill(self) -> bool:
+        """Drop the consumed text and read the next chunk, False at the end."""
+        chunk = self.fp.read(self.chunk_size)
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def __peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.__fill():
+                raise ValueError("Unexpected end of the theme file")
+
+    def __expect(self, chars: str) -> str:
+        ch = self.__peek()
+        if ch not in chars:
+            raise ValueError(f"Expect one of {chars!r} at {self.pos}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def __skip_string(self) -> None:
+        self.pos += 1  # The opening quote
+        while True:
+            i = self.buf.find('"', self.pos)
+            if i < 0:
+                # Keep the trailing backslashes, they may escape the next quote
+                keep = len(self.buf) - len(self.buf.rstrip("\\"))
+                self.pos = len(self.buf) - keep
+                if not self.__fill():
+                    raise ValueError("Unterminated string in the theme file")
+                continue
+            j = i
+            while j > 0 and self.buf[j - 1] == "\\":
+                j -= 1
+            self.pos = i + 1
+            if (i - j) % 2 == 0:  # Not escaped
+                return
+
+    def __skip_container(self) -> None:
+        depth = 0
+        while True:
+            m = self.__special.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self.__fill():
+                    raise ValueError("Unterminated value in the theme file")
+                continue
+            ch = m.group()
+            self.pos = m.start()
+            if ch == '"':
+                self.__skip_string()
+                continue
+            self.pos += 1
+            depth += 1 if ch in "{[" else -1
+            if depth == 0:
+                return
+
+    def __scalar_size(self) -> int:
+        """Length of the number or literal at the position, it has no delimiter."""
+        while True:
+            m = self.__scalar_end.search(self.buf, self.pos)
+            if m is not None:
+                return m.start() - self.pos
+            if not self.__fill():
+                return len(self.buf) - self.pos
+
+    def skip_value(self) -> None:
+        ch = self.__peek()
+        if ch == '"':
+            self.__skip_string()
+        elif ch in "{[":
+            self.__skip_container()
+        else:
+            # Sized first, reading the next chunk moves the position
+            size = self.__scalar_size()
+            self.pos += size
+
+    def read_value(self):
+        if self.__peek() not in '"{[':
+            size = self.__scalar_size()
+            value = json.loads(self.buf[self.pos : self.pos + size])
+            self.pos += size
+            return value
+        while True:
+            try:
+                value, self.pos = self.__decoder.raw_decode(self.buf, self.pos)
+                return value
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
+
+    def members(self, wanted: Iterable[str]) -> dict:
+        """Decode the wanted members, stop once all of them are found."""
+        wanted = set(wanted)
+        res = dict()
+        self.__expect("{")
+        if self.__peek() == "}":
+            return res
+        while True:
+            key = self.read_value()
+            self.__expect(":")
+            if key in wanted:
+                res[key] = self.read_value()
+                if len(res) == len(wanted):
+                    return res
+            else:
+                self.skip_value()
+            if self.__expect(",}") == "}":
+                return res
+
+
+def read_theme_header(path: str) -> dict:
+    """Read the header fields of a theme file without decoding the rest."""
+    with open(path, "r", encoding="utf-8") as fp:
+        header = _JsonSkimmer(fp).members(HEADER_FIELDS)
+    if "shape" not in header:
+        raise ValueError(f"Theme file <{path}> has no shape")
+    for key, default in HEADER_DEFAULTS.items():
+        header.setdefault(key, default)
+    return header
+
+
+class ThemeIndex:
+    """
+    The header fields of the theme files, kept in sync with the directory by
+    comparing the size and mtime of each file with its index entry.
+    """
+
+    version = 1
+
+    def __init__(self, themes_dir: str, index_path: str) -> None:
+        self.themes_dir = themes_dir
+        self.index_path = index_path
+        self.__lock = threading.Lock()
+        self.__entries: Dict[str, dict] = None
+
+    def __load(self) -> Dict[str, dict]:
+        if self.__entries is None:
+            self.__entries = dict()
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as fp:
+                    data = json.load(fp)
+                if data.get("version") == self.version:
+                    self.__entries = data.get("themes", {})
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Theme index <{self.index_path}> load error: {e}")
+        return self.__entries
+
+    def __save(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                json.dump({"version": self.version, "themes": self.__entries}, fp)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"Theme index <{self.index_path}> save error: {e}")
+
+    def __index(self, path: str, stat: os.stat_result) -> bool:
+        """Index a theme file if it changed, return True if the entry changed."""
+        entries = self.__load()
+        entry = entries.get(path, None)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return False
+        try:
+            header = read_theme_header(path)
+        except Exception as e:
+            logger.error(f"Theme file <{path}> read error: {e}")
+            return entries.pop(path, None) is not None
+        entries[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, **header}
+        return True
+
+    def themes(self) -> List[dict]:
+        """The name and the header fields of every theme, sorted by name."""
+        res = list()
+        with self.__lock:
+            entries = self.__load()
+            changed = False
+            seen = set()
+            for item in os.scandir(self.themes_dir):
+                if not item.name.endswith(".json") or not item.is_file():
+                    continue
+                seen.add(item.path)
+                changed |= self.__index(item.path, item.stat())
+                entry = entries.get(item.path, None)
+                if entry is None:
+                    continue
+                theme = {"name": item.name[:-5]}
+                theme.update((k, entry[k]) for k in HEADER_FIELDS)
+                res.append(theme)
+            # Forget the removed files
+            for path in [p for p in entries if p not in seen]:
+                if os.path.dirname(path) == self.themes_dir:
+                    entries.pop(path)
+                    changed = True
+            if changed:
+                self.__save()
+        res.sort(key=lambda x: x["name"])
+        return res
+
+    def update(self, path: str) -> None:
+        """Index a theme file added or changed."""
+        with self.__lock:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+            if self.__index(path, stat):
+                self.__save()
+
+    def remove(self, path: str) -> None:
+        """Forget a deleted theme file."""
+        with self.__lock:
+            if self.__load().pop(path, None) is not None:
+                self.__save()
+
+
+theme_index = ThemeIndex(consts.THEMES_DIR, consts.THEME_INDEX_PATH)
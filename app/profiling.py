@@ -0,0 +1,116 @@
+"""
+Startup import-time profile.
+
+Run with the environment variable LCDCANVAS_PROFILE_IMPORTS set to a file path
+to record how long the startup spent importing each module. The report lists
+the modules slowest to import by themselves first, then the full import tree
+like `python -X importtime`, in milliseconds.
+
+This module only uses the standard library, so it can be imported first.
+"""
+
+import builtins
+import importlib.util
+import os
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+__all__ = ["PROFILE_IMPORTS_ENV", "ImportProfiler", "import_profiler"]
+
+PROFILE_IMPORTS_ENV = "LCDCANVAS_PROFILE_IMPORTS"
+
+
+class ImportProfiler:
+    """
+    Time the imports by wrapping `builtins.__import__`. An import is recorded
+    when it loads new modules, its self time excludes the nested imports.
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[str] = None
+        # (module, depth, self seconds, cumulative seconds), in the order the imports finished
+        self.records: List[Tuple[str, int, float, float]] = list()
+        self.__stack: List[float] = list()
+        self.__import: Optional[Callable] = None
+        self.__started_at = 0.0
+
+    def is_running(self) -> bool:
+        return self.__import is not None
+
+    def start(self, path: str) -> None:
+        if self.is_running():
+            return
+        self.path = path
+        self.records = list()
+        self.__started_at = time.perf_counter()
+        self.__import = builtins.__import__
+        builtins.__import__ = self.__timed_import
+
+    def __timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        loaded = len(sys.modules)
+        depth = len(self.__stack)
+        self.__stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.__import(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - start
+            nested = self.__stack.pop()
+            if self.__stack:
+                self.__stack[-1] += total
+            if len(sys.modules) > loaded:
+                module = self.__module_name(name, globals, level)
+                if fromlist:
+                    module = f"{module} ({', '.join(map(str, fromlist))})"
+                self.records.append((module, depth, total - nested, total))
+
+    @staticmethod
+    def __module_name(name: str, globals: Optional[dict], level: int) -> str:
+        if level == 0 or not globals:
+            return name
+        try:
+            package = globals.get("__package__") or globals.get("__name__", "")
+            return importlib.util.resolve_name("." * level + name, package)
+        except (ImportError, ValueError):
+            return name
+
+    def stop(self) -> None:
+        """Stop timing and write the report."""
+        if not self.is_running():
+            return
+        builtins.__import__ = self.__import
+        self.__import = None
+        elapsed = time.perf_counter() - self.__started_at
+        try:
+            with open(self.path, "w", encoding="utf-8") as fp:
+                fp.write(self.report(elapsed))
+        except OSError as e:
+            print(f"Write the import profile <{self.path}> error: {e}", file=sys.stderr)
+
+    def report(self, elapsed: float) -> str:
+        top = sorted(self.records, key=lambda r: r[2], reverse=True)[:30]
+        imported = sum(r[3] for r in self.records if r[1] == 0)
+        lines = [
+            f"Profiled {elapsed * 1000:.1f}ms, imports {imported * 1000:.1f}ms, "
+            f"{len(self.records)} imports",
+            "",
+            "Slowest imports (self ms, cumulative ms, module):",
+        ]
+        lines += [f"{r[2] * 1000:10.2f} {r[3] * 1000:10.2f}  {r[0]}" for r in top]
+        lines += ["", "Import tree (self ms, cumulative ms, module):"]
+        lines += [
+            f"{r[2] * 1000:10.2f} {r[3] * 1000:10.2f}  {'  ' * r[1]}{r[0]}"
+            for r in self.records
+        ]
+        return "\n".join(lines) + "\n"
+
+
+import_profiler = ImportProfiler()
+
+
+def start_from_env() -> None:
+    """Start the profiler if `PROFILE_IMPORTS_ENV` names the report file."""
+    path = os.environ.get(PROFILE_IMPORTS_ENV, "")
+    if path:
+        import_profiler.start(path)
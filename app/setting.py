@@ -1,11 +1,17 @@
+import atexit
 import json
 import locale
+import logging
 import os
+import threading
+import time
 
 from app.consts import SETTING_PATH
 
 __all__ = ["settings"]
 
+logger = logging.getLogger()
+
 # Get the current locale and set the default locale
 current_locale, _ = locale.getdefaultlocale()
 
@@ -29,35 +35,126 @@ class Settings:
         },
     }
 
+    # The changes are written after no change for flush_delay seconds,
+    # or after flush_max_delay seconds while they keep coming
+    flush_delay = 1.0
+    flush_max_delay = 5.0
+
     def __init__(self):
         self.__settings = self.DefaultSettings
+        self.__saved = ""  # The content of the settings file
+        self.__lock = threading.Lock()
+        self.__changed = threading.Condition(self.__lock)
+        # Serialize the writes, the setters only wait for the snapshot
+        self.__write_lock = threading.Lock()
+        self.__dirty_since = None
+        self.__dirty_at = None
+        self.__flusher = None
         self.load_from_file()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def __dumps(value) -> str:
+        return json.dumps(value, indent=4)
+
+    def __write(self, content: str):
+        tmp_path = f"{SETTING_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            fp.write(content)
+        os.replace(tmp_path, SETTING_PATH)
 
     def save_to_file(self):
-        with open(SETTING_PATH, "w", encoding="utf-8") as fp:
-            json.dump(self.__settings, fp, indent=4)
+        """Write the settings now if they differ from the settings file."""
+        with self.__write_lock:
+            with self.__lock:
+                content = self.__dumps(self.__settings)
+                self.__dirty_since = self.__dirty_at = None
+                if content == self.__saved:
+                    return
+            # Out of the lock, the setters do not wait for the disk
+            try:
+                self.__write(content)
+            except OSError as e:
+                logger.error(f"Save the settings <{SETTING_PATH}> error: {e}")
+                with self.__lock:
+                    self.__retry_later()
+                return
+            with self.__lock:
+                self.__saved = content
 
     def load_from_file(self):
         if not os.path.exists(SETTING_PATH):
-            with open(SETTING_PATH, "w", encoding="utf-8") as fp:
-                json.dump(self.DefaultSettings, fp, indent=4)
+            self.__write(self.__dumps(self.DefaultSettings))
         with open(SETTING_PATH, "r", encoding="utf-8") as fp:
             self.__settings = json.load(fp)
+        self.__saved = self.__dumps(self.__settings)
+
+    def flush(self):
+        """Write the pending changes, called on exit."""
+        if self.__dirty_at is not None:
+            self.save_to_file()
+
+    def __mark_dirty(self):
+        """Schedule the write of the changes, called with the lock held."""
+        now = time.monotonic()
+        if self.__dirty_since is None:
+            self.__dirty_since = now
+        self.__dirty_at = now
+        if self.__flusher is None:
+            self.__flusher = threading.Thread(
+                target=self.__flush_loop, name="SettingsFlusher", daemon=True
+            )
+            self.__flusher.start()
+        self.__changed.notify()
+
+    def __retry_later(self):
+        """Keep the changes pending after a failed write, retried after flush_delay."""
+        self.__dirty_since = None
+        self.__mark_dirty()
+
+    def __flush_loop(self):
+        while True:
+            with self.__lock:
+                while self.__dirty_at is None:
+                    self.__changed.wait()
+                due = min(
+                    self.__dirty_at + self.flush_delay,
+                    self.__dirty_since + self.flush_max_delay,
+                )
+                delay = due - time.monotonic()
+                if delay > 0:
+                    # Woken up early by a new change, the due time moves later
+                    self.__changed.wait(delay)
+                    continue
+            try:
+                self.save_to_file()
+            except Exception as e:
+                # The flusher is not started again, it must not die
+                logger.error(f"Settings flusher error: {e}")
+                with self.__lock:
+                    self.__retry_later()
 
     def get(self, key: str, default=None):
         return self.__settings.get(key, default)
 
     def set(self, key: str, value):
-        self.__settings[key] = value
-        self.save_to_file()
+        with self.__lock:
+            self.__settings[key] = value
+            self.__mark_dirty()
 
     def set_monitor_settings(self, settings: dict):
-        self.__settings["monitor"].update(settings)
-        self.save_to_file()
+        with self.__lock:
+            monitor = self.__settings["monitor"]
+            if any(monitor.get(k) != v for k, v in settings.items()):
+                monitor.update(settings)
+                self.__mark_dirty()
 
     def set_screen_settings(self, screen: str, settings: dict):
-        self.__settings["screens"].setdefault(screen, {}).update(settings)
-        self.save_to_file()
+        with self.__lock:
+            screen_settings = self.__settings["screens"].setdefault(screen, {})
+            if any(screen_settings.get(k) != v for k, v in settings.items()):
+                screen_settings.update(settings)
+                self.__mark_dirty()
 
     def get_monitor_settings(self) -> dict:
         return self.__settings["monitor"]
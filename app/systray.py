@@ -7,6 +7,7 @@ import win32api  # type: ignore
 import win32con  # type: ignore
 import win32gui  # type: ignore
 from app import consts
+from app.setting import settings
 from app.ui import UIWindowManager
 from app.hardware_monitor.monitor import hardware_monitor_api
 from app.i18n import t
@@ -90,6 +91,8 @@ class SysTrayIcon:
             hardware_monitor_api.toggleDisplay(False)
             # close all windows
             UIWindowManager.close_all_windows()
+            # write the pending settings changes, os._exit skips atexit
+            settings.flush()
             win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
             time.sleep(0.2)
             os._exit(0)
@@ -1,5 +1,7 @@
 # coding:utf-8
 import logging
+import time
+import psutil
 import webview
 import win32api  # type: ignore
 import win32con  # type: ignore
@@ -14,6 +16,7 @@ logger = logging.getLogger()
 class UIWindowManager:
     ThemePlayerWindow: webview.Window = None
     HWMonitorWindow: webview.Window = None
+    FirstShownAt: float = None
 
     @classmethod
     def close_all_windows(cls):
@@ -48,6 +51,7 @@ class UIWindowManager:
             resizable=False,
         )
         window.events.closed += cls._on_window_closed(window=window)
+        window.events.shown += cls._on_window_shown
         cls.HWMonitorWindow = window
         logger.debug("Create HWMonitor window success")
         return window
@@ -86,6 +90,18 @@ class UIWindowManager:
 
         return func
 
+    @classmethod
+    def _on_window_shown(cls):
+        if cls.FirstShownAt is not None:
+            return
+        cls.FirstShownAt = time.time()
+        startup = cls.FirstShownAt - psutil.Process().create_time()
+        logger.info(f"Startup to first window: {startup:.2f}s")
+        # Open the hardware sensors now the UI is visible
+        from app.hardware_monitor.sensors import warm_up
+
+        warm_up()
+
     @classmethod
     def _on_window_closed(cls, window: webview.Window):
         def func():
@@ -120,4 +136,5 @@ class UIAPIBase:
         # clean weather cache data
         from app.hardware_monitor.sensors import weather
 
-        weather.clean_cache()
+        if weather.is_ready():
+            weather.clean_cache()
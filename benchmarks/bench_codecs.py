@@ -0,0 +1,77 @@
+"""
+Benchmark the frame codecs on frames rendered from the bundled themes.
+
+Every theme is rendered for a sequence of frames with the values of the fake
+sensor backend, then every frame is encoded with every codec. The tile codec
+encodes each frame against the previous one, like a driver sending a stream.
+
+Usage: python -m benchmarks.bench_codecs
+"""
+
+import glob
+import os
+import time
+from typing import Dict, List
+import numpy as np
+from app.hardware_monitor.backends.fake import FakeBackend
+from app.hardware_monitor.renderer import ThemeRenderer
+from libs.lcds._codecs import CODECS, choose_codec
+from libs.lcds._pixels import RGB565Converter
+
+THEMES = sorted(glob.glob(os.path.join("themes", "*.json")))
+FRAMES = 30
+
+
+def render_frames(path: str) -> List[np.ndarray]:
+    """RGB565 frames of the theme, the values change on every frame."""
+    with open(path, "r", encoding="utf-8") as fp:
+        content = fp.read()
+    renderer = ThemeRenderer()
+    renderer.load(os.path.basename(path)[:-5], content)
+    backend = FakeBackend()
+    readers = {name: getattr(backend, name)() for name in ("cpu", "gpu", "ram", "disk", "volume")}
+    converter = RGB565Converter(renderer.width, renderer.height)
+    frames = list()
+    for _ in range(FRAMES):
+        renderer.update({name: reader.read() for name, reader in readers.items()})
+        image = renderer.render().convert("RGB")
+        frames.append(np.array(converter.pack(np.asarray(image))))
+    return frames
+
+
+def bench(path: str) -> None:
+    frames = render_frames(path)
+    raw_size = frames[0].nbytes
+    print(f"{path}, {FRAMES} frames of {frames[0].shape[1]}x{frames[0].shape[0]}:")
+    for name, codec in CODECS.items():
+        size = encode_time = 0
+        for i, frame in enumerate(frames):
+            prev = frames[i - 1] if i else None
+            start = time.perf_counter()
+            estimate = codec.estimate(frame, prev)
+            # The first frame has no previous frame, send it raw
+            data = estimate.encode() if estimate else frame.tobytes()
+            encode_time += time.perf_counter() - start
+            size += len(data)
+        print(
+            f"  {name:5s} encode {encode_time / FRAMES * 1000:7.3f}ms/frame\t"
+            f"ratio {raw_size * FRAMES / size:6.1f}x\t{size / FRAMES / 1024:8.1f}KB/frame"
+        )
+    # The codec picked for every frame by the estimates
+    picked: Dict[str, int] = dict()
+    size = 0
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        estimate = choose_codec(frame, frames[i - 1] if i else None, list(CODECS))
+        size += len(estimate.encode())
+        picked[estimate.codec.name] = picked.get(estimate.codec.name, 0) + 1
+    elapsed = time.perf_counter() - start
+    print(
+        f"  best  encode {elapsed / FRAMES * 1000:7.3f}ms/frame\t"
+        f"ratio {raw_size * FRAMES / size:6.1f}x\t{size / FRAMES / 1024:8.1f}KB/frame\t{picked}"
+    )
+
+
+if __name__ == "__main__":
+    for theme in THEMES:
+        bench(theme)
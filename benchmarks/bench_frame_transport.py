@@ -0,0 +1,71 @@
+"""
+Benchmark the frame capture latency of the ThemePlayer window, the base64 JPEG
+data URL path against the raw RGBA loopback transport.
+
+The browser side is simulated: the old path encodes a JPEG data URL like
+`canvas.toDataURL`, the new path posts the RGBA pixels like `playerPushFrame`.
+
+Usage: python -m benchmarks.bench_frame_transport
+"""
+
+import base64
+import http.client
+import time
+from io import BytesIO
+from urllib.parse import urlparse
+import numpy as np
+from PIL import Image
+from app.util import image_from_base64
+from app.hardware_monitor.frame_transport import frame_receiver
+
+SIZES = [(320, 240), (480, 320), (1920, 480)]
+NUMBER = 50
+
+
+def old_path(rgba: np.ndarray) -> Image.Image:
+    stream = BytesIO()
+    Image.fromarray(rgba[..., :3]).save(stream, format="JPEG", quality=80)
+    src = "data:image/jpeg;base64," + base64.b64encode(stream.getvalue()).decode()
+    img = image_from_base64(src)
+    img.load()
+    return img
+
+
+def new_path(rgba: np.ndarray, conn: http.client.HTTPConnection) -> Image.Image:
+    height, width = rgba.shape[:2]
+    seq = frame_receiver.next_seq()
+    url = urlparse(frame_receiver.url)
+    conn.request(
+        "POST",
+        f"{url.path}?seq={seq}&width={width}&height={height}",
+        body=rgba.tobytes(),
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    conn.getresponse().read()
+    return frame_receiver.wait_frame(seq).to_image()
+
+
+def bench(width: int, height: int, conn: http.client.HTTPConnection):
+    rgba = np.random.randint(0, 256, (height, width, 4), dtype=np.uint8)
+    rgba[..., 3] = 255
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        old_path(rgba)
+    old = (time.perf_counter() - start) / NUMBER
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        new_path(rgba, conn)
+    new = (time.perf_counter() - start) / NUMBER
+    print(
+        f"{width}x{height}:\tdata url {old * 1000:.2f}ms\t"
+        f"raw transport {new * 1000:.2f}ms ({old / new:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    frame_receiver.start()
+    url = urlparse(frame_receiver.url)
+    conn = http.client.HTTPConnection(url.hostname, url.port)
+    for w, h in SIZES:
+        bench(w, h, conn)
+    frame_receiver.stop()
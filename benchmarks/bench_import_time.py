@@ -0,0 +1,62 @@
+"""
+Cold-start import time regression benchmark.
+
+Imports the startup modules in fresh interpreters, takes the best of several
+runs and exits with status 1 if it is over the budget, or if a dependency
+that must load on first use (numpy, requests, clr) was imported.
+
+Usage: python -m benchmarks.bench_import_time [budget_ms]
+"""
+
+import subprocess
+import sys
+
+# Budget of the best cold-start import time (milliseconds)
+BUDGET_MS = 400
+RUNS = 5
+# The startup imports of main.py, the Windows only modules are left out elsewhere
+if sys.platform == "win32":
+    MODULES = ["app.systray", "app.ui", "app.util"]
+else:
+    MODULES = [
+        "app.setting",
+        "app.i18n",
+        "app.hardware_monitor.sensors",
+        "app.hardware_monitor.sampler",
+        "app.hardware_monitor.pipeline",
+        "app.hardware_monitor.renderer",
+        "app.hardware_monitor.frame_transport",
+    ]
+DEFERRED = ["numpy", "requests", "clr"]
+
+SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+{"; ".join(f"import {m}" for m in MODULES)}
+cost = time.perf_counter() - start
+print(cost, ",".join(m for m in {DEFERRED!r} if m in sys.modules))
+"""
+
+
+def run() -> tuple:
+    res = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    )
+    cost, _, loaded = res.stdout.strip().splitlines()[-1].partition(" ")
+    return float(cost), [m for m in loaded.split(",") if m]
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    results = [run() for _ in range(RUNS)]
+    best = min(cost for cost, _ in results) * 1000
+    loaded = sorted({m for _, mods in results for m in mods})
+    print(f"Cold-start imports: best {best:.1f}ms of {RUNS} runs, budget {budget:.0f}ms")
+    failed = False
+    if best > budget:
+        print(f"FAIL: over the budget by {best - budget:.1f}ms")
+        failed = True
+    if loaded:
+        print(f"FAIL: deferred dependencies imported at startup: {', '.join(loaded)}")
+        failed = True
+    sys.exit(1 if failed else 0)
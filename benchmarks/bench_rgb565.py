@@ -0,0 +1,38 @@
+"""
+Benchmark the RGB565 conversion: `image2rgb565_le` against `RGB565Converter`.
+
+Usage: python -m benchmarks.bench_rgb565
+"""
+
+import timeit
+import numpy as np
+from PIL import Image
+from libs.lcds._pixels import RGB565Converter, image2rgb565_le
+
+SIZES = [(320, 240), (480, 320), (1920, 480)]
+NUMBER = 200
+
+
+def bench(width: int, height: int):
+    rgb = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+    image = Image.fromarray(rgb, mode="RGB")
+    converter = RGB565Converter(width, height)
+    # Both paths must produce the same bytes
+    assert converter.convert_bytes(image) == image2rgb565_le(image)
+
+    old = timeit.timeit(lambda: image2rgb565_le(image), number=NUMBER) / NUMBER
+    new = timeit.timeit(lambda: converter.convert(image), number=NUMBER) / NUMBER
+    new_bytes = (
+        timeit.timeit(lambda: converter.convert_bytes(image), number=NUMBER) / NUMBER
+    )
+    print(
+        f"{width}x{height}:\t"
+        f"image2rgb565_le {old * 1000:.3f}ms\t"
+        f"convert {new * 1000:.3f}ms ({old / new:.1f}x)\t"
+        f"convert_bytes {new_bytes * 1000:.3f}ms ({old / new_bytes:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    for w, h in SIZES:
+        bench(w, h)
@@ -0,0 +1,45 @@
+"""
+Benchmark the per-frame cost of the screen rotation at every angle:
+`Image.rotate` then RGB565 conversion, against the rotation folded into the
+conversion as a `rotate_view`.
+
+Usage: python -m benchmarks.bench_rotation
+"""
+
+import timeit
+import numpy as np
+from PIL import Image
+from libs.lcds._pixels import RGB565Converter
+
+SIZES = [(320, 240), (480, 320), (1920, 480)]
+ANGLES = [0, 90, 180, 270]
+NUMBER = 200
+
+
+def bench(width: int, height: int, rotation: int):
+    rgb = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+    image = Image.fromarray(rgb, mode="RGB")
+    size = (width, height) if rotation % 180 == 0 else (height, width)
+    converter = RGB565Converter(*size)
+
+    def old():
+        return converter.convert(image.rotate(rotation, expand=True))
+
+    def new():
+        return converter.convert(image, rotation)
+
+    # Both paths must produce the same bytes
+    assert bytes(old()) == bytes(new())
+    old_time = timeit.timeit(old, number=NUMBER) / NUMBER
+    new_time = timeit.timeit(new, number=NUMBER) / NUMBER
+    print(
+        f"{width}x{height} {rotation:3d}°:\t"
+        f"rotate+convert {old_time * 1000:.3f}ms\t"
+        f"convert(rotation) {new_time * 1000:.3f}ms ({old_time / new_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    for w, h in SIZES:
+        for angle in ANGLES:
+            bench(w, h, angle)
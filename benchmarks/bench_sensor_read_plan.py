@@ -0,0 +1,126 @@
+"""
+Benchmark the per-tick cost of reading the CPU and GPU sensors: the accessor
+methods reading `sensor.Value` for every derived value, against the compiled
+`ReadPlan` reading every `Value` once.
+
+The sensors are stand-ins whose `Value` property has a fixed cost, like the
+pythonnet boundary crossing, so the benchmark runs without the hardware.
+
+Usage: python -m benchmarks.bench_sensor_read_plan
+"""
+
+import time
+import timeit
+from statistics import mean
+from app.hardware_monitor.backends._plan import ReadPlan
+
+NUMBER = 20000
+# Cost of one `Value` access (seconds)
+CROSSING_COST = 2e-6
+
+
+class FakeSensor:
+    reads = 0
+
+    def __init__(self, value: float) -> None:
+        self.__value = value
+
+    @property
+    def Value(self) -> float:
+        FakeSensor.reads += 1
+        end = time.perf_counter() + CROSSING_COST
+        while time.perf_counter() < end:
+            pass
+        return self.__value
+
+
+CPU_LOAD = FakeSensor(37.5)
+CPU_FREQUENCY = [FakeSensor(3400 + i * 25) for i in range(8)]
+CPU_TEMPERATURE = FakeSensor(61.3)
+CPU_FAN = FakeSensor(1200)
+GPU_LOAD = FakeSensor(44)
+GPU_MEM_CONTROLLER_LOAD = FakeSensor(12)
+GPU_FREQUENCY = FakeSensor(1850)
+GPU_TEMPERATURE = FakeSensor(55.6)
+GPU_FAN = FakeSensor(900)
+GPU_MEM_USED = FakeSensor(3120)
+GPU_MEM_TOTAL = 8192
+
+
+def old_tick() -> dict:
+    """The accessor methods of CPU and GPU before the read plans."""
+    cpu = {
+        "load": CPU_LOAD and max(round(CPU_LOAD.Value / 100, 2), 0.01),
+        "frequency": round(mean([s.Value for s in CPU_FREQUENCY]) / 1000, 2),
+        "temperature": CPU_TEMPERATURE and int(CPU_TEMPERATURE.Value),
+        "fan": CPU_FAN and int(CPU_FAN.Value),
+    }
+
+    def total():
+        return round(GPU_MEM_TOTAL / 1024, 0)
+
+    def used():
+        return round(GPU_MEM_USED.Value / 1024, 1)
+
+    res = GPU_LOAD.Value + GPU_MEM_CONTROLLER_LOAD.Value
+    gpu = {
+        "load": round(min(res, 100) / 100, 2),
+        "frequency": round(GPU_FREQUENCY.Value / 1000, 2),
+        "temperature": int(GPU_TEMPERATURE.Value),
+        "fan": int(GPU_FAN.Value),
+        "total": total(),
+        "used": used(),
+        "free": None if total() is None or used() is None else total() - used(),
+    }
+    return {"cpu": cpu, "gpu": gpu}
+
+
+cpu_plan = ReadPlan()
+cpu_plan.add("load", [CPU_LOAD], scale=0.01, digits=2, low=0.01)
+cpu_plan.add("frequency", CPU_FREQUENCY, scale=0.001, digits=2)
+cpu_plan.add("temperature", [CPU_TEMPERATURE])
+cpu_plan.add("fan", [CPU_FAN])
+cpu_plan.compile()
+gpu_plan = ReadPlan()
+gpu_plan.add(
+    "load",
+    [GPU_LOAD, GPU_MEM_CONTROLLER_LOAD],
+    scale=0.01,
+    digits=2,
+    high=1,
+    reduce="sum",
+)
+gpu_plan.add("frequency", [GPU_FREQUENCY], scale=0.001, digits=2)
+gpu_plan.add("temperature", [GPU_TEMPERATURE])
+gpu_plan.add("fan", [GPU_FAN])
+gpu_plan.add("used", [GPU_MEM_USED], scale=1 / 1024, digits=1)
+gpu_plan.compile()
+
+
+def new_tick() -> dict:
+    gpu = gpu_plan.execute()
+    total = round(GPU_MEM_TOTAL / 1024, 0)
+    gpu["total"] = total
+    gpu["free"] = total - gpu["used"]
+    return {"cpu": cpu_plan.execute(), "gpu": gpu}
+
+
+def bench(name: str, func) -> float:
+    FakeSensor.reads = 0
+    func()
+    reads = FakeSensor.reads
+    cost = timeit.timeit(func, number=NUMBER) / NUMBER
+    print(f"{name}:\t{cost * 1e6:.2f}us/tick\t{reads} Value reads/tick")
+    return cost
+
+
+if __name__ == "__main__":
+    old, new = old_tick(), new_tick()
+    for sensor in old:
+        assert old[sensor] == new[sensor], (sensor, old[sensor], new[sensor])
+    for crossing_cost in (0, CROSSING_COST):
+        CROSSING_COST = crossing_cost
+        print(f"Value access cost {crossing_cost * 1e6:.0f}us")
+        old_cost = bench("accessors", old_tick)
+        new_cost = bench("read plan", new_tick)
+        print(f"speedup {old_cost / new_cost:.1f}x")
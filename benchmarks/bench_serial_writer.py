@@ -0,0 +1,123 @@
+"""
+Run `SerialLCD` end to end against a pseudo-terminal standing in for the panel.
+
+The stand-in device reads the master side of the pty, records the throughput
+and the time each brightness command arrives, to check that the commands are
+written between the packets of a frame instead of after it. POSIX only.
+
+Usage: python -m benchmarks.bench_serial_writer
+"""
+
+import os
+import pty
+import threading
+import time
+import tty
+from typing import List
+import numpy as np
+from PIL import Image
+from libs.lcds._serial import SerialLCD
+
+WIDTH, HEIGHT = 320, 240
+FRAMES = 60
+FRAME_MAGIC = b"\xaa\x55"
+BRIGHTNESS_MAGIC = b"\xbb\x66"
+
+
+class BenchLCD(SerialLCD):
+    """A made up protocol: the encoded frame is split in packets of 8KB."""
+
+    width, height = WIDTH, HEIGHT
+    baudrate = 4000000
+    codecs = ("raw", "rle", "tile")
+    packet_size = 8192
+
+    def unique_id(self) -> str:
+        return f"BenchLCD-{self.port}"
+
+    def frame_packets(self, codec: str, payload: bytes) -> List[bytes]:
+        codec_id = self.codecs.index(codec).to_bytes(1, "little")
+        return [
+            FRAME_MAGIC + codec_id + payload[i : i + self.packet_size]
+            for i in range(0, len(payload), self.packet_size)
+        ] or [FRAME_MAGIC + codec_id]
+
+    def brightness_packet(self, brightness: int) -> bytes:
+        return BRIGHTNESS_MAGIC + bytes([brightness])
+
+
+class StandInDevice:
+    """Read everything from the pty master, note the arrival of the commands."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.received = 0
+        self.command_times: List[float] = list()
+        self.first_at = self.last_at = None
+        self.__tail = b""
+        threading.Thread(target=self.__read_loop, daemon=True).start()
+
+    def __read_loop(self) -> None:
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError:
+                return
+            now = time.perf_counter()
+            self.first_at = self.first_at or now
+            self.last_at = now
+            self.received += len(data)
+            window = self.__tail + data
+            self.command_times += [now] * window.count(BRIGHTNESS_MAGIC)
+            self.__tail = data[-1:]
+
+    def throughput(self) -> float:
+        if not self.first_at or self.last_at == self.first_at:
+            return 0.0
+        return self.received / (self.last_at - self.first_at)
+
+
+def bench():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    device = StandInDevice(master)
+    lcd = BenchLCD(os.ttyname(slave))
+    lcd.open()
+    rgb = np.random.randint(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+    display_time = 0.0
+    latencies = list()
+    for i in range(FRAMES):
+        # Noise changes every pixel, so every frame is sent as raw pixels
+        image = Image.fromarray(rgb ^ np.uint8(i), mode="RGB")
+        start = time.perf_counter()
+        lcd.display(image)
+        display_time += time.perf_counter() - start
+        if i % 10 == 5:
+            sent_at = time.perf_counter()
+            count = len(device.command_times)
+            lcd.set_brightness(i)
+            while len(device.command_times) == count:
+                time.sleep(0.0005)
+            latencies.append(device.command_times[count] - sent_at)
+        time.sleep(0.005)
+    lcd.flush(10)
+    time.sleep(0.1)
+    lcd.close()
+    os.close(slave)
+    os.close(master)
+
+    stats = lcd.stats
+    print(
+        f"{FRAMES} frames of {WIDTH * HEIGHT * 2} bytes:\t"
+        f"display() {display_time / FRAMES * 1000:.3f}ms/frame\t"
+        f"written {stats['frames']} dropped {stats['dropped']}\t"
+        f"writer {lcd.throughput() / 1e6:.1f}MB/s, device {device.throughput() / 1e6:.1f}MB/s\t"
+        f"brightness latency max {max(latencies) * 1000:.2f}ms"
+    )
+    assert device.received == stats["bytes"], (device.received, stats["bytes"])
+
+
+if __name__ == "__main__":
+    bench()
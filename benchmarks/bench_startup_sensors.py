@@ -0,0 +1,55 @@
+"""
+Startup cost of the hardware sensors before the first window.
+
+The sensors used to be constructed when `app.hardware_monitor.sensors` was
+imported, so opening the hardware (LibreHardwareMonitor on Windows) and loading
+requests for the weather delayed the first window. They are now constructed at
+the first use, or by `warm_up` once the window is shown. In fresh interpreters
+this compares the critical path of both: "eager" constructs every sensor after
+the import like the module used to, "lazy" only imports it. It also reports how
+long `warm_up` then takes in the background. The sensor backend of the platform
+is used, the numbers of the Windows build are the ones of the LHM backend.
+
+The whole process startup is logged by the app itself on Windows, as
+"Startup to first window" when the first window is shown.
+
+Usage: python -m benchmarks.bench_startup_sensors
+"""
+
+import subprocess
+import sys
+
+RUNS = 5
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from app.hardware_monitor import sensors
+if sys.argv[1] == "eager":
+    for sensor in sensors.SensorsMap.values():
+        sensor.sensor
+critical = time.perf_counter() - start
+start = time.perf_counter()
+sensors.warm_up()
+sensors._warm_up_thread.join()
+print(critical, time.perf_counter() - start)
+"""
+
+
+def run(mode: str) -> tuple:
+    res = subprocess.run(
+        [sys.executable, "-c", SCRIPT, mode], capture_output=True, text=True, check=True
+    )
+    critical, warm_up = res.stdout.strip().splitlines()[-1].split()
+    return float(critical), float(warm_up)
+
+
+if __name__ == "__main__":
+    for mode in ("eager", "lazy"):
+        results = [run(mode) for _ in range(RUNS)]
+        critical = min(c for c, _ in results) * 1000
+        warm_up = min(w for _, w in results) * 1000
+        print(
+            f"{mode:5}: before the first window {critical:7.1f}ms, "
+            f"warm up in the background {warm_up:7.1f}ms (best of {RUNS})"
+        )
@@ -0,0 +1,59 @@
+"""
+Benchmark listing the themes: full `json.load` of every file against the
+theme index, cold (partial parse of every file) and warm (stat only).
+
+Usage: python -m benchmarks.bench_theme_index
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import timeit
+from app.hardware_monitor.theme_index import ThemeIndex
+
+SOURCE = os.path.join("themes", "lcdcanvas.json")
+COUNT = 100
+NUMBER = 20
+
+
+def load_all(themes_dir: str):
+    res = list()
+    for filename in os.listdir(themes_dir):
+        with open(os.path.join(themes_dir, filename), "r", encoding="utf-8") as fp:
+            theme = json.load(fp)
+        res.append((filename, theme["shape"], theme.get("width", 0)))
+    return res
+
+
+def bench():
+    workdir = tempfile.mkdtemp()
+    themes_dir = os.path.join(workdir, "themes")
+    index_path = os.path.join(workdir, "theme_index.json")
+    os.makedirs(themes_dir)
+    try:
+        for i in range(COUNT):
+            shutil.copy(SOURCE, os.path.join(themes_dir, f"theme{i:03}.json"))
+
+        def cold():
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            return ThemeIndex(themes_dir, index_path).themes()
+
+        full = timeit.timeit(lambda: load_all(themes_dir), number=NUMBER) / NUMBER
+        first = timeit.timeit(cold, number=NUMBER) / NUMBER
+        index = ThemeIndex(themes_dir, index_path)
+        assert len(index.themes()) == COUNT
+        warm = timeit.timeit(index.themes, number=NUMBER) / NUMBER
+        print(
+            f"{COUNT} themes of {os.path.getsize(SOURCE) // 1024}KB:\t"
+            f"json.load {full * 1000:.2f}ms\t"
+            f"index cold {first * 1000:.2f}ms ({full / first:.1f}x)\t"
+            f"index warm {warm * 1000:.2f}ms ({full / warm:.1f}x)"
+        )
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    bench()
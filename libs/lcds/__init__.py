@@ -1,7 +1,5 @@
 from typing import Dict
-from ._base import LCD, generate_random_image, image2rgb565_le
-from .VirtualScreen import LCD_VirtualScreen
-from .SecondScreen import find_2nd_screen
+from ._base import LCD, generate_random_image
 
 __all__ = [
     "LCD",
@@ -9,15 +7,47 @@ __all__ = [
     "SUPPORT_SCREENS_MAP",
     "generate_random_image",
     "image2rgb565_le",
+    "RGB565Converter",
+    "SerialLCD",
 ]
 
-# Create lcd screen driver instances
-lcd_virtual_screen = LCD_VirtualScreen()
+
+def __getattr__(name: str):
+    # The window screens load pywebview and pywin32, import them at the first use
+    if name == "lcd_virtual_screen":
+        return _virtual_screen()
+    # The pixel converters load numpy, import them at the first use
+    if name in ("RGB565Converter", "image2rgb565_le"):
+        from . import _pixels
+
+        return getattr(_pixels, name)
+    # The base of the serial screens loads pyserial
+    if name == "SerialLCD":
+        from ._serial import SerialLCD
+
+        return SerialLCD
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# The lcd screen driver instances, created at the first use
+_lcd_virtual_screen: LCD = None
+
+
+def _virtual_screen() -> LCD:
+    global _lcd_virtual_screen
+    if _lcd_virtual_screen is None:
+        from .VirtualScreen import LCD_VirtualScreen
+
+        _lcd_virtual_screen = LCD_VirtualScreen()
+    return _lcd_virtual_screen
 
 
 # Supported and connected screens map
 def find_connected_screens() -> Dict[str, LCD]:
     """Find all supported screen"""
+    from .SecondScreen import find_2nd_screen
+
+    lcd_virtual_screen = _virtual_screen()
     res = {
         lcd_virtual_screen.unique_id(): lcd_virtual_screen,
     }
@@ -1,12 +1,39 @@
 import base64
 from io import BytesIO
-import win32gui  # type: ignore
-import win32con  # type: ignore
 from PIL import Image, ImageFile
-import numpy as np
 from random import randint
 
 
+# Transpositions of the right angles, the same as `Image.rotate(angle, expand=True)`
+ROTATE_TRANSPOSE = {
+    1: Image.Transpose.ROTATE_90,
+    2: Image.Transpose.ROTATE_180,
+    3: Image.Transpose.ROTATE_270,
+}
+
+
+def rotation_turns(rotation: int) -> int:
+    """The number of counter-clockwise quarter turns of the rotation angle."""
+    if rotation % 90:
+        raise ValueError(f"Unsupported rotation {rotation}, must be a multiple of 90")
+    return rotation // 90 % 4
+
+
+def rotate_image(image: Image.Image, rotation: int) -> Image.Image:
+    """Rotate the image counter-clockwise by transposing it, no resampling."""
+    turns = rotation_turns(rotation)
+    return image.transpose(ROTATE_TRANSPOSE[turns]) if turns else image
+
+
+def __getattr__(name: str):
+    # Moved to _pixels, which loads numpy, kept importable from here
+    if name in ("RGB565Converter", "image2rgb565_le"):
+        from . import _pixels
+
+        return getattr(_pixels, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # lcd interface base clase
 class LCD:
 
@@ -45,6 +72,64 @@ class LCD:
         # Raise an error indicating that the method is not implemented
         raise NotImplementedError
 
+    # Drivers that implement `display_region` should set this to True
+    supports_region_update = False
+    # Send the whole frame when more than this fraction of the pixels changed
+    region_update_max_ratio = 0.5
+
+    def display_region(self, x: int, y: int, w: int, h: int, data: bytes) -> None:
+        """
+        Update a rectangle of the screen, `data` is the RGB565 pixels of the region.
+        Optional, only called when `supports_region_update` is True, the full
+        frames are sent as a region covering the whole screen.
+        """
+        raise NotImplementedError
+
+    def invalidate_frame(self) -> None:
+        """
+        Forget the last displayed frame, the next `display_changes` sends a full frame.
+        """
+        self._frame_differ = None
+
+    def display_changes(self, image: Image.Image, rotation: int = 0) -> None:
+        """
+        Display the image rotated counter-clockwise by `rotation` degrees, sending
+        only the changed regions when the driver supports it.
+        Drivers without region update support always get the full frame.
+        """
+        if not self.supports_region_update:
+            self.display(rotate_image(image, rotation))
+            return
+        # Only the drivers converting pixels load numpy
+        import numpy as np
+        from ._pixels import FrameDiffer, RGB565Converter, rotate_view
+
+        # The rotation is a view of the pixels, the converter packs it directly
+        rgb = rotate_view(np.asarray(image.convert("RGB")), rotation)
+        size = (rgb.shape[1], rgb.shape[0])
+        converter: RGB565Converter = getattr(self, "_frame_converter", None)
+        if converter is None or converter.size != size:
+            converter = self._frame_converter = RGB565Converter(*size)
+            self._frame_differ = None
+        differ: FrameDiffer = getattr(self, "_frame_differ", None)
+        frame = converter.pack(rgb)
+        width, height = size
+        if differ is None:
+            differ = FrameDiffer(width, height)
+            differ.update(frame)
+            self.display_region(0, 0, width, height, frame.tobytes())
+            self._frame_differ = differ
+            return
+        regions = differ.diff(frame)
+        if not regions:
+            return
+        changed_pixels = sum(w * h for _, _, w, h in regions)
+        if changed_pixels > frame.size * self.region_update_max_ratio:
+            regions = [(0, 0, width, height)]
+        for x, y, w, h in regions:
+            self.display_region(x, y, w, h, frame[y : y + h, x : x + w].tobytes())
+        differ.update(frame)
+
     def clear(self) -> None:
         # Raise an error indicating that the method is not implemented
         raise NotImplementedError
@@ -58,21 +143,6 @@ class LCD:
         raise NotImplementedError
 
 
-# Convert the image to RGB565LE format
-def image2rgb565_le(image: Image.Image):
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-    # Use more precise bitwise operations
-    rgb = np.asarray(image, dtype=np.uint32)  # Increase precision to avoid overflow
-    r = (rgb[..., 0] >> 3).astype(np.uint16)  # 5-bit red
-    g = (rgb[..., 1] >> 2).astype(np.uint16)  # 6-bit green
-    b = (rgb[..., 2] >> 3).astype(np.uint16)  # 5-bit blue
-    # Correct the bit combination order
-    rgb565 = (r << 11) | (g << 5) | b
-    # Restore the original byte order processing method
-    return rgb565.byteswap().tobytes()
-
-
 # Generate a random image
 def generate_random_image(width: int, height: int):
     # Create random pixel data
@@ -88,6 +158,10 @@ def generate_random_image(width: int, height: int):
 
 # Hide the window from the taskbar
 def hide_window_from_taskbar(window_title: str):
+    # pywin32 is only loaded by the window screens, the package imports without it
+    import win32gui  # type: ignore
+    import win32con  # type: ignore
+
     hwnd = win32gui.FindWindow(None, window_title)
     if not hwnd:
         return
@@ -0,0 +1,151 @@
+"""
+Frame codecs of the screen transports.
+
+A frame is a (height, width) uint16 array of RGB565 pixels in the byte order of
+the wire, like `RGB565Converter.frame`. Every codec estimates the encoded size
+of a frame first, so a driver can pick the cheapest codec its firmware accepts
+and only encode with that one.
+
+- raw: the pixels as they are.
+- rle: runs of the same pixel, (count: u16 LE, pixel: u16) pairs.
+- tile: the tiles changed since the previous frame, count: u32 LE, then the
+  (column, row) u16 LE index of every tile, then the pixels of every tile. The
+  edge tiles are padded with zeros, the firmware crops them.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+import numpy as np
+
+__all__ = [
+    "CODECS",
+    "Codec",
+    "Estimate",
+    "RawCodec",
+    "RLECodec",
+    "TileDeltaCodec",
+    "register_codec",
+    "choose_codec",
+]
+
+
+class Estimate(NamedTuple):
+    codec: "Codec"
+    size: int  # Encoded bytes
+    encode: Callable[[], bytes]
+
+
+class Codec:
+    name = ""
+    # Whether the codec needs the frame currently on the screen
+    needs_previous = False
+
+    def estimate(self, frame: np.ndarray, prev: Optional[np.ndarray]) -> Optional[Estimate]:
+        """The encoded size of the frame, None if the codec can not encode it."""
+        raise NotImplementedError
+
+    def encode(self, frame: np.ndarray, prev: Optional[np.ndarray] = None) -> bytes:
+        estimate = self.estimate(frame, prev)
+        if estimate is None:
+            raise ValueError(f"Codec <{self.name}> can not encode the frame")
+        return estimate.encode()
+
+
+class RawCodec(Codec):
+    name = "raw"
+
+    def estimate(self, frame, prev):
+        return Estimate(self, frame.nbytes, frame.tobytes)
+
+
+class RLECodec(Codec):
+    name = "rle"
+    max_run = 0xFFFF
+
+    def estimate(self, frame, prev):
+        flat = frame.ravel()
+        starts = np.flatnonzero(np.concatenate(([True], flat[1:] != flat[:-1])))
+        lengths = np.diff(np.append(starts, flat.size))
+        # The runs longer than max_run are split into several pairs
+        pieces = (lengths + self.max_run - 1) // self.max_run
+        count = int(pieces.sum())
+
+        def encode() -> bytes:
+            out = np.empty(count, dtype=[("count", "<u2"), ("pixel", flat.dtype)])
+            if count == starts.size:
+                out["count"] = lengths
+                out["pixel"] = flat[starts]
+            else:
+                run = np.repeat(np.arange(starts.size), pieces)
+                first = np.repeat(np.cumsum(pieces) - pieces, pieces)
+                offset = (np.arange(count) - first) * self.max_run
+                out["count"] = np.minimum(lengths[run] - offset, self.max_run)
+                out["pixel"] = flat[starts[run]]
+            return out.tobytes()
+
+        return Estimate(self, count * (2 + flat.itemsize), encode)
+
+
+class TileDeltaCodec(Codec):
+    name = "tile"
+    needs_previous = True
+
+    def __init__(self, tile_size: int = 16) -> None:
+        self.tile_size = tile_size
+
+    def __tiles(self, frame: np.ndarray) -> np.ndarray:
+        """(rows, cols, tile_size, tile_size) view of the frame padded to whole tiles."""
+        ts = self.tile_size
+        height, width = frame.shape
+        pad_h, pad_w = -height % ts, -width % ts
+        if pad_h or pad_w:
+            frame = np.pad(frame, ((0, pad_h), (0, pad_w)))
+        rows, cols = frame.shape[0] // ts, frame.shape[1] // ts
+        return frame.reshape(rows, ts, cols, ts).swapaxes(1, 2)
+
+    def estimate(self, frame, prev):
+        if prev is None or prev.shape != frame.shape:
+            return None
+        ts = self.tile_size
+        tiles = self.__tiles(frame)
+        changed = (tiles != self.__tiles(prev)).any(axis=(2, 3))
+        rows, cols = np.nonzero(changed)
+        size = 4 + rows.size * (4 + ts * ts * frame.itemsize)
+
+        def encode() -> bytes:
+            index = np.empty((rows.size, 2), dtype="<u2")
+            index[:, 0] = cols
+            index[:, 1] = rows
+            return b"".join(
+                [
+                    np.uint32(rows.size).astype("<u4").tobytes(),
+                    index.tobytes(),
+                    tiles[rows, cols].tobytes(),
+                ]
+            )
+
+        return Estimate(self, size, encode)
+
+
+CODECS: Dict[str, Codec] = dict()
+
+
+def register_codec(codec: Codec) -> None:
+    CODECS[codec.name] = codec
+
+
+for _codec in (RawCodec(), RLECodec(), TileDeltaCodec()):
+    register_codec(_codec)
+
+
+def choose_codec(
+    frame: np.ndarray, prev: Optional[np.ndarray], accepted: Sequence[str]
+) -> Estimate:
+    """The estimate of the accepted codec with the smallest encoded size."""
+    best = None
+    for name in accepted:
+        estimate = CODECS[name].estimate(frame, prev)
+        if estimate is not None and (best is None or estimate.size < best.size):
+            best = estimate
+    if best is None:
+        raise ValueError(f"None of the codecs {list(accepted)} can encode the frame")
+    return best
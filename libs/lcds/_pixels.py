@@ -0,0 +1,159 @@
+"""
+Pixel conversion of the screen drivers, the only part of the drivers using
+numpy, imported when a driver converts its first frame.
+"""
+
+from typing import List, Tuple
+import numpy as np
+from PIL import Image
+from ._base import rotation_turns
+
+
+def rotate_view(rgb: np.ndarray, rotation: int) -> np.ndarray:
+    """
+    The pixels rotated counter-clockwise like `Image.rotate(rotation, expand=True)`,
+    a strided view of the array, no pixel is copied.
+    """
+    return np.rot90(rgb, rotation_turns(rotation))
+
+
+# Convert the image to RGB565LE format
+def image2rgb565_le(image: Image.Image):
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    # Use more precise bitwise operations
+    rgb = np.asarray(image, dtype=np.uint32)  # Increase precision to avoid overflow
+    r = (rgb[..., 0] >> 3).astype(np.uint16)  # 5-bit red
+    g = (rgb[..., 1] >> 2).astype(np.uint16)  # 6-bit green
+    b = (rgb[..., 2] >> 3).astype(np.uint16)  # 5-bit blue
+    # Correct the bit combination order
+    rgb565 = (r << 11) | (g << 5) | b
+    # Restore the original byte order processing method
+    return rgb565.byteswap().tobytes()
+
+
+class RGB565Converter:
+    """
+    Reusable RGB565 packer for a fixed screen size.
+
+    The output buffer and the scratch buffer are allocated once, every frame is
+    packed from the uint8 RGB view through per-channel lookup tables straight
+    into the final byte layout, so no full-frame temporaries are created.
+    The byte layout is the same as `image2rgb565_le`.
+    """
+
+    # Per-channel lookup tables, already shifted into place and byteswapped,
+    # (a | b).byteswap() == a.byteswap() | b.byteswap(), so OR-ing the swapped
+    # entries gives the final byte order without a separate byteswap pass.
+    _LUT_R = ((np.arange(256, dtype=np.uint16) >> 3) << 11).byteswap()
+    _LUT_G = ((np.arange(256, dtype=np.uint16) >> 2) << 5).byteswap()
+    _LUT_B = (np.arange(256, dtype=np.uint16) >> 3).byteswap()
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.__frame = np.empty((height, width), dtype=np.uint16)
+        self.__scratch = np.empty((height, width), dtype=np.uint16)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def frame(self) -> np.ndarray:
+        """The last packed frame as a (height, width) uint16 array."""
+        return self.__frame
+
+    def pack(self, rgb: np.ndarray) -> np.ndarray:
+        """
+        Pack a (height, width, 3) uint8 array into the preallocated frame buffer.
+        The array may be any strided view, like the one of `rotate_view`.
+        """
+        frame, scratch = self.__frame, self.__scratch
+        np.take(self._LUT_R, rgb[..., 0], out=frame)
+        np.take(self._LUT_G, rgb[..., 1], out=scratch)
+        np.bitwise_or(frame, scratch, out=frame)
+        np.take(self._LUT_B, rgb[..., 2], out=scratch)
+        np.bitwise_or(frame, scratch, out=frame)
+        return frame
+
+    def convert(self, image: Image.Image, rotation: int = 0) -> memoryview:
+        """
+        Convert the image rotated counter-clockwise by `rotation` degrees and
+        return a memoryview over the internal buffer.
+        The view is only valid until the next call, copy it if it must be kept.
+        """
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        rgb = rotate_view(np.asarray(image), rotation)
+        if rgb.shape[:2] != (self.height, self.width):
+            raise ValueError(
+                f"Rotated image size {rgb.shape[1::-1]} does not match converter size {(self.width, self.height)}"
+            )
+        self.pack(rgb)
+        return memoryview(self.__frame).cast("B")
+
+    def convert_bytes(self, image: Image.Image, rotation: int = 0) -> bytes:
+        """Same as `convert`, but return an independent bytes object."""
+        return self.convert(image, rotation).tobytes()
+
+
+class FrameDiffer:
+    """
+    Keep the previous frame of a screen and find the tiles that changed since.
+    """
+
+    def __init__(self, width: int, height: int, tile_size: int = 16) -> None:
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.__prev = np.zeros((height, width), dtype=np.uint16)
+        self.__row_starts = np.arange(0, height, tile_size)
+        self.__col_starts = np.arange(0, width, tile_size)
+
+    def update(self, frame: np.ndarray) -> None:
+        """Remember the frame as the one currently on the screen."""
+        np.copyto(self.__prev, frame)
+
+    def changed_tiles(self, frame: np.ndarray) -> np.ndarray:
+        """Return a (rows, cols) bool array, True for tiles that differ from the previous frame."""
+        changed = frame != self.__prev
+        changed = np.logical_or.reduceat(changed, self.__row_starts, axis=0)
+        return np.logical_or.reduceat(changed, self.__col_starts, axis=1)
+
+    def diff(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Return the changed regions as (x, y, w, h) rectangles in pixels.
+        Changed tiles are merged into horizontal runs, and identical runs on
+        consecutive tile rows are merged into one rectangle.
+        """
+        tiles = self.changed_tiles(frame)
+        if not tiles.any():
+            return []
+        # Find the start and the end of every run of changed tiles on each row
+        padded = np.zeros((tiles.shape[0], tiles.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = tiles
+        edges = np.diff(padded, axis=1)
+        run_rows, run_starts = np.nonzero(edges == 1)
+        _, run_ends = np.nonzero(edges == -1)
+        # (row, start, end) in tiles, merge runs with the same span on the next row
+        rects = list()
+        open_rects = dict()
+        for row, start, end in zip(
+            run_rows.tolist(), run_starts.tolist(), run_ends.tolist()
+        ):
+            rect = open_rects.get((start, end))
+            if rect is not None and rect[1] == row:
+                rect[1] = row + 1
+            else:
+                rect = [row, row + 1, start, end]
+                rects.append(rect)
+                open_rects[(start, end)] = rect
+        ts = self.tile_size
+        res = list()
+        for row_start, row_end, col_start, col_end in rects:
+            x, y = col_start * ts, row_start * ts
+            w = min(col_end * ts, self.width) - x
+            h = min(row_end * ts, self.height) - y
+            res.append((x, y, w, h))
+        return res
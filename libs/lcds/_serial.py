@@ -0,0 +1,300 @@
+"""
+Base of the screens connected by a USB serial port.
+
+`display` only converts the frame to RGB565 and hands it to a writer thread,
+so the display loop does not wait for the transport. The writer holds two frame
+slots: the frame being written and the next one. A newer frame replaces the
+next one before it is started, so a slow transport drops frames instead of
+building a backlog. Commands like the brightness go through their own queue and
+are written between the packets of a frame, they never wait for a full frame.
+
+The writer encodes a frame when it starts it, with the cheapest of the codecs
+the firmware accepts, so the delta codecs are always relative to the frame
+actually sent to the screen.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+import numpy as np
+import serial  # type: ignore
+from serial.tools import list_ports  # type: ignore
+from PIL import Image
+from ._base import LCD
+from ._codecs import choose_codec
+from ._pixels import RGB565Converter, rotate_view
+
+__all__ = ["SerialLCD"]
+
+logger = logging.getLogger()
+
+
+class SerialLCD(LCD):
+    """
+    A screen driven through a serial port by a background writer.
+
+    Subclasses set the port parameters, the USB ids and the codecs, and build
+    the packets of their protocol in `frame_packets` and `brightness_packet`.
+    A packet is the unit the protocol can interleave, commands are only written
+    between two packets. The packets are written in `chunk_size` slices, the
+    largest write the transport takes at once.
+    """
+
+    # Resolution of the panel
+    width = 0
+    height = 0
+    baudrate = 115200
+    timeout = 1
+    write_timeout = 5
+    chunk_size = 4096
+    # USB vendor and product ids of the serial adapter, to find the port
+    usb_vid: Optional[int] = None
+    usb_pid: Optional[int] = None
+    # Frame codecs the firmware accepts, see `_codecs`
+    codecs: Tuple[str, ...] = ("raw",)
+
+    def __init__(self, port: str) -> None:
+        self.port = port
+        self.__serial: Optional[serial.Serial] = None
+        self.__cond = threading.Condition()
+        self.__commands: Deque[bytes] = deque()
+        self.__pending: Optional[np.ndarray] = None  # The next frame
+        self.__current: Deque[bytes] = deque()  # Packets of the frame being written
+        self.__shown: Optional[np.ndarray] = None  # The frame sent to the screen
+        self.__converter: Optional[RGB565Converter] = None
+        self.__writing = False
+        self.__writer: Optional[threading.Thread] = None
+        self.__error: Optional[Exception] = None
+        self.stats = self.__new_stats()
+
+    @staticmethod
+    def __new_stats() -> dict:
+        return {
+            "frames": 0,
+            "dropped": 0,
+            "commands": 0,
+            "bytes": 0,
+            "write_time": 0.0,
+            "codecs": dict(),
+        }
+
+    @classmethod
+    def find_ports(cls) -> List[str]:
+        """The serial ports of the adapters with the USB ids of the driver."""
+        return [
+            p.device
+            for p in list_ports.comports()
+            if p.vid == cls.usb_vid and p.pid == cls.usb_pid
+        ]
+
+    @classmethod
+    def is_connected(cls) -> bool:
+        return bool(cls.find_ports())
+
+    # Packets of the protocol, implemented by the drivers
+
+    def frame_packets(self, codec: str, payload: bytes) -> List[bytes]:
+        """The packets sending a frame encoded by the codec."""
+        raise NotImplementedError
+
+    def brightness_packet(self, brightness: int) -> bytes:
+        raise NotImplementedError
+
+    def handshake(self) -> None:
+        """Called when the port is opened, before the writer starts."""
+        pass
+
+    # Port and writer
+
+    def open(self) -> None:
+        if self.is_open():
+            return
+        self.__serial = serial.Serial(
+            self.port,
+            self.baudrate,
+            timeout=self.timeout,
+            write_timeout=self.write_timeout,
+        )
+        self.__error = None
+        self.__shown = None
+        self.handshake()
+        self.__writer = threading.Thread(
+            target=self.__write_loop, name=f"SerialWriter-{self.port}", daemon=True
+        )
+        self.__writer.start()
+        logger.debug(f"Serial screen <{self.port}> opened")
+
+    def is_open(self) -> bool:
+        return self.__serial is not None and self.__serial.is_open
+
+    def close(self) -> None:
+        with self.__cond:
+            port, self.__serial = self.__serial, None
+            self.__shown = None
+            self.__commands.clear()
+            self.__current.clear()
+            self.__pending = None
+            self.__cond.notify_all()
+        if self.__writer is not None and self.__writer is not threading.current_thread():
+            self.__writer.join(self.write_timeout)
+        self.__writer = None
+        if port is not None:
+            try:
+                port.close()
+            except Exception as e:
+                logger.error(e)
+            logger.debug(f"Serial screen <{self.port}> closed")
+
+    def write(self, data: bytes) -> None:
+        """Write the data now in chunks, only for the handshake before the writer starts."""
+        self.__write_chunks(self.__serial, data)
+
+    def read(self, length: int) -> bytes:
+        return self.__serial.read(length)
+
+    def __write_chunks(self, port: serial.Serial, data: bytes) -> None:
+        view = memoryview(data)
+        for i in range(0, len(view), self.chunk_size):
+            port.write(view[i : i + self.chunk_size])
+
+    def __raise_error(self) -> None:
+        """Raise the error of the writer in the caller, so it can reopen the port."""
+        if self.__error is not None:
+            e, self.__error = self.__error, None
+            raise e
+        if not self.is_open():
+            raise serial.SerialException(f"Serial screen <{self.port}> is not open")
+
+    def __encode(
+        self, port: serial.Serial, frame: np.ndarray, prev: Optional[np.ndarray]
+    ) -> None:
+        """
+        Encode the frame with the cheapest codec against the previous frame and
+        queue its packets, called by the writer outside of the lock.
+        """
+        estimate = choose_codec(frame, prev, self.codecs)
+        name = estimate.codec.name
+        packets = self.frame_packets(name, estimate.encode())
+        with self.__cond:
+            if self.__serial is not port:
+                # Closed while encoding, the packets are for the old port
+                return
+            if self.__shown is not prev:
+                # Invalidated while encoding, encode it again without the delta
+                if self.__pending is None:
+                    self.__pending = frame
+                return
+            self.__current.extend(packets)
+            self.__shown = frame
+            self.stats["frames"] += 1
+            self.stats["codecs"][name] = self.stats["codecs"].get(name, 0) + 1
+
+    def __write_loop(self) -> None:
+        while True:
+            frame = packet = prev = None
+            with self.__cond:
+                self.__writing = False
+                self.__cond.notify_all()
+                while True:
+                    port = self.__serial
+                    if port is None:
+                        return
+                    if self.__commands:
+                        packet = self.__commands.popleft()
+                        self.stats["commands"] += 1
+                    elif self.__current:
+                        packet = self.__current.popleft()
+                    elif self.__pending is not None:
+                        frame, self.__pending = self.__pending, None
+                        prev = self.__shown
+                    else:
+                        self.__cond.wait()
+                        continue
+                    break
+                self.__writing = True
+            start = time.perf_counter()
+            try:
+                if frame is not None:
+                    self.__encode(port, frame, prev)
+                    continue
+                self.__write_chunks(port, packet)
+            except Exception as e:
+                logger.error(f"Serial screen <{self.port}> write error: {e}")
+                # Close the port, the next call raises the error and reopens it
+                with self.__cond:
+                    self.__error = e
+                    self.__serial = None
+                    self.__shown = None
+                    self.__writing = False
+                    self.__commands.clear()
+                    self.__current.clear()
+                    self.__pending = None
+                    self.__cond.notify_all()
+                try:
+                    port.close()
+                except Exception:
+                    pass
+                return
+            self.stats["bytes"] += len(packet)
+            self.stats["write_time"] += time.perf_counter() - start
+
+    def __put_frame(self, frame: np.ndarray) -> None:
+        with self.__cond:
+            self.__raise_error()
+            if self.__pending is not None:
+                self.stats["dropped"] += 1
+            self.__pending = frame
+            self.__cond.notify_all()
+
+    def command(self, packet: bytes) -> None:
+        """Queue a command, written before the rest of the current frame."""
+        with self.__cond:
+            self.__raise_error()
+            self.__commands.append(packet)
+            self.__cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued is written, False on timeout."""
+        with self.__cond:
+            return self.__cond.wait_for(
+                lambda: self.__serial is None
+                or not (
+                    self.__writing
+                    or self.__commands
+                    or self.__current
+                    or self.__pending is not None
+                ),
+                timeout,
+            )
+
+    def throughput(self) -> float:
+        """Bytes per second written while the writer was busy."""
+        write_time = self.stats["write_time"]
+        return self.stats["bytes"] / write_time if write_time else 0.0
+
+    # LCD interface
+
+    def display(self, image: Image.Image) -> None:
+        self.display_changes(image)
+
+    def display_changes(self, image: Image.Image, rotation: int = 0) -> None:
+        """Queue the frame, replacing the queued frame not started yet."""
+        rgb = rotate_view(np.asarray(image.convert("RGB")), rotation)
+        size = (rgb.shape[1], rgb.shape[0])
+        if self.__converter is None or self.__converter.size != size:
+            self.__converter = RGB565Converter(*size)
+        # The writer keeps the frame as the one on the screen, so it is a copy
+        self.__put_frame(self.__converter.pack(rgb).copy())
+
+    def invalidate_frame(self) -> None:
+        """The next frame is encoded without the delta codecs."""
+        with self.__cond:
+            self.__shown = None
+
+    def set_brightness(self, brightness: int) -> None:
+        self.command(self.brightness_packet(brightness))
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.port})"
@@ -1,3 +1,8 @@
+# Profile the imports below if LCDCANVAS_PROFILE_IMPORTS is set
+from app.profiling import import_profiler, start_from_env
+
+start_from_env()
+
 import logging
 import locale
 import threading
@@ -18,6 +23,8 @@ logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
 # Import all app modules
 try:
     from app.consts import LOG_PATH, LOG_LEVEL, APP_NAME, LOGO_PATH, IS_EXE
+    from app.consts import consts_summary, THEMES_DIR, THEMES_SOURCE_DIR
+    from app.hardware_monitor.theme_assets import migrate_themes
     from app.systray import SysTrayIcon
     from app.ui import UIWindowManager
     from app.util import (
@@ -30,6 +37,8 @@ except Exception as e:
     stack_trace = traceback.format_exc()
     win32api.MessageBox(0, stack_trace, "RuntimeEnvError", win32con.MB_ICONERROR)
     exit(1)
+finally:
+    import_profiler.stop()
 
 # global logger configuration
 # use current locale for date/time formatting in logs
@@ -48,6 +57,7 @@ logging.basicConfig(  # format='%(asctime)s [%(levelname)s] %(message)s in %(pat
 logger = logging.getLogger()
 logger.setLevel(LOG_LEVEL)
 logger.info("Logger initialized")
+logger.debug(consts_summary())
 
 
 def start_tray_icon():
@@ -63,6 +73,9 @@ def main():
     require_runas_admin()
     # Copy theme files into user's home directory
     copy_theme_to_user_dir()
+    # Move the images and fonts embedded in the user's themes into the asset store
+    if THEMES_DIR != THEMES_SOURCE_DIR:
+        threading.Thread(target=migrate_themes, daemon=True).start()
     # open the hidden window for theme player
     UIWindowManager.theme_player_window()
     # Start systray icon
@@ -0,0 +1,161 @@
+import threading
+from types import SimpleNamespace
+import pytest
+from app.hardware_monitor import backends, sensors
+from app.hardware_monitor.backends import SensorBackend, _update, create_backend
+from app.hardware_monitor.backends._update import UpdateCoordinator
+from app.hardware_monitor.backends.fake import FakeBackend, wave
+
+READERS = ["cpu", "gpu", "ram", "disk", "net", "volume"]
+KEYS = {
+    "cpu": {"load", "frequency", "temperature", "fan"},
+    "gpu": {"load", "frequency", "temperature", "fan", "total", "used", "free"},
+    "ram": {"load", "used", "free", "total"},
+    "disk": {"load", "used", "free", "total"},
+    "volume": {"load"},
+}
+
+
+def test_create_backend():
+    assert isinstance(create_backend("fake"), FakeBackend)
+    assert type(create_backend("psutil")) is SensorBackend
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+def test_wave():
+    assert [wave(t, 4) for t in range(5)] == [0, 0.5, 1, 0.5, 0]
+
+
+def test_fake_backend_is_deterministic():
+    a, b = FakeBackend(), FakeBackend()
+    for kind in READERS:
+        reader_a, reader_b = getattr(a, kind)(), getattr(b, kind)()
+        values = [reader_a.read() for _ in range(5)]
+        assert values == [reader_b.read() for _ in range(5)]
+        if kind in KEYS:
+            assert all(v.keys() == KEYS[kind] for v in values)
+
+
+@pytest.mark.parametrize("kind", sorted(KEYS))
+def test_psutil_readers(kind):
+    res = getattr(SensorBackend(), kind)().read()
+    assert res.keys() == KEYS[kind]
+    load = res["load"]
+    assert load is None or 0 <= load <= 1
+
+
+def test_psutil_net_counters():
+    counters = SensorBackend().net().read()
+    for sent, recv in counters.values():
+        assert sent >= 0 and recv >= 0
+
+
+def test_hardware_sensor_reads_its_backend():
+    sensor = sensors.CPU(FakeBackend())
+    assert sensor.read()["temperature"] == 41
+    assert sensor.read()["temperature"] == 42
+
+
+def test_hardware_sensor_follows_set_backend(monkeypatch):
+    monkeypatch.setattr(backends, "_backend", None)
+    backends.set_backend(FakeBackend())
+    sensor = sensors.RAM()
+    assert sensor.read()["total"] == 16.0
+    # The reader is created again for the new backend
+    backends.set_backend(SensorBackend())
+    assert type(sensor.reader) is not type(FakeBackend().ram())
+    assert sensor.read().keys() == KEYS["ram"]
+
+
+def test_net_rates_from_fake_counters(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(sensors, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    net = sensors.Net(FakeBackend(), smoothing_window=0)
+    assert net.read()["upload_speed"] == 0  # The first read sets the baseline
+    clock.now += 1
+    res = net.read()
+    # The loopback interface is not counted
+    assert res["interfaces"].keys() == {"eth0"}
+    assert res["upload_speed"] == 125_000
+    assert res["download_speed"] == 1_250_000
+    clock.now += 0.5
+    assert net.read()["upload_speed"] == 250_000
+
+
+class FakeHardware:
+    """A LibreHardwareMonitor hardware counting its native refreshes."""
+
+    def __init__(self, identifier: str, clock=None, cost: float = 0) -> None:
+        self.Identifier = identifier
+        self.Name = identifier.strip("/").upper()
+        self.clock = clock
+        self.cost = cost
+        self.updates = 0
+
+    def Update(self) -> None:
+        self.updates += 1
+        if self.clock is not None:
+            self.clock.now += self.cost
+
+
+@pytest.fixture
+def update_clock(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(_update, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_update_coordinator_once_per_tick(update_clock):
+    coordinator = UpdateCoordinator(tick=0.5)
+    cpu = FakeHardware("/intelcpu/0", update_clock, cost=0.002)
+    fan = FakeHardware("/lpc/nct6798d", update_clock, cost=0.004)
+    # The load, frequency and temperature sensors of the CPU and its fan
+    for _ in range(3):
+        coordinator.update(cpu)
+        coordinator.update(fan)
+    coordinator.update(None)
+    assert (cpu.updates, fan.updates) == (1, 1)
+    update_clock.now += 0.3
+    coordinator.update(cpu)
+    assert cpu.updates == 1
+    # The next tick refreshes the hardware again
+    update_clock.now += 0.5
+    coordinator.update(cpu)
+    coordinator.update(cpu)
+    assert (cpu.updates, fan.updates) == (2, 1)
+    assert coordinator.stats() == {
+        "/intelcpu/0": {
+            "name": "INTELCPU/0",
+            "updates": 2,
+            "coalesced": 4,
+            "avg_ms": 2.0,
+            "max_ms": 2.0,
+        },
+        "/lpc/nct6798d": {
+            "name": "LPC/NCT6798D",
+            "updates": 1,
+            "coalesced": 2,
+            "avg_ms": 4.0,
+            "max_ms": 4.0,
+        },
+    }
+
+
+def test_update_coordinator_across_threads():
+    coordinator = UpdateCoordinator(tick=5)
+    gpu = FakeHardware("/gpu-nvidia/0")
+    barrier = threading.Barrier(8)
+
+    def read():
+        barrier.wait(5)
+        coordinator.update(gpu)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    # The readers of one sampling pass share a single refresh
+    assert gpu.updates == 1
+    assert coordinator.stats()["/gpu-nvidia/0"]["coalesced"] == 7
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from libs.lcds._codecs import (
+    CODECS,
+    Codec,
+    Estimate,
+    RawCodec,
+    RLECodec,
+    TileDeltaCodec,
+    choose_codec,
+    register_codec,
+)
+
+
+def rle_decode(data: bytes, dtype=np.uint16) -> np.ndarray:
+    pairs = np.frombuffer(data, dtype=[("count", "<u2"), ("pixel", dtype)])
+    return np.repeat(pairs["pixel"], pairs["count"].astype(np.int64))
+
+
+def tile_decode(data: bytes, prev: np.ndarray, tile_size: int) -> np.ndarray:
+    """Apply the tile delta to the previous frame, cropping the edge tiles."""
+    frame = prev.copy()
+    count = int.from_bytes(data[:4], "little")
+    index = np.frombuffer(data, dtype="<u2", count=count * 2, offset=4).reshape(-1, 2)
+    tiles = np.frombuffer(data, dtype=prev.dtype, offset=4 + count * 4)
+    tiles = tiles.reshape(count, tile_size, tile_size)
+    for (col, row), tile in zip(index, tiles):
+        y, x = row * tile_size, col * tile_size
+        h, w = frame[y : y + tile_size, x : x + tile_size].shape
+        frame[y : y + h, x : x + w] = tile[:h, :w]
+    return frame
+
+
+def test_raw():
+    frame = np.arange(12, dtype=np.uint16).reshape(3, 4)
+    estimate = RawCodec().estimate(frame, None)
+    assert estimate.size == 24
+    assert estimate.encode() == frame.tobytes()
+
+
+@pytest.mark.parametrize(
+    "flat",
+    [
+        [7],
+        [1, 1, 1, 2, 2, 3],
+        [1, 2, 3, 4],
+        [5] * 0xFFFF,
+        [5] * 0x10000,
+        [5] * (3 * 0xFFFF + 2) + [6] + [7] * 0x1FFFF,
+    ],
+    ids=["single", "runs", "no-runs", "max-run", "max-run+1", "long-runs"],
+)
+def test_rle_round_trip(flat):
+    frame = np.array(flat, dtype=np.uint16).reshape(1, -1)
+    estimate = RLECodec().estimate(frame, None)
+    data = estimate.encode()
+    assert len(data) == estimate.size
+    np.testing.assert_array_equal(rle_decode(data), frame.ravel())
+
+
+def test_rle_splits_long_runs():
+    frame = np.zeros((1, 0x10000 + 5), dtype=np.uint16)
+    data = RLECodec().encode(frame)
+    pairs = np.frombuffer(data, dtype=[("count", "<u2"), ("pixel", "<u2")])
+    assert pairs["count"].tolist() == [0xFFFF, 6]
+
+
+@pytest.mark.parametrize("shape", [(32, 48), (30, 45), (5, 7), (17, 16)])
+def test_tile_delta_round_trip(shape):
+    rng = np.random.default_rng(1)
+    prev = rng.integers(0, 0xFFFF, shape, dtype=np.uint16)
+    frame = prev.copy()
+    # A change in the first tile and one in the bottom right edge tile
+    frame[0, 0] ^= 1
+    frame[-1, -1] ^= 1
+    codec = TileDeltaCodec(16)
+    estimate = codec.estimate(frame, prev)
+    data = estimate.encode()
+    assert len(data) == estimate.size
+    tiles = 1 if shape[0] <= 16 and shape[1] <= 16 else 2
+    assert int.from_bytes(data[:4], "little") == tiles
+    np.testing.assert_array_equal(tile_decode(data, prev, 16), frame)
+
+
+def test_tile_delta_edge_tiles_are_padded():
+    prev = np.zeros((20, 20), dtype=np.uint16)
+    frame = prev.copy()
+    frame[19, 19] = 9
+    data = TileDeltaCodec(16).encode(frame, prev)
+    # The index of the bottom right tile, then a full 16x16 tile
+    assert data[:8] == (1).to_bytes(4, "little") + b"\x01\x00\x01\x00"
+    tile = np.frombuffer(data[8:], dtype=np.uint16).reshape(16, 16)
+    assert tile[3, 3] == 9
+    assert not tile[4:, :].any() and not tile[:, 4:].any()
+
+
+def test_tile_delta_unchanged_frame():
+    frame = np.ones((32, 32), dtype=np.uint16)
+    estimate = TileDeltaCodec().estimate(frame, frame.copy())
+    assert estimate.size == 4
+    assert estimate.encode() == b"\x00\x00\x00\x00"
+
+
+def test_tile_delta_needs_a_previous_frame():
+    frame = np.ones((32, 32), dtype=np.uint16)
+    codec = TileDeltaCodec()
+    assert codec.estimate(frame, None) is None
+    assert codec.estimate(frame, np.ones((16, 32), dtype=np.uint16)) is None
+    with pytest.raises(ValueError):
+        codec.encode(frame)
+
+
+def test_choose_codec_without_previous_frame():
+    frame = np.zeros((32, 32), dtype=np.uint16)
+    # The tile codec can not encode without a previous frame
+    estimate = choose_codec(frame, None, ("raw", "tile"))
+    assert estimate.codec.name == "raw"
+    assert choose_codec(frame, None, ("raw", "rle", "tile")).codec.name == "rle"
+    with pytest.raises(ValueError):
+        choose_codec(frame, None, ("tile",))
+
+
+def test_choose_codec_picks_the_smallest():
+    rng = np.random.default_rng(2)
+    prev = rng.integers(0, 0xFFFF, (64, 64), dtype=np.uint16)
+    frame = prev.copy()
+    frame[10, 10] += 1
+    estimate = choose_codec(frame, prev, ("raw", "rle", "tile"))
+    assert estimate.codec.name == "tile"
+    # Noise does not compress, raw beats rle
+    assert choose_codec(frame, None, ("rle", "raw")).codec.name == "raw"
+
+
+def test_register_codec(monkeypatch):
+    monkeypatch.setattr("libs.lcds._codecs.CODECS", dict(CODECS))
+
+    class EmptyCodec(Codec):
+        name = "empty"
+
+        def estimate(self, frame, prev):
+            return Estimate(self, 0, bytes)
+
+    register_codec(EmptyCodec())
+    frame = np.zeros((4, 4), dtype=np.uint16)
+    assert choose_codec(frame, None, ("raw", "empty")).codec.name == "empty"
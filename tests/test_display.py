@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+import pytest
+from app import consts, setting
+from app.hardware_monitor import display as display_module
+from app.hardware_monitor.display import DisplayManager, ScreenDisplay
+from libs.lcds import LCD
+
+THEME = {
+    "shape": "rect",
+    "width": 32,
+    "height": 16,
+    "canvasJSON": {"background": "#ff0000", "objects": []},
+}
+
+
+class FakeLCD(LCD):
+
+    def __init__(self, uid: str) -> None:
+        self.uid = uid
+        self.opened = False
+        self.frames = list()
+        self.fail = False
+
+    def unique_id(self) -> str:
+        return self.uid
+
+    def open(self) -> None:
+        self.opened = True
+
+    def is_open(self) -> bool:
+        return self.opened
+
+    def close(self) -> None:
+        self.opened = False
+
+    def set_brightness(self, brightness: int) -> None:
+        pass
+
+    def display(self, image) -> None:
+        if self.fail:
+            raise OSError("unplugged")
+        self.frames.append(image)
+
+
+def wait_until(predicate, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@pytest.fixture(params=["thread", "asyncio"])
+def engine(request, monkeypatch):
+    monkeypatch.setattr(consts, "DISPLAY_ENGINE", request.param)
+    return request.param
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """Settings in a temporary file, every screen shows the test theme fast."""
+    monkeypatch.setattr(setting, "SETTING_PATH", str(tmp_path / "settings.json"))
+    res = setting.Settings()
+    monkeypatch.setattr(display_module, "settings", res)
+    (tmp_path / "test.json").write_text(json.dumps(THEME), encoding="utf-8")
+    monkeypatch.setattr(
+        display_module, "theme_path", lambda theme: str(tmp_path / f"{theme}.json")
+    )
+    # The primary screen captures the ThemePlayer window without nativeRender
+    res.set_monitor_settings({"nativeRender": True})
+    for uid in "abc":
+        res.set_screen_settings(uid, {"lastTheme": "test", "fps": 50})
+    yield res
+    # Written to the temporary file, not after the path is restored
+    res.flush()
+
+
+@pytest.fixture
+def manager(settings, engine):
+    manager = DisplayManager()
+    manager.stopped = threading.Event()
+    manager.on_all_stopped = manager.stopped.set
+    yield manager
+    manager.stop()
+
+
+def test_start_and_stop(manager):
+    a, b = FakeLCD("a"), FakeLCD("b")
+    manager.set_screens({"a": a, "b": b}, "a")
+    assert not manager.is_running()
+    manager.start()
+    assert manager.is_running()
+    assert wait_until(lambda: a.frames and b.frames)
+    assert a.frames[0].size == (32, 16)
+    assert a.frames[0].getpixel((0, 0)) == (255, 0, 0)
+    manager.stop()
+    assert not manager.is_running()
+    assert not a.opened and not b.opened
+    assert set(manager.stats()) == {"a", "b"}
+
+
+def test_switch_primary_while_running(manager):
+    a, b = FakeLCD("a"), FakeLCD("b")
+    manager.set_screens({"a": a}, "a")
+    manager.start()
+    assert wait_until(lambda: a.frames)
+    # The selected screen changes, the display carries on with the new screen
+    manager.set_screens({"b": b}, "b")
+    assert manager.is_running()
+    assert manager.primary_uid == "b"
+    assert list(manager.screens) == ["b"]
+    assert manager.screen("b").running
+    assert wait_until(lambda: b.frames)
+    count = len(a.frames)
+    time.sleep(0.1)
+    assert len(a.frames) == count
+    assert not a.opened
+    assert not manager.stopped.is_set()
+
+
+def test_add_and_remove_while_running(manager):
+    a, b, c = FakeLCD("a"), FakeLCD("b"), FakeLCD("c")
+    manager.set_screens({"a": a}, "a")
+    manager.start()
+    first = manager.screen("a")
+    manager.set_screens({"a": a, "b": b}, "a")
+    # The running screen is kept
+    assert manager.screen("a") is first
+    assert manager.screen("b").running
+    assert wait_until(lambda: b.frames)
+    manager.set_screens({"a": a, "c": c}, "a")
+    assert manager.screen("b") is None
+    assert not b.opened
+    assert manager.screen("c").running
+    # A new driver of the same screen replaces the display
+    a2 = FakeLCD("a")
+    manager.set_screens({"a": a2, "c": c}, "a")
+    assert manager.screen("a") is not first
+    assert not first.running
+    assert wait_until(lambda: a2.frames)
+
+
+def test_set_screens_while_stopped(manager):
+    a, b = FakeLCD("a"), FakeLCD("b")
+    manager.set_screens({"a": a}, "a")
+    manager.set_screens({"a": a, "b": b}, "b")
+    assert not manager.is_running()
+    time.sleep(0.05)
+    assert not a.frames and not b.frames
+
+
+def test_capture_source(manager, settings):
+    a, b = FakeLCD("a"), FakeLCD("b")
+    manager.set_screens({"a": a, "b": b}, "a")
+    # nativeRender draws every screen with its own renderer
+    assert not manager.screen("a").use_webview
+    settings.set_monitor_settings({"nativeRender": False})
+    manager.reload_settings()
+    assert manager.screen("a").use_webview
+    assert not manager.screen("b").use_webview
+    manager.set_screens({"a": a, "b": b}, "b")
+    assert not manager.screen("a").use_webview
+    assert manager.screen("b").use_webview
+
+
+def test_reload_settings(manager, settings):
+    a, b = FakeLCD("a"), FakeLCD("b")
+    manager.set_screens({"a": a, "b": b}, "a")
+    settings.set_screen_settings("a", {"rotation": 90, "fps": 5, "lastTheme": ""})
+    settings.set_screen_settings("b", {"rotation": 180})
+    manager.reload_settings("a")
+    screen_a, screen_b = manager.screen("a"), manager.screen("b")
+    assert (screen_a.rotation, screen_a.fps, screen_a.theme) == (90, 5, "")
+    assert screen_b.rotation == 0
+    manager.reload_settings()
+    assert screen_b.rotation == 180
+
+
+def test_failed_screens(manager, settings, monkeypatch):
+    monkeypatch.setattr(ScreenDisplay, "retry_delay", 0)
+    monkeypatch.setattr(ScreenDisplay, "error_limit", 2)
+    failed = list()
+    manager.on_failed = failed.append
+    # The unchanged frames of b are sent again at once
+    settings.set_screen_settings("b", {"forceRefresh": 0})
+    a, b = FakeLCD("a"), FakeLCD("b")
+    a.fail = True
+    manager.set_screens({"a": a, "b": b}, "a")
+    manager.start()
+    assert wait_until(lambda: failed)
+    # The other screen still runs
+    assert [s.uid for s in failed] == ["a"]
+    assert manager.screen("b").running
+    assert not manager.stopped.is_set()
+    b.fail = True
+    assert manager.stopped.wait(5)
+    assert [s.uid for s in failed] == ["a", "b"]
+    assert not manager.is_running()
+    assert manager.screen("a").stats["errors"] == 3
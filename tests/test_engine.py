@@ -0,0 +1,179 @@
+import threading
+import time
+import pytest
+from app.hardware_monitor.engine import AsyncEngine, DaemonExecutor
+from app.hardware_monitor.history import SensorHistory
+from app.hardware_monitor.pipeline import FrameScheduler, Stage
+from app.hardware_monitor.sampler import SensorSampler
+
+
+class FakeSensor:
+
+    def __init__(self, refresh_interval: float, delay: float = 0) -> None:
+        self.refresh_interval = refresh_interval
+        self.delay = delay
+        self.reads = 0
+
+    def status(self) -> dict:
+        time.sleep(self.delay)
+        self.reads += 1
+        return {"reads": self.reads}
+
+
+def wait_until(predicate, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+@pytest.fixture
+def sampler() -> SensorSampler:
+    sensors = {"fast": FakeSensor(0.02), "slow": FakeSensor(0.02, delay=0.3)}
+    return SensorSampler(sensors, SensorHistory())
+
+
+@pytest.fixture
+def engine(sampler):
+    engine = AsyncEngine(sampler)
+    yield engine
+    engine.shutdown()
+
+
+def test_daemon_executor_runs_calls():
+    executor = DaemonExecutor(2, "Test")
+    futures = [executor.submit(pow, 2, i) for i in range(10)]
+    assert [f.result(5) for f in futures] == [2**i for i in range(10)]
+    workers = [t for t in threading.enumerate() if t.name.startswith("Test-")]
+    assert 1 <= len(workers) <= 2
+    assert all(t.daemon for t in workers)
+    executor.shutdown()
+
+
+def test_daemon_executor_shutdown_does_not_wait():
+    executor = DaemonExecutor(1, "Blocked")
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        return release.wait(5)
+
+    running = executor.submit(block)
+    assert started.wait(5)
+    queued = executor.submit(pow, 2, 2)
+    start = time.perf_counter()
+    executor.shutdown(wait=False, cancel_futures=True)
+    assert time.perf_counter() - start < 0.5
+    assert queued.cancelled()
+    with pytest.raises(RuntimeError):
+        executor.submit(pow, 2, 2)
+    release.set()
+    assert running.result(5) is True
+
+
+def test_pipeline_runs_the_stages(engine):
+    frames = list()
+    counter = iter(range(1000))
+    pipeline = engine.pipeline(
+        [
+            Stage("produce", lambda: next(counter), FrameScheduler(30), "cpu"),
+            Stage("collect", frames.append, executor="io"),
+        ]
+    )
+    pipeline.start()
+    assert wait_until(lambda: len(frames) >= 3)
+    pipeline.stop()
+    assert frames[:3] == [0, 1, 2]
+    stats = pipeline.stats()
+    assert stats["produce"]["frames"] >= 3
+    assert stats["produce"]["schedule"]["fps"] == 30
+
+
+def test_stop_from_the_error_handler(engine):
+    calls = list()
+    stopped = threading.Event()
+
+    def fail():
+        calls.append(time.monotonic())
+        raise OSError("unplugged")
+
+    def on_error(stage, e):
+        pipeline.stop()
+        stopped.set()
+
+    stage = Stage("fail", fail, FrameScheduler(30), "io")
+    pipeline = engine.pipeline([stage], on_error)
+    pipeline.start()
+    # The handler does not wait for itself
+    assert stopped.wait(2)
+    time.sleep(0.2)
+    assert len(calls) == 1
+    assert stage.stats.errors == 1
+    assert not pipeline.running
+
+
+def test_restart_without_overlap(engine):
+    active = list()
+    overlaps = list()
+    entered = threading.Event()
+
+    def stage():
+        active.append(1)
+        if len(active) > 1:
+            overlaps.append(len(active))
+        entered.set()
+        time.sleep(0.05)
+        active.pop()
+        return None
+
+    for _ in range(5):
+        entered.clear()
+        pipeline = engine.pipeline([Stage("slow", stage, FrameScheduler(30), "io")])
+        pipeline.start()
+        assert entered.wait(2)
+        # Returns once the stage call in flight returned
+        pipeline.stop()
+        assert not active
+    assert not overlaps
+
+
+def test_slow_sensor_does_not_delay_the_others(engine, sampler):
+    sampler.read(["fast", "slow"])
+    engine.spawn(_idle())
+    time.sleep(0.5)
+    fast, slow = sampler.sensors["fast"], sampler.sensors["slow"]
+    # The slow sensor takes 0.3s a read, the fast one keeps its 20ms interval
+    assert fast.reads > 3 * slow.reads
+    assert sampler.snapshot().values["fast"]["reads"] == fast.reads
+
+
+def test_shutdown_and_start_again(engine, sampler):
+    calls = list()
+
+    def tick():
+        calls.append(1)
+
+    pipeline = engine.pipeline([Stage("tick", tick, FrameScheduler(30))])
+    pipeline.start()
+    assert wait_until(lambda: calls)
+    engine.shutdown()
+    assert not engine.is_running()
+    count = len(calls)
+    time.sleep(0.1)
+    assert len(calls) == count
+    # The sampler thread takes over the sampling again
+    before = sampler.snapshot().version
+    sampler.read(["fast"])
+    assert wait_until(lambda: sampler.snapshot().version > before + 1)
+    # The next pipeline starts the engine again
+    pipeline = engine.pipeline([Stage("tick", tick, FrameScheduler(30))])
+    pipeline.start()
+    assert engine.is_running()
+    assert wait_until(lambda: len(calls) > count)
+    pipeline.stop()
+
+
+async def _idle() -> None:
+    pass
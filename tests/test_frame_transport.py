@@ -0,0 +1,124 @@
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pytest
+from app.hardware_monitor.frame_transport import Frame, FrameReceiver
+
+
+@pytest.fixture(scope="module")
+def receiver():
+    # The sequence numbers only grow, the tests share the server
+    receiver = FrameReceiver()
+    receiver.start()
+    yield receiver
+    receiver.stop()
+
+
+def pixels(width: int, height: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (height, width, 4), dtype=np.uint8).tobytes()
+
+
+def post(url: str, data: bytes) -> int:
+    request = urllib.request.Request(url, data=data, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as res:
+            return res.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def post_frame(receiver, seq: int, width: int, height: int, data: bytes) -> int:
+    return post(f"{receiver.url}?seq={seq}&width={width}&height={height}", data)
+
+
+def test_post_frame(receiver):
+    data = pixels(8, 4)
+    seq = receiver.next_seq()
+    assert post_frame(receiver, seq, 8, 4, data) == 204
+    frame = receiver.wait_frame(seq, timeout=5)
+    assert (frame.seq, frame.width, frame.height) == (seq, 8, 4)
+    assert frame.data == data
+
+
+def test_wait_frame_matches_the_seq(receiver):
+    first, second = receiver.next_seq(), receiver.next_seq()
+    assert second == first + 1
+    assert post_frame(receiver, first, 2, 2, pixels(2, 2)) == 204
+    # Times out waiting for a newer frame
+    assert receiver.wait_frame(second, timeout=0.05) is None
+    assert receiver.wait_frame(first, timeout=0).seq == first
+    # Woken when the frame arrives
+    timer = threading.Timer(0.05, post_frame, (receiver, second, 2, 2, pixels(2, 2)))
+    timer.start()
+    frame = receiver.wait_frame(second, timeout=5)
+    timer.join()
+    assert frame is not None and frame.seq == second
+    # A newer frame answers an older request
+    assert receiver.wait_frame(first, timeout=0).seq == second
+
+
+def test_stale_frame_is_dropped(receiver):
+    old, new = receiver.next_seq(), receiver.next_seq()
+    assert post_frame(receiver, new, 2, 2, pixels(2, 2, seed=1)) == 204
+    # Accepted, but the late frame of an older request does not replace the newer
+    assert post_frame(receiver, old, 2, 2, pixels(2, 2, seed=2)) == 204
+    frame = receiver.wait_frame(old, timeout=0)
+    assert frame.seq == new
+    assert frame.data == pixels(2, 2, seed=1)
+
+
+def test_invalid_token(receiver):
+    seq = receiver.next_seq()
+    base_url = receiver.url.rsplit("/", 2)[0]
+    for url in (f"{base_url}/wrong-token/frame", f"{base_url}/frame"):
+        assert post(f"{url}?seq={seq}&width=2&height=2", pixels(2, 2)) == 400
+    assert receiver.wait_frame(seq, timeout=0) is None
+
+
+def test_invalid_size(receiver, monkeypatch):
+    seq = receiver.next_seq()
+    assert post_frame(receiver, seq, 4, 4, pixels(2, 2)) == 400
+    assert post_frame(receiver, seq, 2, 2, pixels(2, 2) + b"\0") == 400
+    assert post(f"{receiver.url}?seq={seq}&width=2", pixels(2, 2)) == 400
+    assert post(f"{receiver.url}?seq=x&width=2&height=2", pixels(2, 2)) == 400
+    monkeypatch.setattr(FrameReceiver, "max_frame_size", 2 * 2 * 4 - 1)
+    assert post_frame(receiver, seq, 2, 2, pixels(2, 2)) == 400
+    assert receiver.wait_frame(seq, timeout=0) is None
+
+
+def test_preflight(receiver):
+    request = urllib.request.Request(receiver.url, method="OPTIONS")
+    with urllib.request.urlopen(request, timeout=5) as res:
+        assert res.status == 204
+        assert res.headers["Access-Control-Allow-Origin"] == "*"
+        assert res.headers["Access-Control-Allow-Private-Network"] == "true"
+
+
+def test_frame_fingerprint_and_image():
+    data = pixels(8, 4)
+    frame = Frame(1, 8, 4, data)
+    assert frame.fingerprint() == Frame(2, 8, 4, bytes(data)).fingerprint()
+    assert frame.fingerprint() != Frame(1, 8, 4, pixels(8, 4, seed=1)).fingerprint()
+    img = frame.to_image()
+    assert img.mode == "RGB" and img.size == (8, 4)
+    expected = np.frombuffer(data, dtype=np.uint8).reshape(4, 8, 4)[:, :, :3]
+    np.testing.assert_array_equal(np.asarray(img), expected)
+
+
+def test_stop_and_start_again():
+    receiver = FrameReceiver()
+    receiver.start()
+    url = receiver.url
+    receiver.stop()
+    assert not receiver.is_running()
+    with pytest.raises(urllib.error.URLError):
+        post(f"{url}?seq=1&width=1&height=1", pixels(1, 1))
+    receiver.start()
+    try:
+        seq = receiver.next_seq()
+        assert post_frame(receiver, seq, 1, 1, pixels(1, 1)) == 204
+        assert receiver.wait_frame(seq, timeout=5).seq == seq
+    finally:
+        receiver.stop()
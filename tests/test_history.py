@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from app.hardware_monitor.history import (
+    Ring,
+    SensorHistory,
+    SeriesHistory,
+    decode_series,
+)
+
+
+def fill(ring: Ring, times) -> None:
+    for t in times:
+        ring.append(float(t), (t * 10,))
+
+
+def test_ring_since_before_full():
+    ring = Ring(5, 1)
+    fill(ring, range(3))
+    times, values = ring.since(1)
+    assert times.tolist() == [1, 2]
+    assert values[:, 0].tolist() == [10, 20]
+
+
+@pytest.mark.parametrize("start", range(0, 14))
+def test_ring_since_wraparound(start):
+    ring = Ring(5, 1)
+    fill(ring, range(12))  # Keeps 7..11, the head is in the middle
+    times, values = ring.since(start)
+    expected = [t for t in range(7, 12) if t >= start]
+    assert times.tolist() == expected
+    assert values[:, 0].tolist() == [t * 10 for t in expected]
+
+
+def test_ring_since_wraparound_at_the_end():
+    ring = Ring(4, 1)
+    fill(ring, range(8))  # The head is back at 0
+    assert ring.head == 0
+    assert ring.since(5)[0].tolist() == [5, 6, 7]
+
+
+def test_buckets_close_at_the_boundary():
+    series = SeriesHistory()
+    for t, value in [(100, 1), (105, 3), (109.9, 2), (110, 8), (125, 4)]:
+        series.append(t, value)
+    res = decode_series(series.query(0, "10s"))
+    # 100 and 110 are closed, 120 is still open and included
+    assert res["t"].tolist() == [100, 110, 120]
+    assert res["min"].tolist() == [1, 8, 4]
+    assert res["max"].tolist() == [3, 8, 4]
+    assert res["mean"].tolist() == [2, 8, 4]
+    # Only the closed buckets are in the ring
+    assert series.rings["10s"].count == 2
+    # The 1 minute bucket of 60..119 closed at 125
+    res = decode_series(series.query(0, "1m"))
+    assert res["t"].tolist() == [60, 120]
+    assert res["mean"].tolist() == pytest.approx([(1 + 3 + 2 + 8) / 4, 4])
+
+
+def test_query_window_excludes_open_bucket_before_start():
+    series = SeriesHistory()
+    series.append(100, 1)
+    assert series.query(101, "10s")["count"] == 0
+
+
+def test_query_raw_encoding():
+    series = SeriesHistory()
+    for t in range(10):
+        series.append(1_700_000_000.5 + t, t / 4)
+    res = series.query(1_700_000_005, "raw")
+    assert res["count"] == 5
+    assert res["columns"] == ["value"]
+    arrays = decode_series(res)
+    np.testing.assert_array_equal(arrays["t"], 1_700_000_000.5 + np.arange(5, 10))
+    np.testing.assert_array_equal(arrays["value"], np.arange(5, 10) / 4)
+
+
+def test_sensor_history():
+    history = SensorHistory()
+    history.record("cpu", {"load": 0.5, "name": "x", "ok": True, "fan": None}, 100)
+    assert history.attributes() == [("cpu", "load")]
+    assert history.query("cpu", "fan", 60, "raw", 100) is None
+    assert history.query("cpu", "load", 60, "raw", 100)["count"] == 1
+    with pytest.raises(ValueError):
+        history.query("cpu", "load", 60, "5s", 100)
+
+
+def test_sensor_history_max_series(monkeypatch):
+    monkeypatch.setattr(SensorHistory, "max_series", 2)
+    history = SensorHistory()
+    history.record("cpu", {"a": 1, "b": 2, "c": 3}, 100)
+    assert len(history.attributes()) == 2
@@ -0,0 +1,309 @@
+import threading
+import time
+import pytest
+from app.hardware_monitor import pipeline
+from app.hardware_monitor.pipeline import (
+    FramePipeline,
+    FrameScheduler,
+    LatestSlot,
+    Stage,
+    StageStats,
+)
+
+
+class FakeClock:
+    """The monotonic and wall clocks of the pipeline module, advanced by the test."""
+
+    def __init__(self, now: float = 1000.0, wall: float = 1_700_000_000.5) -> None:
+        self.now = now
+        self.wall_offset = wall - now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now + self.wall_offset
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(pipeline, "time", clock)
+    return clock
+
+
+def run_frame(scheduler: FrameScheduler, clock: FakeClock, cost: float) -> float:
+    """Wait for the next deadline, start the frame and spend `cost` on it."""
+    deadline = scheduler.next_deadline()
+    clock.now = max(clock.now, deadline)
+    scheduler.tick(deadline)
+    clock.now += cost
+    return deadline
+
+
+def test_first_deadline_is_now(clock):
+    scheduler = FrameScheduler(10)
+    assert scheduler.next_deadline() == clock.now
+
+
+def test_deadlines_do_not_drift(clock):
+    scheduler = FrameScheduler(10)
+    start = clock.now
+    costs = [0.01, 0.09, 0.05, 0.0, 0.099, 0.03] * 10
+    deadlines = [run_frame(scheduler, clock, cost) for cost in costs]
+    # Whole periods from the first deadline, whatever the cost of the frames
+    assert deadlines == pytest.approx([start + i * 0.1 for i in range(len(costs))])
+    assert scheduler.ticks == len(costs)
+    assert scheduler.missed == 0
+
+
+def test_late_frame_does_not_move_the_phase(clock):
+    scheduler = FrameScheduler(10)
+    start = run_frame(scheduler, clock, 0.15)
+    # Less than a period late, the next frame starts at once
+    assert scheduler.next_deadline() == pytest.approx(start + 0.1)
+    run_frame(scheduler, clock, 0.0)
+    assert scheduler.next_deadline() == pytest.approx(start + 0.2)
+    assert scheduler.missed == 0
+
+
+def test_missed_deadlines_are_skipped(clock):
+    scheduler = FrameScheduler(10)
+    start = run_frame(scheduler, clock, 0.0)
+    # A stall of 0.55s misses the deadlines of 0.1 to 0.4
+    clock.now = start + 0.55
+    deadline = scheduler.next_deadline()
+    assert scheduler.missed == 4
+    assert deadline == pytest.approx(start + 0.5)
+    scheduler.tick(deadline)
+    # One frame for the stall, no burst, then back on the phase
+    assert scheduler.next_deadline() == pytest.approx(start + 0.6)
+    assert scheduler.missed == 4
+
+
+def test_set_fps_clamps_and_restarts(clock):
+    scheduler = FrameScheduler(10)
+    run_frame(scheduler, clock, 0.0)
+    scheduler.set_fps(1000)
+    assert scheduler.fps == FrameScheduler.max_fps
+    assert scheduler.period == pytest.approx(1 / FrameScheduler.max_fps)
+    # The deadlines start again from now
+    clock.now += 0.01
+    assert scheduler.next_deadline() == clock.now
+    scheduler.set_fps(0)
+    assert scheduler.fps == FrameScheduler.min_fps
+    assert scheduler.period == pytest.approx(5)
+    assert FrameScheduler(0.01).fps == FrameScheduler.min_fps
+
+
+def test_align_to_second(clock):
+    scheduler = FrameScheduler(1, align_to_second=True, align_offset=0.02)
+    # The wall clock is at .5 of a second, the deadline is at the next .02
+    deadline = scheduler.next_deadline()
+    assert deadline == pytest.approx(clock.now + 0.52)
+    assert clock.time() + (deadline - clock.now) == pytest.approx(1_700_000_001.02)
+    clock.now = deadline
+    scheduler.tick(deadline)
+    # Slightly late frames stay on the boundaries
+    clock.now += 0.3
+    assert scheduler.next_deadline() == pytest.approx(deadline + 1)
+    assert scheduler.missed == 0
+
+
+def test_align_to_second_counts_missed(clock):
+    scheduler = FrameScheduler(2, align_to_second=True, align_offset=0)
+    deadline = scheduler.next_deadline()
+    clock.now = deadline
+    scheduler.tick(deadline)
+    # A stall of 1.2s misses the boundaries at +0.5 and +1.0
+    clock.now += 1.2
+    assert scheduler.next_deadline() == pytest.approx(deadline + 1.5)
+    assert scheduler.missed == 2
+
+
+def test_align_follows_a_wall_clock_change(clock):
+    scheduler = FrameScheduler(1, align_to_second=True, align_offset=0)
+    deadline = scheduler.next_deadline()
+    clock.now = deadline
+    scheduler.tick(deadline)
+    # The wall clock is set 0.25s back, the next frame is on its new boundary
+    clock.wall_offset -= 0.25
+    assert scheduler.next_deadline() == pytest.approx(deadline + 0.25)
+    assert scheduler.missed == 0
+
+
+def test_jitter_stats(clock):
+    scheduler = FrameScheduler(10)
+    assert scheduler.to_dict() == {
+        "fps": 10,
+        "ticks": 0,
+        "missed": 0,
+        "jitter_avg_ms": 0,
+        "jitter_max_ms": 0,
+    }
+    for late in (0.002, 0.006, 0.001):
+        deadline = scheduler.next_deadline()
+        clock.now = max(clock.now, deadline) + late
+        scheduler.tick(deadline)
+    stats = scheduler.to_dict()
+    assert stats["ticks"] == 3
+    assert stats["jitter_avg_ms"] == pytest.approx(3.0)
+    assert stats["jitter_max_ms"] == pytest.approx(6.0)
+
+
+def test_wait(clock):
+    scheduler = FrameScheduler(4)
+    start = clock.now
+    assert scheduler.wait()
+    assert scheduler.wait()
+    # Slept until the second deadline
+    assert clock.now == pytest.approx(start + 0.25)
+    stop = threading.Event()
+    stop.set()
+    # Stopped while waiting, the frame is not started
+    assert not scheduler.wait(stop)
+    assert scheduler.ticks == 2
+
+
+def test_latest_slot_keeps_the_newest():
+    slot = LatestSlot()
+    for i in range(5):
+        slot.put(i)
+    # Only the newest arrives, the others are counted as dropped
+    assert slot.get(0) == 4
+    assert slot.dropped == 4
+    assert slot.get(0) is None
+    slot.put(5)
+    assert slot.get(0) == 5
+    assert slot.dropped == 4
+
+
+def test_latest_slot_get_timeout():
+    slot = LatestSlot()
+    start = time.perf_counter()
+    assert slot.get(0.05) is None
+    assert time.perf_counter() - start >= 0.04
+    # Woken by a put from another thread
+    timer = threading.Timer(0.05, slot.put, ("frame",))
+    timer.start()
+    assert slot.get(5) == "frame"
+    timer.join()
+
+
+def test_latest_slot_close():
+    slot = LatestSlot()
+    slot.put("stale")
+    results = list()
+    waiter = threading.Thread(target=lambda: results.append(slot.get(5)))
+    slot.get(0)
+    waiter.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    slot.close()
+    waiter.join(5)
+    # The waiter is woken at once, the closed slot does not wait
+    assert results == [None]
+    assert time.perf_counter() - start < 1
+    assert slot.get(5) is None
+    slot.put("late")
+    assert slot.get(5) == "late"
+
+
+def test_stage_stats():
+    stats = StageStats()
+    assert stats.to_dict() == {
+        "frames": 0,
+        "errors": 0,
+        "avg_ms": 0,
+        "last_ms": 0,
+        "max_ms": 0,
+    }
+    for cost in (0.004, 0.010, 0.001):
+        stats.record(cost)
+    assert stats.to_dict() == {
+        "frames": 3,
+        "errors": 0,
+        "avg_ms": 5.0,
+        "last_ms": 1.0,
+        "max_ms": 10.0,
+    }
+
+
+def wait_until(predicate, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_pipeline_drops_stale_frames():
+    consuming, produced = threading.Event(), threading.Event()
+    frames = list()
+    counter = iter(range(10))
+
+    def produce():
+        item = next(counter, None)
+        if item == 1:
+            # The consumer is busy with the first frame
+            consuming.wait(5)
+        elif item is None:
+            produced.set()
+            frames_pipeline.stop_event.wait(0.01)
+        return item
+
+    def consume(item):
+        consuming.set()
+        produced.wait(5)
+        frames.append(item)
+
+    frames_pipeline = FramePipeline(
+        [Stage("produce", produce), Stage("consume", consume)]
+    )
+    frames_pipeline.start()
+    assert wait_until(lambda: len(frames) == 2)
+    frames_pipeline.stop()
+    # The frames produced while consuming were replaced by the newest
+    assert frames == [0, 9]
+    stats = frames_pipeline.stats()
+    assert stats["consume"]["frames"] == 2
+    assert stats["consume"]["dropped"] == 8
+    assert stats["produce"]["frames"] >= 10
+    assert "dropped" not in stats["produce"]
+    assert "schedule" not in stats["consume"]
+
+
+def test_pipeline_stage_errors():
+    errors = list()
+    frames = list()
+    counter = iter(range(1000))
+
+    def convert(item):
+        if item % 2:
+            raise ValueError(item)
+        # Dropped, not passed to the next stage
+        return item if item % 4 == 0 else None
+
+    frames_pipeline = FramePipeline(
+        [
+            Stage("produce", lambda: next(counter), FrameScheduler(30)),
+            Stage("convert", convert),
+            Stage("collect", frames.append),
+        ],
+        lambda stage, e: errors.append((stage.name, e.args[0])),
+    )
+    frames_pipeline.start()
+    assert wait_until(lambda: len(frames) >= 2)
+    frames_pipeline.stop()
+    # The pipeline carries on after an error
+    assert all(item % 4 == 0 for item in frames)
+    assert errors and all(name == "convert" and item % 2 for name, item in errors)
+    stats = frames_pipeline.stats()
+    assert stats["convert"]["errors"] >= 2
+    assert stats["collect"]["errors"] == 0
+    assert stats["produce"]["schedule"]["fps"] == 30
+    assert stats["produce"]["schedule"]["ticks"] >= 5
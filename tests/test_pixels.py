@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from PIL import Image
+from libs.lcds._base import image2rgb565_le, rotate_image, rotation_turns
+from libs.lcds._pixels import FrameDiffer, RGB565Converter, rotate_view
+
+ROTATIONS = [0, 90, 180, 270, 360, -90, 450]
+
+
+def noise(width: int, height: int, seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
+def test_rotation_turns():
+    assert [rotation_turns(r) for r in ROTATIONS] == [0, 1, 2, 3, 0, 3, 1]
+    with pytest.raises(ValueError):
+        rotation_turns(45)
+
+
+@pytest.mark.parametrize("rotation", ROTATIONS)
+def test_rotate_view_matches_rotate_image(rotation):
+    image = noise(7, 5)
+    expected = np.asarray(rotate_image(image, rotation))
+    # Also the same as the resampling free Image.rotate with expand
+    np.testing.assert_array_equal(
+        expected, np.asarray(image.rotate(rotation, expand=True))
+    )
+    rgb = np.asarray(image)
+    view = rotate_view(rgb, rotation)
+    np.testing.assert_array_equal(view, expected)
+    # No pixel is copied
+    assert np.shares_memory(view, rgb)
+
+
+@pytest.mark.parametrize("rotation", ROTATIONS)
+@pytest.mark.parametrize("size", [(480, 320), (33, 17)])
+def test_converter_matches_reference(rotation, size):
+    image = noise(*size, seed=rotation % 360)
+    rotated = rotate_image(image, rotation)
+    converter = RGB565Converter(*rotated.size)
+    expected = image2rgb565_le(rotated)
+    assert converter.convert_bytes(image, rotation) == expected
+    assert bytes(converter.convert(image, rotation)) == expected
+    frame = np.frombuffer(expected, dtype=np.uint16).reshape(rotated.size[::-1])
+    np.testing.assert_array_equal(converter.frame, frame)
+
+
+def test_converter_every_channel_value():
+    # Every value of every channel, the lookup tables against the bit operations
+    values = np.arange(256, dtype=np.uint8)
+    pixels = np.stack([values, values[::-1], np.roll(values, 85)], axis=-1)
+    image = Image.fromarray(pixels.reshape(16, 16, 3), "RGB")
+    converter = RGB565Converter(16, 16)
+    assert converter.convert_bytes(image) == image2rgb565_le(image)
+
+
+def test_converter_modes_and_buffer_reuse():
+    image = noise(8, 4).convert("RGBA")
+    converter = RGB565Converter(8, 4)
+    expected = image2rgb565_le(image)
+    view = converter.convert(image)
+    assert bytes(view) == expected
+    copy = converter.convert_bytes(image)
+    # The view is over the internal buffer, the next frame overwrites it
+    converter.convert(noise(8, 4, seed=1))
+    assert bytes(view) != expected
+    assert copy == expected
+
+
+def test_converter_size_mismatch():
+    converter = RGB565Converter(8, 4)
+    with pytest.raises(ValueError):
+        converter.convert(noise(8, 4), 90)
+    assert len(converter.convert(noise(4, 8), 90)) == 8 * 4 * 2
+
+
+def test_frame_differ():
+    differ = FrameDiffer(40, 20, tile_size=16)
+    frame = np.zeros((20, 40), dtype=np.uint16)
+    assert differ.diff(frame) == []
+    frame[0, 0] = 1
+    frame[1, 17] = 1
+    frame[19, 39] = 1
+    # Adjacent tiles merge, the edge tiles are cropped to the frame
+    assert differ.diff(frame) == [(0, 0, 32, 16), (32, 16, 8, 4)]
+    differ.update(frame)
+    assert differ.diff(frame) == []
+    frame[:, 0] = 2
+    assert differ.diff(frame) == [(0, 0, 16, 20)]
@@ -0,0 +1,146 @@
+"""
+Pixel-diff tests of the headless theme renderer.
+
+The renders are compared against the reference images in `data/renderer` with
+a tolerance, the font rasterization differs a little between FreeType builds.
+Set LCDCANVAS_UPDATE_REFERENCES=1 to write the references again after an
+intended change of the rendering.
+"""
+
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pytest
+from PIL import Image
+from app import consts
+from app.hardware_monitor import renderer as renderer_module
+from app.hardware_monitor.renderer import ThemeRenderer
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "renderer")
+THEME_PATH = os.path.join(consts.THEMES_SOURCE_DIR, "lcdcanvas.json")
+UPDATE_REFERENCES = os.environ.get("LCDCANVAS_UPDATE_REFERENCES") == "1"
+# A pixel differs when one of its channels is off by more than this
+CHANNEL_TOLERANCE = 32
+# The fraction of the pixels allowed to differ
+PIXEL_TOLERANCE = 0.005
+
+
+class FixedDatetime(datetime):
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 3, 21, 4, 36, 21)
+
+
+@pytest.fixture(autouse=True)
+def fixed_now(monkeypatch):
+    monkeypatch.setattr(renderer_module, "datetime", FixedDatetime)
+
+
+def assert_matches_reference(image: Image.Image, name: str) -> None:
+    path = os.path.join(DATA_DIR, f"{name}.png")
+    if UPDATE_REFERENCES:
+        image.save(path)
+    reference = Image.open(path).convert("RGB")
+    assert image.size == reference.size
+    diff = np.abs(
+        np.asarray(image.convert("RGB"), dtype=np.int16)
+        - np.asarray(reference, dtype=np.int16)
+    )
+    differ = (diff > CHANNEL_TOLERANCE).any(axis=2).mean()
+    assert differ <= PIXEL_TOLERANCE, f"{differ:.2%} of the pixels differ"
+
+
+def load_theme(meta: dict) -> ThemeRenderer:
+    renderer = ThemeRenderer()
+    renderer.load_meta("test", meta)
+    return renderer
+
+
+def text(attribute, **kwargs) -> dict:
+    obj = {
+        "type": "text",
+        "left": 10,
+        "top": 10,
+        "fontSize": 24,
+        "fill": "#ffffff",
+        "text": "-",
+        "data": {
+            "sensor": "cpu",
+            "attribute": attribute,
+            "showType": "Text",
+            "showUnit": True,
+            "unit": "%",
+        },
+    }
+    obj.update(kwargs)
+    return obj
+
+
+def test_render_bundled_theme():
+    with open(THEME_PATH, "r", encoding="utf-8") as fp:
+        renderer = load_theme(json.load(fp))
+    assert renderer.sensors() == []
+    assert renderer.has_clock()
+    renderer.update({})
+    frame = renderer.render()
+    assert frame.mode == "RGB"
+    assert frame.size == (480, 320)
+    assert_matches_reference(frame, "lcdcanvas")
+
+
+def test_render_shapes_and_sensor_values():
+    renderer = load_theme(
+        {
+            "shape": "circle",
+            "radius": 80,
+            "canvasJSON": {
+                "background": "rgb(20, 40, 60)",
+                "objects": [
+                    {
+                        "type": "rect",
+                        "left": 20,
+                        "top": 30,
+                        "width": 120,
+                        "height": 40,
+                        "fill": "#ff8000",
+                    },
+                    {
+                        "type": "circle",
+                        "left": 50,
+                        "top": 90,
+                        "radius": 25,
+                        "fill": "rgba(0, 200, 100, 0.5)",
+                    },
+                    text("load", left=40, top=40),
+                ],
+            },
+        }
+    )
+    assert renderer.sensors() == ["cpu"]
+    assert not renderer.has_clock()
+    renderer.update({"cpu": {"load": 0.42}})
+    frame = renderer.render()
+    assert frame.size == (160, 160)
+    # Outside of the circle shape is black
+    assert frame.getpixel((0, 0)) == (0, 0, 0)
+    assert_matches_reference(frame, "shapes")
+
+
+def test_update_fingerprint():
+    renderer = load_theme(
+        {"width": 100, "height": 50, "canvasJSON": {"objects": [text("temperature")]}}
+    )
+    first = renderer.update({"cpu": {"temperature": 40}})
+    assert renderer.update({"cpu": {"temperature": 40}}) == first
+    assert renderer.update({"cpu": {"temperature": 41}}) != first
+
+
+def test_update_null_attribute():
+    # Objects saved without an attribute have "attribute": null
+    renderer = load_theme(
+        {"width": 100, "height": 50, "canvasJSON": {"objects": [text(None)]}}
+    )
+    renderer.update({"cpu": {"load": 0.5}})
+    assert renderer.render().size == (100, 50)
@@ -0,0 +1,167 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from app.hardware_monitor import sampler as sampler_module
+from app.hardware_monitor.sampler import SensorSampler
+
+
+class Clock:
+    """The monotonic and wall clocks of the sampler, moved by the test."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return 1_700_000_000 + self.now
+
+
+class FakeSensor:
+
+    def __init__(self, refresh_interval: float = None) -> None:
+        if refresh_interval is not None:
+            self.refresh_interval = refresh_interval
+        self.threads = list()
+        self.fail = False
+
+    @property
+    def reads(self) -> int:
+        return len(self.threads)
+
+    def status(self) -> dict:
+        if self.fail:
+            raise OSError("read failed")
+        self.threads.append(threading.current_thread())
+        return {"reads": self.reads}
+
+
+class FakeHistory:
+
+    def __init__(self) -> None:
+        self.records = list()
+
+    def record(self, sensor: str, value: dict, taken_at: float) -> None:
+        self.records.append((sensor, value, taken_at))
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(
+        sampler_module,
+        "time",
+        SimpleNamespace(monotonic=clock.monotonic, time=clock.time),
+    )
+    return clock
+
+
+@pytest.fixture
+def sensors() -> dict:
+    return {"fast": FakeSensor(1), "slow": FakeSensor(5), "plain": FakeSensor()}
+
+
+@pytest.fixture
+def sampler(sensors, clock) -> SensorSampler:
+    sampler = SensorSampler(sensors, FakeHistory())
+    # Sampled by the test only, no background thread
+    sampler.set_external(True)
+    return sampler
+
+
+def test_first_read_samples_in_the_caller_thread(sampler, sensors):
+    assert sampler.read(["fast", "unknown"]) == {"fast": {"reads": 1}}
+    assert sensors["fast"].threads == [threading.current_thread()]
+    assert sensors["slow"].reads == 0
+    # Served from the snapshot afterwards
+    assert sampler.read(["fast"]) == {"fast": {"reads": 1}}
+    assert sensors["fast"].reads == 1
+
+
+def test_snapshot_versions(sampler, clock):
+    first = sampler.snapshot()
+    assert first.version == 0
+    sampler.read(["fast"])
+    second = sampler.snapshot()
+    assert second.version == 1
+    assert second.taken_at == clock.time()
+    clock.now += 1
+    sampler.sample(["slow"])
+    third = sampler.snapshot()
+    # A new snapshot with all the values, the published ones are left untouched
+    assert third.version == 2
+    assert dict(third.values) == {"fast": {"reads": 1}, "slow": {"reads": 1}}
+    assert dict(second.values) == {"fast": {"reads": 1}}
+    assert dict(first.values) == {}
+    with pytest.raises(TypeError):
+        third.values["fast"] = {}
+    assert [r[0] for r in sampler.history.records] == ["fast", "slow"]
+
+
+def test_due_follows_the_refresh_intervals(sampler, clock):
+    start = clock.now
+    sampler.read(["fast", "slow", "plain"])
+    assert sampler.due(start) == ([], pytest.approx(1))
+    assert sampler.due(start + 0.4) == ([], pytest.approx(0.6))
+    # Without refresh_interval, the sensor is sampled at the default interval
+    assert SensorSampler.default_interval == 1
+    due, timeout = sampler.due(start + 1)
+    assert sorted(due) == ["fast", "plain"]
+    assert timeout == pytest.approx(4)
+    clock.now = start + 1
+    sampler.sample(due)
+    assert sampler.due(start + 1.5) == ([], pytest.approx(0.5))
+    due, timeout = sampler.due(start + 5)
+    assert sorted(due) == ["fast", "plain", "slow"]
+    assert timeout == 1
+
+
+def test_idle_sensors_are_not_sampled(sampler, clock):
+    start = clock.now
+    sampler.read(["fast", "slow"])
+    clock.now = start + 20
+    sampler.read(["fast"])
+    assert sampler.due(start + 29) == (["fast", "slow"], 1)
+    # The slow sensor was last read 30s ago
+    assert sampler.due(start + 30) == (["fast"], 1)
+    assert sampler.due(start + 50) == ([], 1)
+
+
+def test_missing_sensors_only_are_read(sampler, sensors, clock):
+    sampler.read(["fast"])
+    clock.now += 2
+    # The due fast sensor is left to the sampling loop
+    sampler.read(["fast", "slow"])
+    assert (sensors["fast"].reads, sensors["slow"].reads) == (1, 1)
+    assert sampler.snapshot().version == 2
+
+
+def test_failed_sensor(sampler, sensors, clock):
+    sensors["fast"].fail = True
+    assert sampler.read(["fast"]) == {}
+    assert sampler.snapshot().version == 1
+    # Not read again before its interval
+    assert sampler.read(["fast"]) == {}
+    assert sampler.snapshot().version == 1
+    assert sampler.due(clock.now) == ([], 1)
+    sensors["fast"].fail = False
+    clock.now += 1
+    sampler.sample(sampler.due(clock.now)[0])
+    assert sampler.read(["fast"]) == {"fast": {"reads": 1}}
+
+
+def test_sampling_thread():
+    sensors = {"fast": FakeSensor(0.02)}
+    sampler = SensorSampler(sensors, FakeHistory())
+    assert sampler.read(["fast"]) == {"fast": {"reads": 1}}
+    deadline = time.monotonic() + 5
+    while sampler.snapshot().version < 3 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    sampler.set_external(True)
+    assert sampler.snapshot().version >= 3
+    # The later reads are done by the sampling thread
+    threads = sensors["fast"].threads
+    assert threads[0] is threading.current_thread()
+    assert {t.name for t in threads[1:]} == {"SensorSampler"}
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+import pytest
+from app.hardware_monitor import sensors
+from app.hardware_monitor.sensors import Sensor
+
+
+class Clock:
+    """A monotonic clock moved by the test."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class CountingSensor(Sensor):
+    refresh_interval = 1
+    stale_tolerance = 5
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+        self.fail = False
+
+    def read(self) -> dict:
+        if self.fail:
+            raise OSError("read failed")
+        self.reads += 1
+        return {"reads": self.reads}
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(sensors, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_status_served_from_cache_within_refresh_interval(clock):
+    sensor = CountingSensor()
+    assert sensor.status() == {"reads": 1}
+    clock.now += 0.5
+    assert sensor.status() == {"reads": 1}
+    clock.now += 0.5
+    assert sensor.status() == {"reads": 2}
+    stats = sensor.stats()
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (1, 2, 0)
+
+
+def test_stale_status_served_within_tolerance(clock):
+    sensor = CountingSensor()
+    sensor.status()
+    sensor.fail = True
+    clock.now += 5.9  # Expired, but within refresh_interval + stale_tolerance
+    assert sensor.status() == {"reads": 1}
+    clock.now += 0.2
+    with pytest.raises(OSError):
+        sensor.status()
+    assert sensor.stats()["errors"] == 2
+    # A successful read caches again
+    sensor.fail = False
+    assert sensor.status() == {"reads": 2}
+
+
+def test_read_error_without_cache_raises(clock):
+    sensor = CountingSensor()
+    sensor.fail = True
+    with pytest.raises(OSError):
+        sensor.status()
+
+
+def test_clean_status_cache(clock):
+    sensor = CountingSensor()
+    sensor.status()
+    sensor.clean_status_cache()
+    assert sensor.status() == {"reads": 2}
+    # Without a cached status a failure is not hidden
+    sensor.clean_status_cache()
+    sensor.fail = True
+    with pytest.raises(OSError):
+        sensor.status()
+
+
+def test_policies_of_the_sensors():
+    assert sensors.Disk.refresh_interval > sensors.CPU.refresh_interval
+    assert sensors.Disk.stale_tolerance >= sensors.Disk.refresh_interval
+    assert sensors.Weather.cost == "network"
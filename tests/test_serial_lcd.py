@@ -0,0 +1,264 @@
+"""
+End to end tests of `SerialLCD` against a pseudo-terminal standing in for the
+panel. The stand-in device records everything written to the pty, the tests
+parse it back into packets with the made up protocol of `StandInLCD`.
+"""
+
+import os
+import threading
+import time
+from typing import List, Tuple
+import pytest
+from PIL import Image
+
+pty = pytest.importorskip("pty")
+tty = pytest.importorskip("tty")
+serial = pytest.importorskip("serial")
+
+from libs.lcds._serial import SerialLCD  # noqa: E402
+
+WIDTH, HEIGHT = 480, 320
+FRAME_BYTES = WIDTH * HEIGHT * 2
+FRAME_MAGIC = b"\xaa\x55"
+BRIGHTNESS_MAGIC = b"\xbb\x66"
+
+
+class StandInLCD(SerialLCD):
+    """A made up protocol: the encoded frame is split in packets of 8KB."""
+
+    width, height = WIDTH, HEIGHT
+    baudrate = 4000000
+    codecs = ("raw",)
+    packet_size = 8192
+
+    def __init__(self, port: str) -> None:
+        super().__init__(port)
+        # Set to hold the writer in the next encoding until it is set
+        self.hold: threading.Event = None
+        self.encoding = threading.Event()
+
+    def unique_id(self) -> str:
+        return f"StandInLCD-{self.port}"
+
+    def frame_packets(self, codec: str, payload: bytes) -> List[bytes]:
+        hold, self.hold = self.hold, None
+        if hold is not None:
+            self.encoding.set()
+            hold.wait(5)
+        header = FRAME_MAGIC + self.codecs.index(codec).to_bytes(1, "little")
+        # The payload size leads the first packet, so the stream can be parsed
+        first = header + len(payload).to_bytes(4, "little")
+        packets = [
+            header + payload[i : i + self.packet_size]
+            for i in range(0, len(payload), self.packet_size)
+        ]
+        return [first] + packets
+
+    def brightness_packet(self, brightness: int) -> bytes:
+        return BRIGHTNESS_MAGIC + bytes([brightness])
+
+
+class StandInDevice:
+    """Read the pty master into a buffer, reading stops while paused."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.data = bytearray()
+        self.running = threading.Event()
+        self.running.set()
+        self.__lock = threading.Lock()
+        threading.Thread(target=self.__read_loop, daemon=True).start()
+
+    def __read_loop(self) -> None:
+        while True:
+            self.running.wait()
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError:
+                return
+            with self.__lock:
+                self.data += data
+
+    def received(self) -> bytes:
+        with self.__lock:
+            return bytes(self.data)
+
+    def wait_for(self, size: int, timeout: float = 5) -> bool:
+        deadline = time.monotonic() + timeout
+        while len(self.data) < size:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+
+def parse(stream: bytes) -> List[Tuple[str, object]]:
+    """The events of the stream: ("frame", (codec, payload)) or ("brightness", value)."""
+    events = list()
+    frame_codec, frame_size, payload = None, 0, bytearray()
+    i = 0
+    while i < len(stream):
+        if stream.startswith(BRIGHTNESS_MAGIC, i):
+            events.append(("brightness", stream[i + 2]))
+            i += 3
+            continue
+        assert stream.startswith(FRAME_MAGIC, i), f"Unexpected byte at {i}"
+        codec = stream[i + 2]
+        i += 3
+        if frame_codec is None:
+            frame_codec = codec
+            frame_size = int.from_bytes(stream[i : i + 4], "little")
+            i += 4
+        else:
+            size = min(StandInLCD.packet_size, frame_size - len(payload))
+            payload += stream[i : i + size]
+            i += size
+        if len(payload) == frame_size:
+            events.append(("frame", (frame_codec, bytes(payload))))
+            frame_codec, frame_size, payload = None, 0, bytearray()
+    assert frame_codec is None, "Incomplete frame at the end of the stream"
+    return events
+
+
+@pytest.fixture
+def screen():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    device = StandInDevice(master)
+    lcd = StandInLCD(os.ttyname(slave))
+    lcd.open()
+    yield lcd, device
+    device.running.set()
+    lcd.close()
+    os.close(slave)
+    os.close(master)
+
+
+def solid(value: int) -> Image.Image:
+    return Image.new("RGB", (WIDTH, HEIGHT), (value, value, value))
+
+
+def pixels(value: int) -> bytes:
+    """The raw RGB565 payload of a solid gray frame."""
+    rgb565 = ((value >> 3) << 11) | ((value >> 2) << 5) | (value >> 3)
+    return rgb565.to_bytes(2, "big") * (WIDTH * HEIGHT)
+
+
+def test_frames_and_commands_are_written(screen):
+    lcd, device = screen
+    lcd.display(solid(0))
+    assert lcd.flush(5)
+    lcd.set_brightness(80)
+    assert lcd.flush(5)
+    assert device.wait_for(lcd.stats["bytes"])
+    assert parse(device.received()) == [
+        ("frame", (0, pixels(0))),
+        ("brightness", 80),
+    ]
+    assert lcd.stats["frames"] == 1
+    assert lcd.stats["dropped"] == 0
+    assert lcd.stats["commands"] == 1
+
+
+def test_slow_device_drops_the_stale_frames(screen):
+    lcd, device = screen
+    device.running.clear()
+    lcd.display(solid(0))
+    # The writer started the first frame and blocks on the full pty
+    deadline = time.monotonic() + 5
+    while lcd.stats["frames"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    start = time.perf_counter()
+    for value in range(8, 80, 8):
+        lcd.display(solid(value))
+    # display only queues the frame, it does not wait for the transport
+    assert time.perf_counter() - start < 1
+    # Every queued frame replaced the previous one
+    assert lcd.stats["dropped"] == 8
+    device.running.set()
+    assert lcd.flush(5)
+    assert device.wait_for(lcd.stats["bytes"])
+    frames = [e for e in parse(device.received()) if e[0] == "frame"]
+    assert frames == [("frame", (0, pixels(0))), ("frame", (0, pixels(72)))]
+
+
+def test_command_does_not_wait_for_the_frame(screen):
+    lcd, device = screen
+    device.running.clear()
+    lcd.display(solid(0))
+    deadline = time.monotonic() + 5
+    while lcd.stats["frames"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    lcd.set_brightness(30)
+    device.running.set()
+    assert lcd.flush(5)
+    assert device.wait_for(lcd.stats["bytes"])
+    stream = device.received()
+    # The command is written between the packets of the frame
+    assert stream.index(BRIGHTNESS_MAGIC) < FRAME_BYTES // 2
+    assert parse(stream) == [("brightness", 30), ("frame", (0, pixels(0)))]
+
+
+def test_command_latency(screen):
+    lcd, device = screen
+    latencies = list()
+    for i in range(5):
+        lcd.display(solid(i * 16))
+        count = device.received().count(BRIGHTNESS_MAGIC)
+        start = time.perf_counter()
+        lcd.set_brightness(i)
+        while device.received().count(BRIGHTNESS_MAGIC) == count:
+            assert time.perf_counter() - start < 1, "Command not received"
+            time.sleep(0.0005)
+        latencies.append(time.perf_counter() - start)
+    assert max(latencies) < 0.1
+
+
+def test_closed_port_raises(screen):
+    lcd, _ = screen
+    lcd.close()
+    with pytest.raises(serial.SerialException):
+        lcd.display(solid(0))
+
+
+def hold_encoding(lcd: StandInLCD, image: Image.Image) -> threading.Event:
+    """Display the image and return once the writer is encoding it."""
+    hold = lcd.hold = threading.Event()
+    lcd.encoding.clear()
+    lcd.display(image)
+    assert lcd.encoding.wait(5)
+    return hold
+
+
+def test_invalidate_while_encoding(screen):
+    lcd, device = screen
+    lcd.codecs = ("raw", "tile")
+    lcd.display(solid(0))
+    assert lcd.flush(5)
+    # The same frame again is a delta without tiles, unless invalidated
+    hold = hold_encoding(lcd, solid(0))
+    lcd.invalidate_frame()
+    hold.set()
+    assert lcd.flush(5)
+    assert device.wait_for(lcd.stats["bytes"])
+    assert parse(device.received()) == [("frame", (0, pixels(0)))] * 2
+    assert lcd.stats["codecs"] == {"raw": 2}
+
+
+def test_close_while_encoding(screen):
+    lcd, device = screen
+    hold = hold_encoding(lcd, solid(0))
+    closing = threading.Thread(target=lcd.close)
+    closing.start()
+    while lcd.is_open():
+        time.sleep(0.001)
+    hold.set()
+    closing.join(5)
+    # The packets of the old port are not written after reopening
+    lcd.open()
+    lcd.display(solid(16))
+    assert lcd.flush(5)
+    assert device.wait_for(lcd.stats["bytes"])
+    assert parse(device.received()) == [("frame", (0, pixels(16)))]
+    assert lcd.stats["frames"] == 1
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+import pytest
+from app import setting
+from app.setting import Settings
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    monkeypatch.setattr(setting, "SETTING_PATH", str(path))
+    return path
+
+
+class Writes(list):
+    """The contents written, `fail` holds the errors raised by the next writes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fail = list()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    res = Writes()
+    write = Settings._Settings__write
+
+    def counting(self, content):
+        if res.fail:
+            raise res.fail.pop(0)
+        write(self, content)
+        res.append(json.loads(content))
+
+    monkeypatch.setattr(Settings, "_Settings__write", counting)
+    return res
+
+
+@pytest.fixture
+def settings(path, writes, monkeypatch):
+    monkeypatch.setattr(Settings, "flush_delay", 0.05)
+    monkeypatch.setattr(Settings, "flush_max_delay", 0.25)
+    res = Settings()
+    # The defaults written by the first load
+    writes.clear()
+    yield res
+    res.flush()
+
+
+def saved(path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def wait_until(predicate, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_burst_is_written_once(settings, writes, path):
+    for i in range(10):
+        settings.set_screen_settings("a", {"brightness": i})
+    assert writes == []
+    assert wait_until(lambda: writes)
+    time.sleep(0.15)
+    assert len(writes) == 1
+    assert saved(path)["screens"]["a"]["brightness"] == 9
+
+
+def test_constant_changes_are_written_at_the_max_delay(settings, writes):
+    start = time.monotonic()
+    first = None
+    # A change every 20ms never leaves 50ms without a change
+    while time.monotonic() - start < 0.7:
+        settings.set_monitor_settings({"lat": time.monotonic()})
+        if first is None and writes:
+            first = time.monotonic() - start
+        time.sleep(0.02)
+    assert first is not None and 0.2 <= first < 0.45
+    assert 2 <= len(writes) <= 4
+
+
+def test_unchanged_content_is_not_written(settings, writes, path):
+    monitor = saved(path)["monitor"]
+    settings.set_monitor_settings({"startup": monitor["startup"]})
+    settings.set("monitor", settings.get("monitor"))
+    time.sleep(0.15)
+    assert writes == []
+    settings.save_to_file()
+    assert writes == []
+
+
+def test_flush_writes_the_pending_changes(settings, writes, path, monkeypatch):
+    monkeypatch.setattr(Settings, "flush_delay", 10)
+    monkeypatch.setattr(Settings, "flush_max_delay", 10)
+    settings.set_screen_settings("a", {"rotation": 90})
+    settings.flush()
+    assert len(writes) == 1
+    assert saved(path)["screens"]["a"]["rotation"] == 90
+    # Nothing pending any more
+    settings.flush()
+    assert len(writes) == 1
+
+
+def test_failed_write_is_retried(settings, writes, path):
+    writes.fail.append(OSError("disk full"))
+    settings.set_screen_settings("a", {"rotation": 180})
+    # Failed, then written again by the flusher
+    assert wait_until(lambda: writes)
+    assert saved(path)["screens"]["a"]["rotation"] == 180
+    assert writes.fail == []
+
+
+def test_failed_write_is_flushed_at_exit(settings, writes, path, monkeypatch):
+    monkeypatch.setattr(Settings, "flush_delay", 10)
+    monkeypatch.setattr(Settings, "flush_max_delay", 10)
+    writes.fail.append(OSError("disk full"))
+    settings.set_screen_settings("a", {"rotation": 270})
+    settings.flush()
+    assert writes == []
+    settings.flush()
+    assert saved(path)["screens"]["a"]["rotation"] == 270
+
+
+def test_flusher_survives_any_error(settings, writes, path):
+    writes.fail.append(RuntimeError("dictionary changed size during iteration"))
+    settings.set_screen_settings("a", {"brightness": 1})
+    assert wait_until(lambda: writes)
+    settings.set_screen_settings("a", {"brightness": 2})
+    assert wait_until(lambda: len(writes) == 2)
+    assert saved(path)["screens"]["a"]["brightness"] == 2
+
+
+def test_setters_do_not_wait_for_the_disk(settings, monkeypatch):
+    release = threading.Event()
+    writing = threading.Event()
+
+    def slow_write(self, content):
+        writing.set()
+        release.wait(5)
+
+    monkeypatch.setattr(Settings, "_Settings__write", slow_write)
+    settings.set_screen_settings("a", {"brightness": 1})
+    assert writing.wait(5)
+    start = time.perf_counter()
+    settings.set_screen_settings("a", {"brightness": 2})
+    assert settings.get_screen_settings("a")["brightness"] == 2
+    assert time.perf_counter() - start < 0.5
+    release.set()
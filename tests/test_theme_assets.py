@@ -0,0 +1,190 @@
+import base64
+import json
+import os
+import urllib.error
+import urllib.request
+from datetime import datetime
+from io import BytesIO
+import numpy as np
+import pytest
+from PIL import Image
+from app import consts
+from app.hardware_monitor import renderer as renderer_module
+from app.hardware_monitor import theme_assets
+from app.hardware_monitor.frame_transport import FrameReceiver
+from app.hardware_monitor.renderer import ThemeRenderer
+from app.hardware_monitor.theme_assets import (
+    AssetStore,
+    migrate_themes,
+    pack_theme,
+    read_theme_file,
+    resolve_theme,
+    unpack_theme,
+)
+
+THEME_PATH = os.path.join(consts.THEMES_SOURCE_DIR, "lcdcanvas.json")
+
+
+def png_data_url(seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray(rng.integers(0, 255, (32, 32, 3), dtype=np.uint8))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+def theme(background: str, font: str = "ab" * 2048) -> str:
+    meta = {
+        "width": 480,
+        "height": 320,
+        "canvasJSON": {
+            "objects": [
+                {"type": "image", "src": background, "data": {}},
+                {"type": "image", "src": "data:image/png;base64,AAAA", "data": {}},
+                {
+                    "type": "image",
+                    "src": background,
+                    "data": {"value": {"type": "image/gif", "src": background}},
+                },
+            ],
+        },
+        "customFonts": {"Font": font},
+    }
+    return json.dumps(meta, ensure_ascii=False)
+
+
+@pytest.fixture
+def store(tmp_path) -> AssetStore:
+    return AssetStore(str(tmp_path / "assets"))
+
+
+def test_pack_unpack_round_trip(store):
+    content = theme(png_data_url(1))
+    packed = pack_theme(content, store)
+    assert "base64" not in packed.replace("base64,AAAA", "")
+    meta = json.loads(packed)
+    objects = meta["canvasJSON"]["objects"]
+    # The same image is stored once, the small one stays inlined
+    assert objects[0]["src"] == objects[2]["data"]["value"]["src"]
+    assert objects[0]["src"].startswith("asset:") and objects[0]["src"].endswith(".png")
+    assert objects[1]["src"] == "data:image/png;base64,AAAA"
+    assert meta["customFonts"]["Font"].endswith(".font")
+    assert len(os.listdir(store.root)) == 2
+    assert json.loads(unpack_theme(packed, store)) == json.loads(content)
+
+
+def test_pack_is_idempotent(store):
+    packed = pack_theme(theme(png_data_url(1)), store)
+    assert pack_theme(packed, store) is packed
+    small = theme("data:image/png;base64,AAAA", font="abcd")
+    assert pack_theme(small, store) is small
+    assert unpack_theme(small, store) is small
+
+
+def test_themes_share_assets(store):
+    background = png_data_url(1)
+    pack_theme(theme(background), store)
+    pack_theme(theme(background), store)
+    pack_theme(theme(png_data_url(2)), store)
+    # Two images and one font
+    assert len(os.listdir(store.root)) == 3
+
+
+def test_invalid_reference(store):
+    with pytest.raises(ValueError):
+        store.path("asset:../settings.json")
+
+
+def test_resolve_theme(store):
+    packed = pack_theme(theme(png_data_url(1)), store)
+    resolved = resolve_theme(packed, "http://127.0.0.1:1/token/assets")
+    assert "asset:" not in resolved
+    meta = json.loads(resolved)
+    name = json.loads(packed)["canvasJSON"]["objects"][0]["src"][len("asset:") :]
+    assert meta["canvasJSON"]["objects"][0]["src"] == (
+        f"http://127.0.0.1:1/token/assets/{name}"
+    )
+    assert meta["customFonts"]["Font"].startswith("http://127.0.0.1:1/token/assets/")
+    content = theme("data:image/png;base64,AAAA")
+    assert resolve_theme(content, "http://x") is content
+
+
+def test_read_theme_file(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(theme_assets, "asset_store", store)
+    content = theme(png_data_url(1))
+    filepath = str(tmp_path / "theme.json")
+    theme_assets.write_theme_file(filepath, content)
+    # Loaded with the references, exported self-contained
+    assert read_theme_file(filepath) == pack_theme(content, store)
+    assert json.loads(read_theme_file(filepath, inline=True)) == json.loads(content)
+
+
+def test_migrate_themes(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(theme_assets, "asset_store", store)
+    themes_dir = tmp_path / "themes"
+    themes_dir.mkdir()
+    contents = {
+        "a.json": theme(png_data_url(1)),
+        "b.json": theme(png_data_url(2)),
+        "small.json": theme("data:image/png;base64,AAAA", font="abcd"),
+    }
+    for filename, content in contents.items():
+        (themes_dir / filename).write_text(content, encoding="utf-8")
+    (themes_dir / "broken.json").write_text("{", encoding="utf-8")
+    (themes_dir / "notes.txt").write_text(contents["a.json"], encoding="utf-8")
+    assert migrate_themes(str(themes_dir)) == 2
+    # Nothing left to migrate
+    assert migrate_themes(str(themes_dir)) == 0
+    for filename, content in contents.items():
+        filepath = str(themes_dir / filename)
+        assert json.loads(read_theme_file(filepath, inline=True)) == json.loads(content)
+    assert (themes_dir / "small.json").read_text(encoding="utf-8") == contents[
+        "small.json"
+    ]
+    assert (themes_dir / "notes.txt").read_text(encoding="utf-8") == contents["a.json"]
+
+
+def test_asset_server(store):
+    ref = store.put(b"\x89PNG data", ".png")
+    receiver = FrameReceiver(store)
+    receiver.start()
+    try:
+        name = ref[len("asset:") :]
+        with urllib.request.urlopen(f"{receiver.assets_url}/{name}", timeout=5) as res:
+            assert res.read() == b"\x89PNG data"
+            assert res.headers["Content-Type"] == "image/png"
+            assert res.headers["Access-Control-Allow-Origin"] == "*"
+        base_url = receiver.assets_url.rsplit("/", 2)[0]
+        for url in (
+            f"{receiver.assets_url}/{'0' * 64}.png",
+            f"{receiver.assets_url}/..%2F{name}",
+            f"{base_url}/wrong-token/assets/{name}",
+        ):
+            with pytest.raises(urllib.error.HTTPError) as e:
+                urllib.request.urlopen(url, timeout=5)
+            assert e.value.code == 404
+    finally:
+        receiver.stop()
+
+
+class FixedDatetime(datetime):
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 3, 21, 4, 36, 21)
+
+
+def test_renderer_reads_the_store(store, monkeypatch):
+    monkeypatch.setattr(renderer_module, "datetime", FixedDatetime)
+    monkeypatch.setattr(renderer_module, "asset_store", store)
+    with open(THEME_PATH, "r", encoding="utf-8") as fp:
+        content = fp.read()
+    packed = pack_theme(content, store)
+    assert "asset:" in packed
+    frames = list()
+    for data in (content, packed):
+        renderer = ThemeRenderer()
+        renderer.load("lcdcanvas", data)
+        renderer.update({})
+        frames.append(np.asarray(renderer.render()))
+    np.testing.assert_array_equal(frames[0], frames[1])
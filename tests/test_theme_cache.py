@@ -0,0 +1,151 @@
+import json
+import os
+import pytest
+from app.hardware_monitor import theme_cache as theme_cache_module
+from app.hardware_monitor.theme_cache import ThemeCache
+
+
+def write_theme(path, size: int, **meta) -> str:
+    """A theme file of about `size` bytes."""
+    meta = {"shape": "rect", "width": 480, "height": 320, "pad": "x" * size, **meta}
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(meta, fp)
+    return str(path)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """The paths read by the cache."""
+    res = list()
+    read_theme_file = theme_cache_module.read_theme_file
+
+    def counting(path):
+        res.append(os.path.basename(path))
+        return read_theme_file(path)
+
+    monkeypatch.setattr(theme_cache_module, "read_theme_file", counting)
+    return res
+
+
+def test_content_is_cached(tmp_path, reads):
+    cache = ThemeCache()
+    path = write_theme(tmp_path / "a.json", 100)
+    with open(path, "r", encoding="utf-8") as fp:
+        content = fp.read()
+    assert cache.content(path) == content
+    assert cache.content(path) is cache.content(path)
+    assert reads == ["a.json"]
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["nbytes"] == len(content)
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_changed_file_is_read_again(tmp_path, reads):
+    cache = ThemeCache()
+    path = write_theme(tmp_path / "a.json", 100)
+    cache.content(path)
+    # Same size, the mtime changed
+    write_theme(path, 100, width=481)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert json.loads(cache.content(path))["width"] == 481
+    # Same mtime, the size changed
+    write_theme(path, 200)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert len(cache.content(path)) > 200
+    assert reads == ["a.json"] * 3
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["nbytes"] == len(cache.content(path))
+
+
+def test_removed_file_raises(tmp_path):
+    cache = ThemeCache()
+    path = write_theme(tmp_path / "a.json", 100)
+    cache.content(path)
+    os.remove(path)
+    with pytest.raises(FileNotFoundError):
+        cache.content(path)
+
+
+def test_lru_eviction(tmp_path, reads):
+    paths = [write_theme(tmp_path / f"{name}.json", 1000) for name in "abc"]
+    size = os.path.getsize(paths[0])
+    cache = ThemeCache(max_bytes=size * 2)
+    a, b, c = paths
+    cache.content(a)
+    cache.content(b)
+    # a is used again, b is the least recently used
+    cache.content(a)
+    cache.content(c)
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["nbytes"] == size * 2
+    reads.clear()
+    cache.content(a)
+    cache.content(c)
+    assert reads == []
+    cache.content(b)
+    assert reads == ["b.json"]
+
+
+def test_latest_entry_is_kept_over_the_limit(tmp_path):
+    cache = ThemeCache(max_bytes=100)
+    small = write_theme(tmp_path / "small.json", 10)
+    large = write_theme(tmp_path / "large.json", 1000)
+    cache.content(small)
+    cache.content(large)
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["nbytes"] > cache.max_bytes
+
+
+def test_meta_is_a_copy(tmp_path, reads):
+    cache = ThemeCache()
+    path = write_theme(tmp_path / "a.json", 100, canvasJSON={"objects": [{"a": 1}]})
+    meta = cache.meta(path)
+    meta["canvasJSON"]["objects"][0]["a"] = 2
+    meta["width"] = 0
+    again = cache.meta(path)
+    assert again["canvasJSON"]["objects"][0]["a"] == 1
+    assert again["width"] == 480
+    assert again is not meta
+    assert reads == ["a.json"]
+
+
+def test_meta_counts_the_parsed_document(tmp_path):
+    path = write_theme(tmp_path / "a.json", 1000)
+    size = len(ThemeCache().content(path))
+    cache = ThemeCache(max_bytes=size * 3 - 1)
+    cache.content(path)
+    assert cache.stats()["nbytes"] == size
+    cache.meta(path)
+    assert cache.stats()["nbytes"] == size * 2
+    # With the parsed document, one more theme is over the limit
+    other = write_theme(tmp_path / "b.json", 1000)
+    cache.content(other)
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate(tmp_path, reads):
+    cache = ThemeCache()
+    a = write_theme(tmp_path / "a.json", 100)
+    b = write_theme(tmp_path / "b.json", 100)
+    cache.content(a)
+    cache.content(b)
+    cache.invalidate(a)
+    assert cache.stats()["entries"] == 1
+    cache.content(a)
+    assert reads == ["a.json", "b.json", "a.json"]
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["nbytes"] == 0
+
+
+def test_asset_references_are_kept(tmp_path):
+    ref = f"asset:{'0' * 64}.png"
+    path = write_theme(tmp_path / "a.json", 10, canvasJSON={"objects": [{"src": ref}]})
+    # The cache does not read the store, the assets are served by reference
+    assert ThemeCache().meta(path)["canvasJSON"]["objects"][0]["src"] == ref
@@ -0,0 +1,202 @@
+import io
+import json
+import os
+import pytest
+from app.hardware_monitor import theme_index as theme_index_module
+from app.hardware_monitor.theme_index import (
+    HEADER_FIELDS,
+    ThemeIndex,
+    _JsonSkimmer,
+    read_theme_header,
+)
+
+# Members to skip before and between the header fields, with the cases of the
+# string and container scanning: escaped quotes, trailing backslashes, brackets
+# and braces in strings, nested containers and scalars of every kind.
+TRICKY = {
+    "canvasJSON": {
+        "objects": [
+            {"text": 'say "}" and \\', "src": "data:image/png;base64," + "A" * 100},
+            {"text": "[{\\\"", "list": [1, [2, {"a": "]"}], []], "empty": {}},
+        ],
+        "background": "\\\\",
+    },
+    "escaped": '\\"',
+    "backslashes": "\\\\\\\\",
+    "unicode": "é中😀",
+    "number": -12.5e-3,
+    "flags": [True, False, None],
+    "none": None,
+}
+HEADER = {"shape": "circle", "width": 480, "height": 320, "radius": 160}
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 16, 64, 16384]
+
+
+def skim(text: str, chunk_size: int, wanted=HEADER_FIELDS) -> dict:
+    return _JsonSkimmer(io.StringIO(text), chunk_size).members(wanted)
+
+
+def interleaved() -> str:
+    """The header fields between the skipped members."""
+    members = list(TRICKY.items())
+    items = list()
+    for i, field in enumerate(HEADER_FIELDS):
+        items.extend(members[i * 2 : i * 2 + 2])
+        items.append((field, HEADER[field]))
+    items.extend(members[len(HEADER_FIELDS) * 2 :])
+    return json.dumps(dict(items), ensure_ascii=False)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_members_across_chunks(chunk_size, indent):
+    text = json.dumps({**TRICKY, **HEADER}, indent=indent, ensure_ascii=False)
+    assert skim(text, chunk_size) == HEADER
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_members_between_skipped_values(chunk_size):
+    assert skim(interleaved(), chunk_size) == HEADER
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_decode_any_value(chunk_size):
+    text = json.dumps(TRICKY, ensure_ascii=False)
+    assert skim(text, chunk_size, TRICKY) == TRICKY
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16384])
+def test_members_missing(chunk_size):
+    assert skim("{}", chunk_size) == {}
+    text = json.dumps({**TRICKY, "shape": "rect", "width": 10})
+    assert skim(text, chunk_size) == {"shape": "rect", "width": 10}
+    assert skim('  {"width" : 1 }  ', chunk_size) == {"width": 1}
+
+
+class CountingReader(io.StringIO):
+
+    def __init__(self, text: str) -> None:
+        super().__init__(text)
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        chunk = super().read(size)
+        self.count += len(chunk)
+        return chunk
+
+
+def test_stops_once_found():
+    text = json.dumps({**HEADER, "canvasJSON": {"src": "A" * 1000000}})
+    fp = CountingReader(text)
+    assert _JsonSkimmer(fp, 1024).members(HEADER_FIELDS) == HEADER
+    assert fp.count == 1024
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"shape": "rect"', '{"canvasJSON": "abc', '{"canvasJSON": [1, 2', "[1]", ""],
+)
+@pytest.mark.parametrize("chunk_size", [1, 4, 16384])
+def test_invalid(text, chunk_size):
+    with pytest.raises(ValueError):
+        skim(text, chunk_size)
+
+
+def write_theme(path, **header) -> None:
+    meta = {"canvasJSON": TRICKY["canvasJSON"], **header}
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(meta, fp)
+
+
+def test_read_theme_header(tmp_path):
+    path = tmp_path / "a.json"
+    write_theme(path, shape="rect", width=480)
+    assert read_theme_header(str(path)) == {
+        "shape": "rect",
+        "width": 480,
+        "height": 0,
+        "radius": 0,
+    }
+    write_theme(path, width=480)
+    with pytest.raises(ValueError):
+        read_theme_header(str(path))
+
+
+@pytest.fixture
+def themes_dir(tmp_path):
+    path = tmp_path / "themes"
+    path.mkdir()
+    write_theme(path / "b.json", shape="rect", width=480, height=320)
+    write_theme(path / "a.json", shape="circle", radius=120)
+    (path / "broken.json").write_text("{", encoding="utf-8")
+    (path / "notes.txt").write_text("{}", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """The paths read by the index."""
+    res = list()
+
+    def counting(path):
+        res.append(os.path.basename(path))
+        return read_theme_header(path)
+
+    monkeypatch.setattr(theme_index_module, "read_theme_header", counting)
+    return res
+
+
+def test_index_themes(tmp_path, themes_dir, reads):
+    index_path = str(tmp_path / "index.json")
+    index = ThemeIndex(str(themes_dir), index_path)
+    expected = [
+        {"name": "a", "shape": "circle", "width": 0, "height": 0, "radius": 120},
+        {"name": "b", "shape": "rect", "width": 480, "height": 320, "radius": 0},
+    ]
+    assert index.themes() == expected
+    assert sorted(reads) == ["a.json", "b.json", "broken.json"]
+    # A new index loads the saved entries, only the invalid file is read again
+    reads.clear()
+    assert ThemeIndex(str(themes_dir), index_path).themes() == expected
+    assert reads == ["broken.json"]
+
+
+def test_index_changed_and_removed(tmp_path, themes_dir, reads):
+    index = ThemeIndex(str(themes_dir), str(tmp_path / "index.json"))
+    index.themes()
+    reads.clear()
+    write_theme(themes_dir / "a.json", shape="rect", width=100, height=1000)
+    os.remove(themes_dir / "b.json")
+    assert index.themes() == [
+        {"name": "a", "shape": "rect", "width": 100, "height": 1000, "radius": 0}
+    ]
+    assert reads == ["a.json", "broken.json"]
+
+
+def test_index_update_and_remove(tmp_path, themes_dir, reads):
+    index_path = str(tmp_path / "index.json")
+    index = ThemeIndex(str(themes_dir), index_path)
+    path = str(themes_dir / "c.json")
+    write_theme(path, shape="rect", width=1, height=2)
+    index.update(path)
+    assert reads == ["c.json"]
+    # Up to date, not read again
+    index.update(path)
+    assert reads == ["c.json"]
+    with open(index_path, "r", encoding="utf-8") as fp:
+        assert path in json.load(fp)["themes"]
+    os.remove(path)
+    index.remove(path)
+    with open(index_path, "r", encoding="utf-8") as fp:
+        assert path not in json.load(fp)["themes"]
+    # A missing file is ignored
+    index.update(path)
+    assert [t["name"] for t in index.themes()] == ["a", "b"]
+
+
+def test_index_version(tmp_path, themes_dir, reads):
+    index_path = tmp_path / "index.json"
+    index_path.write_text(json.dumps({"version": 0, "themes": {}}), encoding="utf-8")
+    assert len(ThemeIndex(str(themes_dir), str(index_path)).themes()) == 2
+    assert json.loads(index_path.read_text(encoding="utf-8"))["version"] == 1
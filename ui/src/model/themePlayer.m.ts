@@ -183,6 +183,10 @@ export class ThemePlayer {
         if (data.sensor == "weather" && data.attribute == "icon") {
           obj.src = WEATHER_ICON_FILEPATH_MAP[data.value];
         }
+        // the assets are served by the loopback server, keep the canvas readable
+        if (typeof obj.src == "string" && obj.src.startsWith("http")) {
+          obj.crossOrigin = "anonymous";
+        }
       });
     }
     // load the custom fonts
@@ -192,10 +196,15 @@ export class ThemePlayer {
       )) {
         // check if the font is already loaded
         if (CustomFonts[fontFamily]) continue;
-        // load the font
-        const fontData = hexToArrayBuffer(fontDataHex);
-        const font = new FontFace(fontFamily, fontData);
+        // load the font, the hex string of the font file or the URL of the asset
+        const font = fontDataHex.startsWith("http")
+          ? new FontFace(fontFamily, `url(${fontDataHex})`)
+          : new FontFace(fontFamily, hexToArrayBuffer(fontDataHex));
         document.fonts.add(font);
+        font
+          .load()
+          .then(() => this.canvas.requestRenderAll())
+          .catch(console.error);
         CustomFonts[fontFamily] = fontDataHex;
       }
       // remove the customFonts from meta
@@ -211,6 +220,22 @@ export class ThemePlayer {
     });
   }
 
+  public toImageData(): ImageData {
+    this.canvas.renderAll();
+    const width = this.canvas.getWidth();
+    const height = this.canvas.getHeight();
+    let element = this.canvas.getElement();
+    // With retina scaling the backing canvas is larger than the theme, scale it back.
+    if (element.width != width || element.height != height) {
+      const scaled = document.createElement("canvas");
+      scaled.width = width;
+      scaled.height = height;
+      scaled.getContext("2d")!.drawImage(element, 0, 0, width, height);
+      element = scaled;
+    }
+    return element.getContext("2d")!.getImageData(0, 0, width, height);
+  }
+
   public themeSensors(): string[] {
     const sensors = new Set<string>();
     this.meta.canvasJSON?.objects.forEach((obj: any) => {